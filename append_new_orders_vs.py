@@ -1,5 +1,4 @@
-import gspread
-from google.oauth2.service_account import Credentials
+from google_sheets_utils_vs import get_gsheet_client, open_spreadsheet
 
 CREDS_PATH = "/Users/sugamkuchhal/Documents/kite-gtt-demo-vs/creds_vs.json"
 SHEET_NAME = "VS Portfolio"
@@ -8,17 +7,10 @@ DEST_TAB = "NEW_ORDERS"
 SRC_RANGE = "A:H"  # covers columns A to H
 
 def main():
-    creds = Credentials.from_service_account_file(
-        CREDS_PATH,
-        scopes=[
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-    )
-    gc = gspread.authorize(creds)
+    gc = get_gsheet_client(CREDS_PATH)
 
     # Open source and destination worksheet (same file)
-    sh = gc.open(SHEET_NAME)
+    sh = open_spreadsheet(gc, SHEET_NAME)
     ws_src = sh.worksheet(SRC_TAB)
     ws_dest = sh.worksheet(DEST_TAB)
 
@@ -1,32 +1,41 @@
+import asyncio
 from datetime import datetime, date
-import gspread
-from google.oauth2.service_account import Credentials
+from google_sheets_utils_vs import (
+    get_gsheet_client, open_spreadsheet, a1_tab_range, async_open_spreadsheet, async_values_batch_get,
+)
 
 CREDS_PATH = "/Users/sugamkuchhal/Documents/kite-gtt-demo-vs/creds_vs.json"
 
+# (workbook, tab, cell) whose value must be > threshold; printed in this order
+THRESHOLD_CHECKS = [
+    ("VS W M B - KWK (Deep Bear Reversal)", "Friday_Identifier", "F1"),
+    ("VS Portfolio", "CREDIT_CANDIDATES", "K1"),
+    ("VS D G C - RTP (Reverse Trigger Point Salvaging)", "DATE_Identifier", "F1"),
+    ("VS D M B - 100 DMA Stock Screener with BOH", "OPEN_LIST", "F1"),
+    ("SARAS D M B - Consolidated BreakOut with BOH", "OPEN_LIST", "E1"),
+]
+
 def get_ws(sheet_name, tab_name):
-    creds = Credentials.from_service_account_file(
-        CREDS_PATH,
-        scopes=["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    )
-    gc = gspread.authorize(creds)
-    sh = gc.open(sheet_name)
+    gc = get_gsheet_client(CREDS_PATH)
+    sh = open_spreadsheet(gc, sheet_name)
     ws = sh.worksheet(tab_name)
     return sh, ws
 
 def check_gt_threshold(sheet_title, ws, cell, threshold=0.995):
-    value = ws.acell(cell).value
+    report_threshold(sheet_title, ws.title, cell, ws.acell(cell).value, threshold)
+
+def report_threshold(sheet_title, tab_title, cell, value, threshold=0.995):
     try:
         # Handle empty/whitespace as 0.0
         if value is None or str(value).strip().lower() in ("", "na", "n/a", "null", "none"):
             val_float = 0.0
-            print(f"❌ [{ws.title}:{cell}] Value is empty or blank, treating as 0.0000 -> {sheet_title}")
+            print(f"❌ [{tab_title}:{cell}] Value is empty or blank, treating as 0.0000 -> {sheet_title}")
         else:
             val_float = float(value)
     except Exception as e:
-        print(f"❌ [{ws.title}:{cell}] FAIL: Non-numeric value '{value}'. Error: {e} -> {sheet_title}")
+        print(f"❌ [{tab_title}:{cell}] FAIL: Non-numeric value '{value}'. Error: {e} -> {sheet_title}")
         return
-    print(f"[{ws.title}:{cell}] Value: {val_float:.4f}", end=' ')
+    print(f"[{tab_title}:{cell}] Value: {val_float:.4f}", end=' ')
     if val_float > threshold:
         print(f"-- (> {threshold}) ✅ PASS: -> {sheet_title}")
     else:
@@ -35,20 +44,25 @@ def check_gt_threshold(sheet_title, ws, cell, threshold=0.995):
         else:
             print(f"-- ❌ FAIL: Value not greater than {threshold} -> {sheet_title}")
 
-# ==== Threshold Check Example Usage: ====
-
-sh4_src, ws4_src = get_ws("VS W M B - KWK (Deep Bear Reversal)", "Friday_Identifier")
-check_gt_threshold(sh4_src.title, ws4_src, "F1") 
-
-sh5_src, ws5_src = get_ws("VS Portfolio", "CREDIT_CANDIDATES")
-check_gt_threshold(sh5_src.title, ws5_src, "K1") 
-
-sh6_src, ws6_src = get_ws("VS D G C - RTP (Reverse Trigger Point Salvaging)", "DATE_Identifier")
-check_gt_threshold(sh6_src.title, ws6_src, "F1") 
+async def fetch_check_values(checks):
+    """
+    All workbooks at once: open them concurrently, then one values_batch_get per
+    workbook (all its cells), also concurrently. Returns the values in `checks` order.
+    """
+    gc = get_gsheet_client(CREDS_PATH)
+    titles = list(dict.fromkeys(book for book, _, _ in checks))
+    books = dict(zip(titles, await asyncio.gather(*(async_open_spreadsheet(gc, t) for t in titles))))
 
-sh7_src, ws7_src = get_ws("VS D M B - 100 DMA Stock Screener with BOH", "OPEN_LIST")
-check_gt_threshold(sh7_src.title, ws7_src, "F1") 
+    ranges = {t: [a1_tab_range(tab, cell) for book, tab, cell in checks if book == t] for t in titles}
+    results = await asyncio.gather(*(async_values_batch_get(books[t], ranges[t]) for t in titles))
+    by_range = {}
+    for t, values in zip(titles, results):
+        for rng, rows in zip(ranges[t], values):
+            by_range[(t, rng)] = rows[0][0] if rows and rows[0] else ""
+    return [by_range[(book, a1_tab_range(tab, cell))] for book, tab, cell in checks]
 
-sh8_src, ws8_src = get_ws("SARAS D M B - Consolidated BreakOut with BOH", "OPEN_LIST")
-check_gt_threshold(sh8_src.title, ws8_src, "E1") 
+# ==== Threshold Checks ====
 
+if __name__ == "__main__":
+    for (book, tab, cell), value in zip(THRESHOLD_CHECKS, asyncio.run(fetch_check_values(THRESHOLD_CHECKS))):
+        report_threshold(book, tab, cell, value)
@@ -1,84 +1,96 @@
+import asyncio
 from datetime import datetime, date
-import gspread
-
-from google.oauth2.service_account import Credentials
+from google_sheets_utils_vs import (
+    get_gsheet_client, governed, open_spreadsheet, a1_tab_range,
+    async_call, async_open_spreadsheet, async_values_batch_get, async_batch_update,
+)
 
 CREDS_PATH = "/Users/sugamkuchhal/Documents/kite-gtt-demo-vs/creds_vs.json"
 
+# (workbook, tab, source cell, destination cell): copy the date once it is today or earlier
+DATE_COPIES = [
+    ("VS W M B - KWK (Deep Bear Reversal)", "Friday_Identifier", "B1", "A2"),
+    ("VS Portfolio", "CREDIT_CANDIDATES", "K24", "K23"),
+    ("VS D G C - RTP (Reverse Trigger Point Salvaging)", "DATE_Identifier", "B1", "A2"),
+    ("VS D M B - 100 DMA Stock Screener with BOH", "OPEN_LIST", "B1", "A2"),
+    ("VS D M B - Consolidated BreakOut with BOH", "OPEN_LIST", "B1", "A2"),
+]
+
+# Whether the KWK date changed is written (as a boolean) to ALL_OLD_GTTs!R1
+FLAG_WORKBOOK = "VS W M B - KWK (Deep Bear Reversal)"
+FLAG_SHEET_ID = "145TqrpQ3Twx6Tezh28s5GnbowlBb_qcY5UM1RvfIclI"
+FLAG_TAB = "ALL_OLD_GTTs"
+FLAG_CELL = "R1"
+
 def get_client():
-    creds = Credentials.from_service_account_file(
-        CREDS_PATH,
-        scopes=["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    )
-    return gspread.authorize(creds)
+    return governed(get_gsheet_client(CREDS_PATH))  # shared Sheets quota limiter
 
 def get_ws(sheet_name, tab_name):
-    creds = Credentials.from_service_account_file(
-        CREDS_PATH,
-        scopes=["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    )
-    gc = gspread.authorize(creds)
-    sh = gc.open(sheet_name)
+    gc = get_client()
+    sh = open_spreadsheet(gc, sheet_name)
     ws = sh.worksheet(tab_name)
     return sh, ws
 
-def init_date(sheet_title, ws_src, src_cell, ws_dest, dest_cell):
-    value = ws_src.acell(src_cell).value
+def should_copy_date(sheet_title, value):
     try:
         cell_date = datetime.strptime(value, "%d-%b-%Y").date()
     except Exception as e:
         print(f"{sheet_title} -> ❌ Could not parse '{value}' as a date: {e}")
-        return
+        return False
     if cell_date <= date.today():
-        ws_dest.update_acell(dest_cell, value)
-        print(f"{sheet_title} -> ✅ Copied value '{value}' from {ws_src.title}:{src_cell} to {ws_dest.title}:{dest_cell}")
-    else:
-        print(f"{sheet_title} -> 🚫 Not copying: date {cell_date} is after today.")
-
-sh4_src, ws4_src = get_ws("VS W M B - KWK (Deep Bear Reversal)", "Friday_Identifier")
-sh4_des, ws4_des = get_ws("VS W M B - KWK (Deep Bear Reversal)", "Friday_Identifier")
-try:
-    before = ws4_des.acell("A2").value
-
-    # call init_date normally (prints will show up)
-    init_date(sh4_src.title, ws4_src, "B1", ws4_des, "A2")
-
-    after = ws4_des.acell("A2").value
-
-    changed = (after != before)  # raw text comparison, same as before
-    gc = get_client()
-    flag_sh = gc.open_by_key("145TqrpQ3Twx6Tezh28s5GnbowlBb_qcY5UM1RvfIclI")
-    flag_ws = flag_sh.worksheet("ALL_OLD_GTTs")
-
-    # Write boolean TRUE/FALSE to R1 (Google Sheets boolean, not string)
-    flag_ws.update(range_name="R1", values=[[changed]])
-
-except:
-
-    # On any exception, write boolean FALSE (same behavior as old "0")
+        return True
+    print(f"{sheet_title} -> 🚫 Not copying: date {cell_date} is after today.")
+    return False
+
+async def init_date(gc, sheet_name, tab_name, src_cell, dest_cell):
+    """
+    Copy tab!src_cell to tab!dest_cell if it holds a date that is today or earlier.
+    One batched read for both cells, one write if needed. Returns (before, after) of dest_cell.
+    """
+    sh = await async_open_spreadsheet(gc, sheet_name)
+    ws = sh.worksheet(tab_name)
+    src_rng, dest_rng = a1_tab_range(tab_name, src_cell), a1_tab_range(tab_name, dest_cell)
+    src_vals, dest_vals = await async_values_batch_get(sh, [src_rng, dest_rng])
+    value = src_vals[0][0] if src_vals and src_vals[0] else ""
+    before = dest_vals[0][0] if dest_vals and dest_vals[0] else ""
+
+    if not should_copy_date(sh.title, value):
+        return before, before
+
+    await async_batch_update(ws, [{"range": dest_cell, "values": [[value]]}], value_input_option="USER_ENTERED")
+    print(f"{sh.title} -> ✅ Copied value '{value}' from {tab_name}:{src_cell} to {tab_name}:{dest_cell}")
+    (after_vals,) = await async_values_batch_get(sh, [dest_rng])
+    return before, after_vals[0][0] if after_vals and after_vals[0] else ""
+
+async def write_flag(gc, changed):
+    flag_sh = await async_call(gc.open_by_key, FLAG_SHEET_ID)
+    flag_ws = await async_call(flag_sh.worksheet, FLAG_TAB)
+    # Write boolean TRUE/FALSE (Google Sheets boolean, not string)
+    await async_batch_update(flag_ws, [{"range": FLAG_CELL, "values": [[changed]]}])
+
+async def flagged_init_date(gc, *copy_args):
     try:
-        gc = get_client()
-        flag_sh = gc.open_by_key("145TqrpQ3Twx6Tezh28s5GnbowlBb_qcY5UM1RvfIclI")
-        flag_ws = flag_sh.worksheet("ALL_OLD_GTTs")
-        flag_ws.update(range_name="R1", values=[[False]])
-    except:
-
+        before, after = await init_date(gc, *copy_args)
+        changed = (after != before)  # raw text comparison, same as before
+    except Exception:
+        # On any exception, write boolean FALSE (same behavior as old "0")
+        changed = False
+    try:
+        await write_flag(gc, changed)
+    except Exception:
         # If even the flag write fails, there's nothing further we can do.
         pass
 
-sh5_src, ws5_src = get_ws("VS Portfolio", "CREDIT_CANDIDATES")
-sh5_des, ws5_des = get_ws("VS Portfolio", "CREDIT_CANDIDATES")
-init_date(sh5_src.title, ws5_src, "K24", ws5_des, "K23")
-
-sh6_src, ws6_src = get_ws("VS D G C - RTP (Reverse Trigger Point Salvaging)", "DATE_Identifier")
-sh6_des, ws6_des = get_ws("VS D G C - RTP (Reverse Trigger Point Salvaging)", "DATE_Identifier")
-init_date(sh6_src.title, ws6_src, "B1", ws6_des, "A2")
-
-sh7_src, ws7_src = get_ws("VS D M B - 100 DMA Stock Screener with BOH", "OPEN_LIST")
-sh7_des, ws7_des = get_ws("VS D M B - 100 DMA Stock Screener with BOH", "OPEN_LIST")
-init_date(sh7_src.title, ws7_src, "B1", ws7_des, "A2")
-
-sh8_src, ws8_src = get_ws("VS D M B - Consolidated BreakOut with BOH", "OPEN_LIST")
-sh8_des, ws8_des = get_ws("VS D M B - Consolidated BreakOut with BOH", "OPEN_LIST")
-init_date(sh8_src.title, ws8_src, "B1", ws8_des, "A2")
-
+async def run_date_copies():
+    """Every workbook is handled concurrently (one read + at most one write each)."""
+    gc = get_gsheet_client(CREDS_PATH)
+    tasks = []
+    for copy_args in DATE_COPIES:
+        if copy_args[0] == FLAG_WORKBOOK:
+            tasks.append(flagged_init_date(gc, *copy_args))
+        else:
+            tasks.append(init_date(gc, *copy_args))
+    await asyncio.gather(*tasks)
+
+if __name__ == "__main__":
+    asyncio.run(run_date_copies())
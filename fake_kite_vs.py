@@ -0,0 +1,156 @@
+# fake_kite_vs.py
+#
+# In-process stand-in for KiteConnect used by gtt_processor_vs --dry-run / --simulate.
+# Models the GTT book (place/modify/delete/get), records every call with its timing,
+# and can inject latency and errors so throughput can be measured without a live account.
+
+import copy
+import itertools
+import logging
+import random
+import threading
+import time
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
+logger = logging.getLogger("fake_kite_vs")
+
+# Errors picked by error injection: first one is retriable (safe_api_call backs off), second is fatal
+INJECTED_ERRORS = [
+    "Too many requests (429) [simulated]",
+    "Invalid trigger price [simulated]",
+]
+
+class FakeKiteError(Exception):
+    pass
+
+class FakeKite:
+    """
+    KiteConnect-shaped fake. Only the calls this repo makes are modelled.
+    - latency_ms / jitter_ms: sleep per call (jitter is uniform +/-).
+    - error_rate: probability (0..1) that a mutation call raises an injected error.
+    - gtts: optional list of Kite GTT dicts to seed the book (e.g. live get_gtts()).
+    Unknown GTT ids on modify/delete are accepted (the call is still recorded), so
+    GTT_DATA rows that the fake book has never seen do not turn into noise.
+    """
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None, gtts=None):
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.error_rate = float(error_rate)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._gtts = {}
+        self._orders = []
+        self.calls = []
+        self.started = time.time()
+        for g in gtts or []:
+            self._gtts[g["id"]] = copy.deepcopy(g)
+        self._ids = itertools.count(max(self._gtts, default=0) + 1)
+
+    # ---- plumbing ----
+    def _call(self, name, mutation, fn, **info):
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+            fail = mutation and self.error_rate > 0 and self._rng.random() < self.error_rate
+            error = self._rng.choice(INJECTED_ERRORS) if fail else None
+        t0 = time.time()
+        if delay:
+            time.sleep(delay)
+        record = {"method": name, "info": info, "start": t0, "ok": error is None}
+        try:
+            if error:
+                raise FakeKiteError(error)
+            with self._lock:
+                return fn()
+        finally:
+            record["duration"] = time.time() - t0
+            with self._lock:
+                self.calls.append(record)
+
+    @staticmethod
+    def _gtt_dict(gtt_id, tradingsymbol, exchange, trigger_type, trigger_values, last_price, orders):
+        return {
+            "id": gtt_id,
+            "type": trigger_type,
+            "status": "active",
+            "condition": {
+                "tradingsymbol": tradingsymbol,
+                "exchange": exchange,
+                "trigger_values": list(trigger_values),
+                "last_price": last_price,
+            },
+            "orders": [dict(o) for o in orders],
+        }
+
+    # ---- Kite surface ----
+    def profile(self):
+        return self._call("profile", False, lambda: {"user_id": "FAKE", "user_name": "Fake Kite"})
+
+    def margins(self, *args, **kwargs):
+        return self._call("margins", False, lambda: {})
+
+    def get_gtts(self):
+        return self._call("get_gtts", False, lambda: copy.deepcopy(list(self._gtts.values())))
+
+    def get_gtt(self, trigger_id):
+        def _get():
+            if trigger_id not in self._gtts:
+                raise FakeKiteError(f"GTT {trigger_id} not found [simulated]")
+            return copy.deepcopy(self._gtts[trigger_id])
+        return self._call("get_gtt", False, _get, trigger_id=trigger_id)
+
+    def place_gtt(self, trigger_type, tradingsymbol, exchange, trigger_values, last_price, orders):
+        def _place():
+            gtt_id = next(self._ids)
+            self._gtts[gtt_id] = self._gtt_dict(gtt_id, tradingsymbol, exchange, trigger_type, trigger_values, last_price, orders)
+            return {"trigger_id": gtt_id}
+        return self._call("place_gtt", True, _place, tradingsymbol=tradingsymbol, exchange=exchange)
+
+    def modify_gtt(self, trigger_id, trigger_type, tradingsymbol, exchange, trigger_values, last_price, orders):
+        def _modify():
+            self._gtts[trigger_id] = self._gtt_dict(trigger_id, tradingsymbol, exchange, trigger_type, trigger_values, last_price, orders)
+            return {"trigger_id": trigger_id}
+        return self._call("modify_gtt", True, _modify, trigger_id=trigger_id)
+
+    def delete_gtt(self, trigger_id):
+        def _delete():
+            gtt = self._gtts.get(trigger_id)
+            if gtt is not None:
+                gtt["status"] = "deleted"
+            return {"trigger_id": trigger_id}
+        return self._call("delete_gtt", True, _delete, trigger_id=trigger_id)
+
+    def place_order(self, variety, **params):
+        def _place():
+            order_id = f"FAKE{len(self._orders) + 1:08d}"
+            self._orders.append(dict(params, variety=variety, order_id=order_id, status="COMPLETE"))
+            return order_id
+        return self._call("place_order", True, _place, variety=variety, **params)
+
+    def orders(self):
+        return self._call("orders", False, lambda: copy.deepcopy(self._orders))
+
+    # ---- reporting ----
+    def report(self):
+        """Log the would-be API calls: count, errors and latency per method, plus throughput."""
+        with self._lock:
+            calls = list(self.calls)
+        wall = time.time() - self.started
+        if not calls:
+            logger.info("[fake kite] no API calls made")
+            return {}
+
+        summary = {}
+        for c in calls:
+            s = summary.setdefault(c["method"], {"calls": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0})
+            s["calls"] += 1
+            s["errors"] += 0 if c["ok"] else 1
+            s["total_s"] += c["duration"]
+            s["max_s"] = max(s["max_s"], c["duration"])
+
+        logger.info(f"[fake kite] {len(calls)} would-be API calls in {wall:.2f}s wall ({len(calls) / wall:.1f} calls/s)")
+        for method, s in sorted(summary.items()):
+            logger.info(
+                f"[fake kite] {method}: {s['calls']} calls, {s['errors']} errors, "
+                f"avg {1000 * s['total_s'] / s['calls']:.1f}ms, max {1000 * s['max_s']:.1f}ms"
+            )
+        return summary
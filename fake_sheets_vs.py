@@ -0,0 +1,650 @@
+# fake_sheets_vs.py
+#
+# Offline stand-in for gspread's Client / Spreadsheet / Worksheet, selected with
+# GSHEETS_FAKE in google_sheets_utils_vs.get_gsheet_client(). Covers the subset of
+# gspread this repo calls, counts every would-be API request and can add latency
+# and enforce a per-minute quota, so any script can be run and benchmarked without
+# a live Google account.
+#
+#   GSHEETS_FAKE=memory            in-process workbooks, gone when the process exits
+#   GSHEETS_FAKE=/path/store.json  workbooks loaded from / saved back to a JSON store
+#
+# Formulas are stored as text and never evaluated.
+
+import atexit
+import collections
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+from gspread.exceptions import APIError, SpreadsheetNotFound, WorksheetNotFound
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
+logger = logging.getLogger("fake_sheets_vs")
+
+FAKE_LATENCY_MS = float(os.getenv("GSHEETS_FAKE_LATENCY_MS", "0"))
+FAKE_JITTER_MS = float(os.getenv("GSHEETS_FAKE_JITTER_MS", "0"))
+# Sheets' default per-user quota is 60 read + 60 write requests per minute; 0 disables the check
+FAKE_QUOTA_RPM = int(os.getenv("GSHEETS_FAKE_QUOTA_RPM", "60"))
+# Open unknown workbooks/tabs as empty ones instead of raising *NotFound
+FAKE_AUTOCREATE = os.getenv("GSHEETS_FAKE_AUTOCREATE", "1") == "1"
+
+_DEFAULT_ROWS, _DEFAULT_COLS = 1000, 26
+
+# ---- A1 helpers ----
+_A1_RE = re.compile(r"^([A-Za-z]*)(\d*)(?::([A-Za-z]*)(\d*))?$")
+
+def _col_to_num(letters):
+    num = 0
+    for ch in letters.upper():
+        num = num * 26 + ord(ch) - 64
+    return num
+
+def _num_to_col(num):
+    letters = ""
+    while num > 0:
+        num, rem = divmod(num - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+def _split_tab(rng):
+    """"'My Tab'!A1:B2" -> ("My Tab", "A1:B2"); a bare tab name -> (tab, None)."""
+    if "!" in rng:
+        tab, a1 = rng.rsplit("!", 1)
+    elif _A1_RE.match(rng.replace("$", "")):
+        tab, a1 = None, rng
+    else:
+        tab, a1 = rng, None
+    if tab and tab.startswith("'") and tab.endswith("'"):
+        tab = tab[1:-1].replace("''", "'")
+    return tab, a1
+
+def _parse_a1(a1):
+    """(row1, col1, row2, col2), 1-based inclusive; open ends are None."""
+    m = _A1_RE.match(a1.replace("$", ""))
+    if not m or not (m.group(1) or m.group(2)):
+        raise _bad_request(f"Unable to parse range: {a1}")
+    c1, r1, c2, r2 = m.groups()
+    if m.group(3) is None and m.group(4) is None:
+        c2, r2 = c1, r1
+    return (
+        int(r1) if r1 else 1, _col_to_num(c1) if c1 else 1,
+        int(r2) if r2 else None, _col_to_num(c2) if c2 else None,
+    )
+
+# ---- value conversion ----
+def _user_entered(v):
+    """Parse a USER_ENTERED input the way Sheets would (numbers, booleans, leading ')."""
+    if not isinstance(v, str):
+        return v
+    if v.startswith("'"):
+        return v[1:]
+    text = v.strip()
+    if text.upper() in ("TRUE", "FALSE"):
+        return text.upper() == "TRUE"
+    if text and not text.startswith("="):
+        try:
+            num = float(text.replace(",", ""))
+            return int(num) if num.is_integer() and "." not in text else num
+        except ValueError:
+            pass
+    return v
+
+def _formatted(v):
+    if v is None or v == "":
+        return ""
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+def _render(v, render):
+    if render == "FORMATTED_VALUE":
+        return _formatted(v)
+    return "" if v is None else v
+
+def _trim(rows):
+    """Drop trailing empty cells and rows, as the Sheets values API does."""
+    out = []
+    for row in rows:
+        end = len(row)
+        while end and row[end - 1] in ("", None):
+            end -= 1
+        out.append(row[:end])
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+def _numericise(v):
+    if isinstance(v, str) and v.strip():
+        try:
+            num = float(v.replace(",", ""))
+            return int(num) if num.is_integer() and "." not in v else num
+        except ValueError:
+            return v
+    return v
+
+class _FakeResponse:
+    """Just enough of requests.Response for gspread's APIError (and _is_retriable)."""
+    def __init__(self, status_code, message, status):
+        self.status_code = status_code
+        self.text = json.dumps({"error": {"code": status_code, "message": message, "status": status}})
+
+    def json(self):
+        return json.loads(self.text)
+
+def _api_error(status_code, message, status):
+    return APIError(_FakeResponse(status_code, message, status))
+
+def _bad_request(message):
+    return _api_error(400, message, "INVALID_ARGUMENT")
+
+# ---- backend: workbook store + request accounting ----
+class FakeSheetsBackend:
+    """
+    Holds the workbooks and accounts for requests.
+    - latency_ms / jitter_ms: sleep per request (jitter is uniform +/-).
+    - quota_rpm: read and write requests allowed per rolling minute (each kind has its own
+      bucket, like the real per-user quota); over it a request fails with a 429 APIError.
+    - store_path: JSON file the workbooks are loaded from and saved back to (None: memory only).
+    """
+    def __init__(self, store_path=None, latency_ms=0, jitter_ms=0, quota_rpm=60, autocreate=True, seed=None):
+        self.store_path = store_path
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.quota_rpm = int(quota_rpm)
+        self.autocreate = autocreate
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._windows = collections.defaultdict(collections.deque)
+        self.calls = []
+        self.started = time.time()
+        self.books = {}  # key -> {"title", "sheets": [{"id", "title", "rows", "cols", "values"}]}
+        if store_path and os.path.exists(store_path):
+            with open(store_path) as fh:
+                self.books = json.load(fh).get("spreadsheets", {})
+        self._sheet_ids = itertools.count(
+            max((s["id"] for b in self.books.values() for s in b["sheets"]), default=0) + 1
+        )
+
+    # ---- plumbing ----
+    def request(self, method, kind, fn):
+        """Run one would-be API request: quota check, latency, then fn() under the store lock."""
+        with self._lock:
+            now = time.time()
+            window = self._windows[kind]
+            while window and now - window[0] >= 60.0:
+                window.popleft()
+            rejected = self.quota_rpm > 0 and len(window) >= self.quota_rpm
+            if not rejected:
+                window.append(now)
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+        t0 = time.time()
+        if delay:
+            time.sleep(delay)
+        record = {"method": method, "kind": kind, "start": t0, "ok": False, "quota": rejected}
+        try:
+            if rejected:
+                raise _api_error(429, f"Quota exceeded for {kind} requests per minute [simulated]", "RESOURCE_EXHAUSTED")
+            with self._lock:
+                result = fn()
+            record["ok"] = True
+            return result
+        finally:
+            record["duration"] = time.time() - t0
+            with self._lock:
+                self.calls.append(record)
+
+    def save(self):
+        if not self.store_path:
+            return
+        with self._lock:
+            data = json.dumps({"spreadsheets": self.books})
+        tmp = f"{self.store_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            fh.write(data)
+        os.replace(tmp, self.store_path)
+
+    # ---- store ----
+    def find_book(self, key=None, title=None):
+        with self._lock:
+            if key is not None and key in self.books:
+                return key
+            for k, book in self.books.items():
+                if title is not None and book["title"] == title:
+                    return k
+            if not self.autocreate:
+                raise SpreadsheetNotFound(key or title)
+            key = key or "fake-" + hashlib.sha1(title.encode()).hexdigest()[:24]
+            self.books[key] = {"title": title or key, "sheets": []}
+            self.add_sheet(key, "Sheet1")
+            return key
+
+    def add_sheet(self, key, title, rows=_DEFAULT_ROWS, cols=_DEFAULT_COLS):
+        with self._lock:
+            props = {"id": next(self._sheet_ids), "title": title, "rows": int(rows), "cols": int(cols), "values": []}
+            self.books[key]["sheets"].append(props)
+            return props
+
+    def find_sheet(self, key, title):
+        with self._lock:
+            for props in self.books[key]["sheets"]:
+                if props["title"] == title:
+                    return props
+            if not self.autocreate:
+                raise WorksheetNotFound(title)
+            return self.add_sheet(key, title)
+
+    # ---- reporting ----
+    def report(self):
+        """Log the would-be API requests: count, reads/writes, quota rejections and latency per method."""
+        with self._lock:
+            calls = list(self.calls)
+        wall = max(time.time() - self.started, 1e-9)
+        if not calls:
+            logger.info("[fake sheets] no API requests made")
+            return {}
+
+        summary = {}
+        for c in calls:
+            s = summary.setdefault(c["method"], {"calls": 0, "errors": 0, "quota": 0, "total_s": 0.0, "kind": c["kind"]})
+            s["calls"] += 1
+            s["errors"] += 0 if c["ok"] else 1
+            s["quota"] += 1 if c["quota"] else 0
+            s["total_s"] += c["duration"]
+
+        reads = sum(1 for c in calls if c["kind"] == "read")
+        logger.info(
+            f"[fake sheets] {len(calls)} would-be API requests ({reads} reads, {len(calls) - reads} writes, "
+            f"{sum(s['quota'] for s in summary.values())} over quota) in {wall:.2f}s wall"
+        )
+        for method, s in sorted(summary.items()):
+            logger.info(
+                f"[fake sheets] {method} ({s['kind']}): {s['calls']} calls, {s['errors']} errors, "
+                f"avg {1000 * s['total_s'] / s['calls']:.1f}ms"
+            )
+        return summary
+
+# ---- gspread-shaped objects ----
+class FakeCell:
+    def __init__(self, row, col, value):
+        self.row = row
+        self.col = col
+        self.value = value
+
+    @property
+    def address(self):
+        return f"{_num_to_col(self.col)}{self.row}"
+
+class FakeWorksheet:
+    _fake_sheets = True
+
+    def __init__(self, spreadsheet, props):
+        self.spreadsheet = spreadsheet
+        self._backend = spreadsheet._backend
+        self._props = props
+
+    @property
+    def id(self):
+        return self._props["id"]
+
+    @property
+    def title(self):
+        return self._props["title"]
+
+    @property
+    def row_count(self):
+        return self._props["rows"]
+
+    @property
+    def col_count(self):
+        return self._props["cols"]
+
+    def __repr__(self):
+        return f"<FakeWorksheet {self.title!r} id:{self.id}>"
+
+    # ---- grid primitives (called with the backend lock held) ----
+    def _bounds(self, a1):
+        r1, c1, r2, c2 = _parse_a1(a1) if a1 else (1, 1, None, None)
+        values = self._props["values"]
+        last_row = max(self.row_count, len(values))
+        last_col = max([self.col_count] + [len(r) for r in values])
+        return r1, c1, r2 or last_row, c2 or last_col
+
+    def _read(self, a1, render="FORMATTED_VALUE"):
+        r1, c1, r2, c2 = self._bounds(a1)
+        rows = [
+            [_render(v, render) for v in row[c1 - 1:c2]]
+            for row in self._props["values"][r1 - 1:r2]
+        ]
+        return _trim(rows)
+
+    def _write(self, a1, rows, value_input_option="RAW"):
+        r1, c1, _, _ = _parse_a1(a1)
+        parse = _user_entered if value_input_option == "USER_ENTERED" else (lambda v: v)
+        grid = self._props["values"]
+        for i, row in enumerate(rows):
+            r = r1 - 1 + i
+            while len(grid) <= r:
+                grid.append([])
+            target = grid[r]
+            for j, v in enumerate(row):
+                if v is None:
+                    continue  # null leaves the cell unchanged, as in the API
+                c = c1 - 1 + j
+                if len(target) <= c:
+                    target.extend([""] * (c + 1 - len(target)))
+                target[c] = parse(v)
+        self._props["rows"] = max(self.row_count, r1 - 1 + len(rows))
+        self._props["cols"] = max(self.col_count, c1 - 1 + max((len(r) for r in rows), default=0))
+
+    def _clear(self, a1):
+        r1, c1, r2, c2 = self._bounds(a1)
+        for row in self._props["values"][r1 - 1:r2]:
+            for c in range(c1 - 1, min(c2, len(row))):
+                row[c] = ""
+
+    def _request(self, method, kind, fn):
+        return self._backend.request(method, kind, fn)
+
+    # ---- reads ----
+    def get(self, range_name=None, value_render_option="FORMATTED_VALUE", date_time_render_option=None, **kwargs):
+        return self._request("get", "read", lambda: self._read(range_name, value_render_option))
+
+    def get_values(self, range_name=None, value_render_option="FORMATTED_VALUE", **kwargs):
+        def _get():
+            rows = self._read(range_name, value_render_option)
+            width = max((len(r) for r in rows), default=0)
+            return [r + [""] * (width - len(r)) for r in rows]
+        return self._request("get_values", "read", _get)
+
+    def get_all_values(self, **kwargs):
+        return self.get_values(**kwargs)
+
+    def get_all_records(self, head=1, empty2zero=False, default_blank="", **kwargs):
+        rows = self.get_values()
+        if len(rows) < head:
+            return []
+        keys = rows[head - 1]
+        records = []
+        for row in rows[head:]:
+            values = [_numericise(v) if v != "" else (0 if empty2zero else default_blank) for v in row]
+            records.append(dict(zip(keys, values)))
+        return records
+
+    def row_values(self, row, value_render_option="FORMATTED_VALUE", **kwargs):
+        def _get():
+            rows = self._read(f"{row}:{row}", value_render_option)
+            return rows[0] if rows else []
+        return self._request("row_values", "read", _get)
+
+    def col_values(self, col, value_render_option="FORMATTED_VALUE", **kwargs):
+        def _get():
+            letter = _num_to_col(col)
+            return [r[0] if r else "" for r in self._read(f"{letter}:{letter}", value_render_option)]
+        return self._request("col_values", "read", _get)
+
+    def acell(self, label, value_render_option="FORMATTED_VALUE"):
+        r, c, _, _ = _parse_a1(label)
+        return self.cell(r, c, value_render_option=value_render_option)
+
+    def cell(self, row, col, value_render_option="FORMATTED_VALUE"):
+        def _get():
+            rows = self._read(f"{_num_to_col(col)}{row}", value_render_option)
+            value = rows[0][0] if rows and rows[0] else None
+            return FakeCell(row, col, value)
+        return self._request("cell", "read", _get)
+
+    # ---- writes ----
+    def update(self, *args, range_name=None, values=None, value_input_option="RAW", **kwargs):
+        # gspread 5 takes (range_name, values), gspread 6 (values, range_name): accept both
+        for arg in args:
+            if isinstance(arg, str) and range_name is None:
+                range_name = arg
+            elif values is None:
+                values = arg
+        if not isinstance(values, list):
+            values = [[values]]
+        elif values and not isinstance(values[0], list):
+            values = [values]
+        rng = range_name or "A1"
+        self._request("update", "write", lambda: self._write(rng, values, value_input_option))
+        return {"updatedRange": f"'{self.title}'!{rng}", "updatedRows": len(values)}
+
+    def update_acell(self, label, value):
+        self._request("update_acell", "write", lambda: self._write(label, [[value]], "USER_ENTERED"))
+
+    def update_cell(self, row, col, value):
+        self._request("update_cell", "write", lambda: self._write(f"{_num_to_col(col)}{row}", [[value]], "USER_ENTERED"))
+
+    def batch_update(self, data, value_input_option="RAW", **kwargs):
+        def _apply():
+            for item in data:
+                self._write(item["range"], item["values"], value_input_option)
+        self._request("batch_update", "write", _apply)
+        return {"totalUpdatedCells": sum(len(r) for item in data for r in item["values"])}
+
+    def batch_clear(self, ranges):
+        def _apply():
+            for a1 in ranges:
+                self._clear(a1)
+        self._request("batch_clear", "write", _apply)
+
+    def clear(self):
+        self._request("clear", "write", lambda: self._props.__setitem__("values", []))
+
+    def append_rows(self, values, value_input_option="RAW", **kwargs):
+        def _apply():
+            start = len(_trim([list(r) for r in self._props["values"]])) + 1
+            self._write(f"A{start}", values, value_input_option)
+        self._request("append_rows", "write", _apply)
+
+    def append_row(self, values, value_input_option="RAW", **kwargs):
+        self.append_rows([values], value_input_option=value_input_option)
+
+    def sort(self, *specs, range=None):
+        def _key(col, row):
+            v = row[col - 1] if col - 1 < len(row) else ""
+            blank = v in ("", None)
+            if isinstance(v, bool):
+                return (blank, 2, v)
+            if isinstance(v, (int, float)):
+                return (blank, 0, v)
+            return (blank, 1, str(v).lower())
+
+        def _apply():
+            a1 = range or f"A2:{_num_to_col(self.col_count)}{self.row_count}"
+            r1, c1, r2, c2 = self._bounds(a1)
+            grid = self._props["values"]
+            block = [list(row[c1 - 1:c2]) for row in grid[r1 - 1:r2]]
+            for col, order in reversed(specs):
+                rel = col - c1 + 1
+                blanks = [r for r in block if _key(rel, r)[0]]
+                filled = [r for r in block if not _key(rel, r)[0]]
+                filled.sort(key=lambda r: _key(rel, r), reverse=(order == "des"))
+                block = filled + blanks  # blanks stay last either way, like Sheets
+            for i, row in enumerate(block):
+                target = grid[r1 - 1 + i]
+                if len(target) < c1 - 1 + len(row):
+                    target.extend([""] * (c1 - 1 + len(row) - len(target)))
+                target[c1 - 1:c1 - 1 + len(row)] = row
+        self._request("sort", "write", _apply)
+
+class FakeSpreadsheet:
+    _fake_sheets = True
+
+    def __init__(self, client, key):
+        self.client = client
+        self._backend = client._backend
+        self.id = key
+
+    @property
+    def title(self):
+        return self._backend.books[self.id]["title"]
+
+    @property
+    def sheet1(self):
+        return self.get_worksheet(0)
+
+    def __repr__(self):
+        return f"<FakeSpreadsheet {self.title!r} id:{self.id}>"
+
+    def _sheet_props(self):
+        return self._backend.books[self.id]["sheets"]
+
+    def fetch_sheet_metadata(self, params=None):
+        def _meta():
+            return {
+                "spreadsheetId": self.id,
+                "properties": {"title": self.title},
+                "sheets": [
+                    {"properties": {
+                        "sheetId": p["id"], "title": p["title"], "index": i,
+                        "gridProperties": {"rowCount": p["rows"], "columnCount": p["cols"]},
+                    }}
+                    for i, p in enumerate(self._sheet_props())
+                ],
+            }
+        return self._backend.request("fetch_sheet_metadata", "read", _meta)
+
+    def worksheet(self, title):
+        props = self._backend.request("worksheet", "read", lambda: self._backend.find_sheet(self.id, title))
+        return FakeWorksheet(self, props)
+
+    def worksheets(self):
+        props = self._backend.request("worksheets", "read", lambda: list(self._sheet_props()))
+        return [FakeWorksheet(self, p) for p in props]
+
+    def get_worksheet(self, index):
+        sheets = self.worksheets()
+        return sheets[index] if index < len(sheets) else None
+
+    def add_worksheet(self, title, rows=_DEFAULT_ROWS, cols=_DEFAULT_COLS, index=None):
+        props = self._backend.request("add_worksheet", "write", lambda: self._backend.add_sheet(self.id, title, rows, cols))
+        return FakeWorksheet(self, props)
+
+    def del_worksheet(self, worksheet):
+        def _delete():
+            self._backend.books[self.id]["sheets"] = [p for p in self._sheet_props() if p["id"] != worksheet.id]
+        self._backend.request("del_worksheet", "write", _delete)
+
+    # ---- spreadsheets.values.* ----
+    def _resolve(self, rng):
+        tab, a1 = _split_tab(rng)
+        props = self._backend.find_sheet(self.id, tab) if tab else self._sheet_props()[0]
+        return FakeWorksheet(self, props), a1
+
+    def values_get(self, range, params=None):
+        render = (params or {}).get("valueRenderOption", "FORMATTED_VALUE")
+        def _get():
+            ws, a1 = self._resolve(range)
+            return {"range": range, "majorDimension": "ROWS", "values": ws._read(a1, render)}
+        return self._backend.request("values_get", "read", _get)
+
+    def values_batch_get(self, ranges, params=None):
+        render = (params or {}).get("valueRenderOption", "FORMATTED_VALUE")
+        def _get():
+            value_ranges = []
+            for rng in ranges:
+                ws, a1 = self._resolve(rng)
+                value_ranges.append({"range": rng, "majorDimension": "ROWS", "values": ws._read(a1, render)})
+            return {"spreadsheetId": self.id, "valueRanges": value_ranges}
+        return self._backend.request("values_batch_get", "read", _get)
+
+    def values_update(self, range, params=None, body=None):
+        option = (params or {}).get("valueInputOption", "RAW")
+        def _apply():
+            ws, a1 = self._resolve(range)
+            ws._write(a1 or "A1", (body or {}).get("values", []), option)
+        return self._backend.request("values_update", "write", _apply)
+
+    def values_batch_update(self, body=None):
+        body = body or {}
+        option = body.get("valueInputOption", "RAW")
+        def _apply():
+            for item in body.get("data", []):
+                ws, a1 = self._resolve(item["range"])
+                ws._write(a1 or "A1", item["values"], option)
+            return {"spreadsheetId": self.id, "totalUpdatedRanges": len(body.get("data", []))}
+        return self._backend.request("values_batch_update", "write", _apply)
+
+    def values_clear(self, range):
+        def _apply():
+            ws, a1 = self._resolve(range)
+            ws._clear(a1)
+        return self._backend.request("values_clear", "write", _apply)
+
+    def values_batch_clear(self, params=None, body=None):
+        def _apply():
+            for rng in (body or {}).get("ranges", []):
+                ws, a1 = self._resolve(rng)
+                ws._clear(a1)
+            return {"spreadsheetId": self.id, "clearedRanges": list((body or {}).get("ranges", []))}
+        return self._backend.request("values_batch_clear", "write", _apply)
+
+class FakeClient:
+    _fake_sheets = True
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def open(self, title, folder_id=None):
+        # gspread: a Drive files.list + the metadata fetch
+        key = self._backend.request("open", "read", lambda: self._backend.find_book(title=title))
+        return FakeSpreadsheet(self, key)
+
+    def open_by_key(self, key):
+        key = self._backend.request("open_by_key", "read", lambda: self._backend.find_book(key=key))
+        return FakeSpreadsheet(self, key)
+
+    def open_by_url(self, url):
+        m = re.search(r"/d/([a-zA-Z0-9-_]+)", url)
+        if not m:
+            raise SpreadsheetNotFound(url)
+        return self.open_by_key(m.group(1))
+
+    def create(self, title, folder_id=None):
+        def _create():
+            key = "fake-" + hashlib.sha1(f"{title}{time.time()}".encode()).hexdigest()[:24]
+            self._backend.books[key] = {"title": title, "sheets": []}
+            self._backend.add_sheet(key, "Sheet1")
+            return key
+        return FakeSpreadsheet(self, self._backend.request("create", "write", _create))
+
+# ---- process-wide backend ----
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+def _at_exit(backend):
+    backend.report()
+    try:
+        backend.save()
+    except OSError as e:
+        logger.error(f"[fake sheets] could not save {backend.store_path}: {e}")
+
+def fake_client(spec="memory"):
+    """
+    FakeClient over the process-wide backend (created on first use; its report is
+    logged, and a JSON store saved, at exit). spec: "memory" or a JSON store path.
+    """
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            store = None if spec == "memory" else spec
+            _BACKEND = FakeSheetsBackend(
+                store_path=store, latency_ms=FAKE_LATENCY_MS, jitter_ms=FAKE_JITTER_MS,
+                quota_rpm=FAKE_QUOTA_RPM, autocreate=FAKE_AUTOCREATE,
+            )
+            atexit.register(_at_exit, _BACKEND)
+            logger.info(
+                f"Using fake Sheets backend ({store or 'in-memory'}): latency={FAKE_LATENCY_MS}ms±{FAKE_JITTER_MS}ms, "
+                f"quota={FAKE_QUOTA_RPM or 'off'} req/min per kind, autocreate={FAKE_AUTOCREATE}"
+            )
+        return FakeClient(_BACKEND)
@@ -1,59 +1,199 @@
 import logging
 import subprocess
+import threading
 from kite_session_vs import get_kite
-from google_sheets_utils_vs import get_gsheet_client
+from google_sheets_utils_vs import get_gsheet_client, governed, normalize_cell, write_table_diff
 
 # Google Sheet details
 PORTFOLIO_SHEET_ID = "145TqrpQ3Twx6Tezh28s5GnbowlBb_qcY5UM1RvfIclI"
 ZERODHA_GTT_DATA = "ZERODHA_GTT_DATA"
 
+GTT_HEADERS = [
+    "GTT ID", "Symbol", "Exchange", "Trigger Type", "Trigger Value", "Order Price",
+    "Order Qty", "Order Type", "Product", "Transaction Type", "Status",
+]
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
 
-def fetch_all_gtts():
-    kite = get_kite()
+def format_gtt_row(g):
+    order = g['orders'][0] if g['orders'] else {}
+    condition = g.get("condition", {})
+    trigger_values = condition.get("trigger_values", [])
+
+    return {
+        "GTT ID": g.get("id"),
+        "Symbol": condition.get("tradingsymbol"),
+        "Exchange": condition.get("exchange"),
+        "Trigger Type": g.get("type"),
+        "Trigger Value": trigger_values[0] if trigger_values else None,
+        "Order Price": order.get("price"),
+        "Order Qty": order.get("quantity"),
+        "Order Type": order.get("order_type"),
+        "Product": order.get("product"),
+        "Transaction Type": order.get("transaction_type"),
+        "Status": g.get("status")
+    }
+
+def single_gtt_row(exchange, symbol, side, quantity, order_price, trigger_value):
+    """
+    Row for an active single-leg GTT this repo just placed/modified, built through
+    format_gtt_row from the values sent to Kite, so it matches what a fresh get_gtts() writes.
+    """
+    return format_gtt_row({
+        "type": "single",
+        "status": "active",
+        "condition": {"exchange": exchange, "tradingsymbol": symbol, "trigger_values": [trigger_value]},
+        "orders": [{
+            "price": order_price,
+            "quantity": quantity,
+            "order_type": "LIMIT",
+            "product": "CNC",
+            "transaction_type": side,
+        }],
+    })
+
+def _row_values(row):
+    return [row.get(h, "") for h in GTT_HEADERS]
+
+def _norm_row(values):
+    return tuple(normalize_cell(v) for v in values)
+
+def _active_signature(rows):
+    """{gtt_id: normalized row} for active GTTs only (used by the drift check)."""
+    status_ix = GTT_HEADERS.index("Status")
+    return {
+        normalize_cell(values[0]): _norm_row(values)
+        for values in rows
+        if str(values[status_ix] or "").strip().lower() == "active"
+    }
+
+class GttBook:
+    """
+    In-memory model of the Kite GTT book, mirrored to the ZERODHA_GTT_DATA tab.
+    - load(gtts=None): one get_gtts() (or a response the caller already has) + one read of the tab; the tab is only rewritten if it drifted.
+    - upsert()/mark_deleted(): apply place/modify/delete results (thread-safe); deleted GTTs
+      leave the book, like they do on a fresh fetch.
+    - flush(): write only the inserted/changed rows in one batch_update (a diff rewrite
+      of the tab when rows were deleted, so the rows below move up).
+    - verify(): drift check against a fresh get_gtts(); full re-sync only if it fails.
+    """
+    def __init__(self, kite, sheet):
+        self.kite = kite
+        self.sheet = governed(sheet)  # load()/flush() reads and writes go through the shared quota limiter
+        self.rows = {}         # gtt_id -> row values (GTT_HEADERS order)
+        self.row_numbers = {}  # gtt_id -> 1-based sheet row
+        self.dirty = set()
+        self.deleted = False
+        self.next_row = 2
+        self._lock = threading.Lock()
+
+    def _fetch_rows(self, gtts=None):
+        # deleted GTTs Kite still lists are left out, so a fresh sync and an incremental one
+        # (mark_deleted) leave the same tab
+        if gtts is None:
+            gtts = self.kite.get_gtts()
+        return [_row_values(format_gtt_row(g)) for g in gtts or [] if str(g.get("status", "")).lower() != "deleted"]
+
+    def _set_model(self, rows):
+        self.rows = {}
+        self.row_numbers = {}
+        self.dirty = set()
+        self.deleted = False
+        for i, values in enumerate(rows):
+            gtt_id = values[0]
+            self.rows[gtt_id] = list(values)
+            self.row_numbers[gtt_id] = i + 2
+        self.next_row = len(rows) + 2
+
+    def full_write(self, rows, previous=None):
+        # Diff against what the tab holds (previous: values already read by load())
+        stats = write_table_diff(self.sheet, [GTT_HEADERS] + rows, previous=previous)
+        self._set_model(rows)
+        logging.info(
+            f"✅ {len(rows)} GTTs written to sheet: {ZERODHA_GTT_DATA} "
+            f"({stats['cells']} cells changed in {stats['ranges']} ranges)"
+        )
+
+    def load(self, gtts=None):
+        # gtts: an already-fetched get_gtts() response, to avoid a second API read
+        rows = self._fetch_rows(gtts)
+        if not rows:
+            logging.info("No GTTs found.")  # the tab is still synced, so rows of earlier GTTs are cleared
+
+        sheet_values = self.sheet.get("A1:K", value_render_option="UNFORMATTED_VALUE")
+        in_sync = (
+            bool(sheet_values)
+            and [str(h).strip() for h in sheet_values[0]] == GTT_HEADERS
+            and [_norm_row(r + [""] * (len(GTT_HEADERS) - len(r))) for r in sheet_values[1:]]
+            == [_norm_row(r) for r in rows]
+        )
+        if in_sync:
+            self._set_model(rows)
+            logging.info(f"✅ {ZERODHA_GTT_DATA} already in sync with Kite ({len(rows)} GTTs); no write needed")
+        else:
+            self.full_write(rows, previous=sheet_values)
+        return self
+
+    def upsert(self, gtt_id, row):
+        values = _row_values(dict(row, **{"GTT ID": gtt_id}))
+        with self._lock:
+            if gtt_id not in self.row_numbers:
+                self.row_numbers[gtt_id] = self.next_row
+                self.next_row += 1
+            self.rows[gtt_id] = values
+            self.dirty.add(gtt_id)
+
+    def mark_deleted(self, gtt_id):
+        with self._lock:
+            if self.rows.pop(gtt_id, None) is None:
+                return
+            del self.row_numbers[gtt_id]
+            self.dirty.discard(gtt_id)
+            self.deleted = True
+
+    def flush(self):
+        with self._lock:
+            if self.deleted:
+                # rows below a deleted GTT move up: diff-rewrite the tab (one read, changed cells only)
+                rows = [self.rows[gid] for gid in sorted(self.rows, key=lambda gid: self.row_numbers[gid])]
+                self.full_write(rows)
+                return len(rows)
+            dirty = sorted(self.dirty, key=lambda gid: self.row_numbers[gid])
+            self.dirty = set()
+            if not dirty:
+                return 0
+            updates = [
+                {"range": f"A{self.row_numbers[gid]}:K{self.row_numbers[gid]}", "values": [self.rows[gid]]}
+                for gid in dirty
+            ]
+        self.sheet.batch_update(updates)
+        logging.info(f"✅ {len(updates)} changed GTT rows written to sheet: {ZERODHA_GTT_DATA}")
+        return len(updates)
+
+    def verify(self):
+        """Drift check: compare the active GTTs in the model with a fresh get_gtts()."""
+        fresh = self._fetch_rows()
+        with self._lock:
+            model_rows = list(self.rows.values())
+        if _active_signature(fresh) == _active_signature(model_rows):
+            self.flush()
+            logging.info(f"✅ GTT book drift check passed ({len(fresh)} GTTs)")
+            return True
+        logging.warning("GTT book drift detected → full re-sync of ZERODHA_GTT_DATA")
+        self.full_write(fresh)
+        return False
+
+def open_gtt_book(kite=None, client=None, gtts=None):
+    kite = kite or get_kite()
+    client = governed(client or get_gsheet_client())
+    sheet = client.open_by_key(PORTFOLIO_SHEET_ID).worksheet(ZERODHA_GTT_DATA)
+    return GttBook(kite, sheet).load(gtts)
+
+def fetch_all_gtts(kite=None):
     try:
-        gtts = kite.get_gtts()
-        if not gtts:
-            logging.info("No GTTs found.")
-            return
-        
-        formatted = []
-        for g in gtts:
-            order = g['orders'][0] if g['orders'] else {}
-            condition = g.get("condition", {})
-            trigger_values = condition.get("trigger_values", [])
-            
-            row = {
-                "GTT ID": g.get("id"),
-                "Symbol": condition.get("tradingsymbol"),
-                "Exchange": condition.get("exchange"),
-                "Trigger Type": g.get("type"),
-                "Trigger Value": trigger_values[0] if trigger_values else None,
-                "Order Price": order.get("price"),
-                "Order Qty": order.get("quantity"),
-                "Order Type": order.get("order_type"),
-                "Product": order.get("product"),
-                "Transaction Type": order.get("transaction_type"),
-                "Status": g.get("status")
-            }
-            formatted.append(row)
-            # logging.info(f"GTT Row: {row}")
-        
-        client = get_gsheet_client()
-        sheet = client.open_by_key(PORTFOLIO_SHEET_ID).worksheet(ZERODHA_GTT_DATA)
-        
-        # Prepare headers and rows
-        headers = list(formatted[0].keys())
-        values = [headers] + [[row.get(h, "") for h in headers] for row in formatted]
-        
-        # Write to sheet
-        sheet.clear()
-        sheet.update(range_name="A1", values=values)
-        
-        logging.info(f"✅ {len(formatted)} GTTs written to sheet: {ZERODHA_GTT_DATA}")
-        
+        return open_gtt_book(kite=kite)
     except Exception as e:
         logging.error(f"❌ Failed to fetch/write GTTs: {e}")
 
 if __name__ == "__main__":
-    fetch_all_gtts()
\ No newline at end of file
+    fetch_all_gtts()
@@ -1,6 +1,6 @@
 import logging
 from kite_session_vs import get_kite
-from google_sheets_utils_vs import get_gsheet_client
+from google_sheets_utils_vs import get_gsheet_client, write_table_diff
 from datetime import datetime
 
 PORTFOLIO_SHEET_ID = "145TqrpQ3Twx6Tezh28s5GnbowlBb_qcY5UM1RvfIclI"
@@ -52,9 +52,11 @@ def fetch_all_orders():
                 processed_row.append(val)
             values.append(processed_row)
         
-        sheet.clear()
-        sheet.update(values=values, range_name="A1")
-        logging.info(f"✅ {len(formatted)} orders written to sheet: {ORDERS_SHEET}")
+        stats = write_table_diff(sheet, values)
+        logging.info(
+            f"✅ {len(formatted)} orders written to sheet: {ORDERS_SHEET} "
+            f"({stats['cells']} cells changed in {stats['ranges']} ranges)"
+        )
 
         # ---- Post Check: LATEST_ORDERS!I1 ----
         latest_orders_sheet = client.open_by_key(PORTFOLIO_SHEET_ID).worksheet(LATEST_ORDERS_TAB)
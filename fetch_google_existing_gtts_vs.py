@@ -2,7 +2,7 @@
 import logging
 import argparse
 
-from google_sheets_utils_vs import get_gsheet_client, read_rows_from_sheet
+from google_sheets_utils_vs import get_gsheet_client, read_rows_from_sheet, read_all_rows_from_sheet
 
 # --- Batch size: single source of truth from config_vs.py ---
 try:
@@ -39,7 +39,22 @@ def fetch_existing_gtts_batch(sheet, start_row):
     return raw_records, filtered_records
 
 
-def get_tracking_sheet(sheet_id=None, sheet_name=None):
+def fetch_all_existing_gtts(sheet, start_row=2, columns=None):
+    """
+    Run-scoped snapshot of the whole tracking sheet: one read from `start_row`
+    to the last row, regardless of BATCH_SIZE.
+    columns: optional header names to fetch (the other columns are not requested).
+    """
+    raw_records = read_all_rows_from_sheet(sheet, start_row=start_row, as_dict=True, columns=columns)
+    if not raw_records:
+        return [], []
+
+    filtered_records = [row for row in raw_records if any(str(v).strip() for v in row.values())]
+    logging.info(f"Fetched {len(filtered_records)} existing GTT records (full sheet from row {start_row}, raw_returned {len(raw_records)})")
+    return raw_records, filtered_records
+
+
+def get_tracking_sheet(sheet_id=None, sheet_name=None, client=None):
     if sheet_id is None:
         sheet_id = getattr(config_vs, "DATA_MANAGEMENT_SHEET_ID", None)
     if sheet_name is None:
@@ -48,7 +63,7 @@ def get_tracking_sheet(sheet_id=None, sheet_name=None):
     if not sheet_id or not sheet_name:
         raise ValueError("sheet_id and sheet_name must be provided either as args or via config_vs")
 
-    client = get_gsheet_client()
+    client = client or get_gsheet_client()
     sheet = client.open_by_key(sheet_id).worksheet(sheet_name)
 
     logging.info(f"Accessed GTT sheet: {sheet_name}")
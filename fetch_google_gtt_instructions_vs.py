@@ -2,7 +2,7 @@
 import logging
 import argparse
 
-from google_sheets_utils_vs import get_gsheet_client, read_rows_from_sheet
+from google_sheets_utils_vs import get_gsheet_client, read_rows_from_sheet, iter_row_batches
 
 # --- Batch size: single source of truth from config_vs.py ---
 try:
@@ -23,17 +23,52 @@ except Exception as e:
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
 
-def fetch_gtt_instructions_batch(sheet, start_row):
+# The only instruction columns gtt_processor_vs reads; formula/helper columns are not fetched
+INSTRUCTION_COLUMNS = ("TICKER", "TYPE", "ACTION", "UNITS", "METHOD", "GTT PRICE", "LIVE PRICE")
+
+def number_instructions(first_row, raw_instructions):
+    # (sheet row number, row) for each non-empty row; numbered before filtering so
+    # rows after a blank one keep their real row number
+    return [
+        (first_row + idx, row) for idx, row in enumerate(raw_instructions)
+        if any(str(v).strip() for v in row.values())
+    ]
+
+def fetch_gtt_instructions_batch(sheet, start_row, max_row=None):
+    # Returns (raw_instructions, filtered_instructions); filtered holds (row_number, row) pairs
+    # max_row: last data row if the caller knows it, so the tail batch doesn't read empty rows
     effective_batch = BATCH_SIZE
+    if max_row is not None:
+        effective_batch = min(BATCH_SIZE, max_row - start_row + 1)
+        if effective_batch <= 0:
+            return [], []
 
-    raw_instructions = read_rows_from_sheet(sheet, start_row=start_row, num_rows=effective_batch, as_dict=True)
-    filtered_instructions = [row for row in raw_instructions if any(str(v).strip() for v in row.values())]
+    raw_instructions = read_rows_from_sheet(
+        sheet, start_row=start_row, num_rows=effective_batch, as_dict=True, columns=INSTRUCTION_COLUMNS
+    )
+    filtered_instructions = number_instructions(start_row, raw_instructions)
 
     logging.info(f"Fetched {len(filtered_instructions)} instructions from row {start_row} (requested {effective_batch}, raw_returned {len(raw_instructions)})")
     return raw_instructions, filtered_instructions
 
-
-def get_instructions_sheet(sheet_id=None, sheet_name=None):
+def iter_gtt_instruction_batches(sheet, start_row=2, max_row=None):
+    """
+    Yields (start_row, raw_instructions, filtered_instructions) per BATCH_SIZE rows,
+    same shape as fetch_gtt_instructions_batch: filtered_instructions holds
+    (row_number, row) pairs for the non-empty rows. The next batch is read in the
+    background while the caller processes the current one; iteration ends at the
+    last data row instead of after empty batches.
+    """
+    batches = iter_row_batches(
+        sheet, start_row=start_row, batch_size=BATCH_SIZE, max_row=max_row, as_dict=True, columns=INSTRUCTION_COLUMNS
+    )
+    for first_row, raw_instructions in batches:
+        filtered_instructions = number_instructions(first_row, raw_instructions)
+        logging.info(f"Fetched {len(filtered_instructions)} instructions from row {first_row} (raw_returned {len(raw_instructions)})")
+        yield first_row, raw_instructions, filtered_instructions
+
+
+def get_instructions_sheet(sheet_id=None, sheet_name=None, client=None):
     if sheet_id is None:
         sheet_id = getattr(config_vs, "INSTRUCTION_SHEET_ID", None)
     if sheet_name is None:
@@ -42,7 +77,7 @@ def get_instructions_sheet(sheet_id=None, sheet_name=None):
     if not sheet_id or not sheet_name:
         raise ValueError("sheet_id and sheet_name must be provided either as args or via config_vs")
 
-    client = get_gsheet_client()
+    client = client or get_gsheet_client()
     sheet = client.open_by_key(sheet_id).worksheet(sheet_name)
 
     logging.info(f"Accessed instructions sheet: {sheet_name}")
@@ -81,16 +116,10 @@ if __name__ == "__main__":
     # open sheet
     sheet = get_instructions_sheet(sheet_id, sheet_name)
 
-    # paginate using BATCH_SIZE
+    # paginate using BATCH_SIZE (next batch prefetched while this one is collected)
     all_instructions = []
-    cur_row = start_row
-    while True:
-        raw_batch, filtered_batch = fetch_gtt_instructions_batch(sheet, cur_row)
-        raw_read = len(raw_batch)
-        if raw_read == 0:
-            break
-        all_instructions.extend(filtered_batch)
-        cur_row += raw_read
+    for _, raw_batch, filtered_batch in iter_gtt_instruction_batches(sheet, start_row):
+        all_instructions.extend(row for _, row in filtered_batch)
         if len(all_instructions) > 200000:
             logging.warning("Aborting fetch_all after 200k rows as safety limit")
             break
@@ -3,8 +3,7 @@
 import logging
 from kite_session_vs import get_kite
 
-import gspread
-from google.oauth2.service_account import Credentials
+import google_sheets_utils_vs
 
 CREDS_PATH = "/Users/sugamkuchhal/Documents/kite-gtt-demo-vs/creds_vs.json"
 SHEET_NAME = "VS Portfolio"
@@ -13,12 +12,7 @@ TAB_NAME = "ZERODHA_PORTFOLIO"
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
 
 def get_gsheet_client():
-    scopes = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = Credentials.from_service_account_file(CREDS_PATH, scopes=scopes)
-    return gspread.authorize(creds)
+    return google_sheets_utils_vs.get_gsheet_client(CREDS_PATH)
 
 def fetch_holdings():
     kite = get_kite()
@@ -55,13 +49,12 @@ def write_to_gsheet(holdings):
 
     # Connect to Google Sheet
     gc = get_gsheet_client()
-    sh = gc.open(SHEET_NAME)
+    sh = google_sheets_utils_vs.open_spreadsheet(gc, SHEET_NAME)
     ws = sh.worksheet(TAB_NAME)
 
-    # Clear existing content and update with new data
-    ws.clear()
-    ws.update(values=data, range_name='A1')
-    logging.info(f"✅ Holdings written to {SHEET_NAME} [{TAB_NAME}]")
+    # Write only the cells that changed since the last run (rows past the new end are blanked)
+    stats = google_sheets_utils_vs.write_table_diff(ws, data)
+    logging.info(f"✅ Holdings written to {SHEET_NAME} [{TAB_NAME}] ({stats['cells']} cells changed in {stats['ranges']} ranges)")
 
 def check_portfolio_discrepancy():
     SHEET_NAME = "VS Portfolio"
@@ -69,7 +62,7 @@ def check_portfolio_discrepancy():
     CELL = "U1"
     CELL_CHECK = "V1"
     gc = get_gsheet_client()
-    sh = gc.open(SHEET_NAME)
+    sh = google_sheets_utils_vs.open_spreadsheet(gc, SHEET_NAME)
     ws = sh.worksheet(TAB_NAME)
     try:
         cell_value = ws.acell(CELL).value
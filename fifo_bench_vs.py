@@ -0,0 +1,243 @@
+# fifo_bench_vs.py
+#
+# Benchmark + correctness harness for the FIFO engine (fifo_engine_vs), with no
+# Sheets I/O: it generates reproducible synthetic ALL_ORDERS histories, times
+# compute_fifo() per engine / worker count and the checkpointed incremental path
+# (apply_new_orders + outputs_from_states), reports peak Python/numpy memory
+# (tracemalloc), and checks every output table against a golden reference.
+#
+#   python3 fifo_bench_vs.py                                   # 1k/50, 100k/500
+#   python3 fifo_bench_vs.py --sizes 1000000:5000 --engines numpy --workers 1 4
+#   python3 fifo_bench_vs.py --golden-dir bench_golden         # save/reuse goldens
+#
+# The golden reference is the "python" engine (the original row loop) run in-process;
+# with --golden-dir it is stored per (orders, tickers, seed) and reused, so later
+# engine changes are compared against the same tables.
+
+import argparse
+import json
+import math
+import os
+import pickle
+import random
+import time
+import tracemalloc
+from collections import Counter
+
+import pandas as pd
+
+from fifo_engine_vs import (
+    OUTPUT_TABS, compute_fifo, apply_new_orders, outputs_from_states, dump_states, load_states
+)
+
+DEFAULT_SIZES = ["1000:50", "100000:500"]
+CATEGORIES = ["LARGE CAP", "MID CAP", "SMALL CAP", "ETF"]
+METHODS = ["GTT", "MKT", "SIP", "TSL"]
+START_DATE = pd.Timestamp("2019-01-01")
+HISTORY_DAYS = 2000
+TODAY = START_DATE + pd.Timedelta(days=HISTORY_DAYS + 7)  # fixed, so goldens stay valid
+
+# --- SYNTHETIC ORDERS ---
+def generate_orders(n_orders, n_tickers, seed=0):
+    """
+    Reproducible ALL_ORDERS history in get_all_records() shape, sorted by DATE like the sheet.
+    - activity per ticker is skewed (a few names trade a lot, most rarely)
+    - SELLs are mostly partial (a slice of the holding, spanning one or more lots), ~20% are
+      full exits and ~2% oversell (data-entry errors the engine has to absorb)
+    - PRICE is sometimes text with thousands separators, DATE is day-first text
+    """
+    rng = random.Random(seed)
+    tickers = [f"NSE:SYM{i:04d}" for i in range(n_tickers)]
+    weights = [1 / (i + 1) ** 0.8 for i in range(n_tickers)]
+    counts = Counter(rng.choices(range(n_tickers), weights=weights, k=n_orders))
+
+    rows = []
+    order_id = 250000000000
+    for t in range(n_tickers):
+        n = counts.get(t, 0)
+        if not n:
+            continue
+        category = rng.choice(CATEGORIES)
+        price = rng.uniform(20, 4000)
+        held = 0
+        for day in sorted(rng.randrange(HISTORY_DAYS) for _ in range(n)):
+            price = max(1.0, price * math.exp(rng.gauss(0, 0.02)))
+            if held == 0 or rng.random() < 0.6:
+                trade_type, units = "BUY", rng.randint(1, 200)
+                held += units
+            else:
+                r = rng.random()
+                if r < 0.2:
+                    units = held                              # full exit
+                elif r < 0.22:
+                    units = held + rng.randint(1, 20)         # oversell
+                else:
+                    units = rng.randint(1, held)              # partial
+                trade_type = "SELL"
+                held = max(held - units, 0)
+            order_id += 1
+            rows.append({
+                'Order ID': order_id,
+                'TICKER': tickers[t],
+                'CATEGORY': category,
+                'TYPE': trade_type,
+                'UNITS': units,
+                'PRICE': f"{price:,.2f}" if price >= 1000 and rng.random() < 0.3 else round(price, 2),
+                'DATE': day,
+                'METHOD': rng.choice(METHODS),
+            })
+    rows.sort(key=lambda row: row['DATE'])
+    for row in rows:
+        row['DATE'] = (START_DATE + pd.Timedelta(days=row['DATE'])).strftime("%d-%m-%Y")
+    return rows
+
+def split_last_days(orders, n_new):
+    """(history, appended): the last whole days holding about n_new orders, like one EOD append."""
+    if not orders:
+        return orders, []
+    cutoff = orders[max(len(orders) - n_new, 0)]['DATE']
+    first_new = next(i for i, row in enumerate(orders) if row['DATE'] == cutoff)
+    if first_new == 0:
+        # everything is on one day: nothing can be appended after a whole day
+        return orders, []
+    return orders[:first_new], orders[first_new:]
+
+# --- MEASUREMENT ---
+def _timed(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def _peak_mb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+def _same(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    if a is pd.NaT or b is pd.NaT:
+        return a is b
+    return type(a) is type(b) and a == b
+
+def compare_outputs(expected, actual):
+    """None if every table matches exactly (values and types), else the first difference."""
+    for tab in OUTPUT_TABS:
+        exp_rows, act_rows = expected[tab], actual[tab]
+        if len(exp_rows) != len(act_rows):
+            return f"{tab}: {len(act_rows)} rows, expected {len(exp_rows)}"
+        for i, (exp, act) in enumerate(zip(exp_rows, act_rows)):
+            if list(exp) != list(act):
+                return f"{tab} row {i}: columns {list(act)}, expected {list(exp)}"
+            for col in exp:
+                if not _same(exp[col], act[col]):
+                    return f"{tab} row {i} {col}: {act[col]!r}, expected {exp[col]!r}"
+    return None
+
+def load_golden(orders, n_orders, n_tickers, seed, golden_dir):
+    path = golden_dir and os.path.join(golden_dir, f"fifo_golden_{n_orders}_{n_tickers}_{seed}.pkl")
+    if path and os.path.exists(path):
+        with open(path, "rb") as fh:
+            return pickle.load(fh), "stored"
+    golden = compute_fifo(orders, today=TODAY, engine="python", workers=1)
+    if path:
+        os.makedirs(golden_dir, exist_ok=True)
+        with open(path, "wb") as fh:
+            pickle.dump(golden, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    return golden, "python engine"
+
+# --- CASES ---
+def bench_size(n_orders, n_tickers, args):
+    print(f"\n⏱️ {n_orders:,} orders across {n_tickers:,} tickers (seed {args.seed})")
+    started = time.perf_counter()
+    orders = generate_orders(n_orders, n_tickers, args.seed)
+    print(f"   generated in {time.perf_counter() - started:.2f}s")
+
+    golden, source = load_golden(orders, n_orders, n_tickers, args.seed, args.golden_dir)
+    print(f"   golden: {source} ({', '.join(f'{tab} {len(golden[tab]):,}' for tab in OUTPUT_TABS)})")
+
+    results = []
+    def record(case, engine, workers, seconds, peak, outputs):
+        diff = compare_outputs(golden, outputs)
+        results.append({
+            "orders": n_orders, "tickers": n_tickers, "case": case, "engine": engine, "workers": workers,
+            "seconds": round(seconds, 4), "orders_per_s": round(n_orders / seconds) if seconds else None,
+            "peak_mb": None if peak is None else round(peak, 1), "golden_ok": diff is None, "diff": diff,
+        })
+        status = "✅" if diff is None else f"❌ {diff}"
+        peak_text = "" if peak is None else f", peak {peak:.1f} MB"
+        print(f"   {case:<12} {engine:<6} workers={workers:<2} {seconds:8.3f}s{peak_text}  {status}")
+
+    for engine in args.engines:
+        if engine == "python" and n_orders > args.max_python_orders:
+            print(f"   full         python skipped (> --max-python-orders {args.max_python_orders:,})")
+            continue
+        for workers in args.workers:
+            def run():
+                return compute_fifo(orders, today=TODAY, engine=engine, workers=workers)
+            seconds, outputs = _timed(run, args.repeat)
+            peak = _peak_mb(run) if args.memory else None
+            record("full", engine, workers, seconds, peak, outputs)
+
+    # Checkpointed EOD run: state of the history, then only the last day(s) applied
+    history, appended = split_last_days(orders, args.new_orders)
+    if appended:
+        base = compute_fifo(history, today=TODAY, engine=args.engines[0], workers=1, with_state=True)
+        snapshot = dump_states(base["states"])
+
+        def run_incremental():
+            states = load_states(snapshot)  # loading the checkpoint is part of a real EOD run
+            if not apply_new_orders(states, appended):
+                raise RuntimeError("appended orders sort before the checkpoint")
+            return outputs_from_states(states, TODAY)
+        seconds, outputs = _timed(run_incremental, args.repeat)
+        peak = _peak_mb(run_incremental) if args.memory else None
+        record(f"+{len(appended)} new", "state", 1, seconds, peak, outputs)
+    return results
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the FIFO engine on synthetic order histories (no Sheets I/O).")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help="ORDERS:TICKERS pairs, e.g. 1000:50 1000000:5000 (default: %(default)s)")
+    parser.add_argument("--engines", nargs="+", default=["numpy", "python"], choices=["numpy", "python"])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1],
+                        help="compute_fifo worker counts to time (0 = one per CPU)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case; the best is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--new-orders", type=int, default=200,
+                        help="orders appended for the incremental case (rounded to whole days)")
+    parser.add_argument("--max-python-orders", type=int, default=200000,
+                        help="skip timing the python engine above this size (still used for goldens)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="skip the tracemalloc pass (it slows the run down, so it is never timed)")
+    parser.add_argument("--golden-dir", help="store golden outputs here and compare later runs against them")
+    parser.add_argument("--json", dest="json_path", help="write all results to this JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    results = []
+    for size in args.sizes:
+        n_orders, _, n_tickers = size.partition(":")
+        results += bench_size(int(n_orders), int(n_tickers or 50), args)
+
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\n📝 Results written to {args.json_path}")
+
+    failed = [r for r in results if not r["golden_ok"]]
+    if failed:
+        print(f"\n❌ {len(failed)} case(s) differ from the golden reference")
+        raise SystemExit(1)
+    print(f"\n✅ All {len(results)} cases match the golden reference")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,677 @@
+# fifo_engine_vs.py
+#
+# FIFO lot matching behind the portfolio tabs (FIFO_Summary, Buy_Trade_Status,
+# Sell_Trade_Status, BUY_SELL_MATCHES), with no Sheets I/O: fifo_portfolio_vs.py
+# downloads ALL_ORDERS, calls compute_fifo() (or resumes from its checkpoint with
+# apply_new_orders() + outputs_from_states()) and uploads the result; value_buy_status()
+# values the open lots from prices fetched outside (FIFO_PRICE_SOURCE=kite).
+#
+# Tickers are independent, so large inputs are split into per-ticker groups that run
+# on a process pool; results are merged back in ticker order, so the output does
+# not depend on the number of workers.
+
+import functools
+import heapq
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# "numpy" (vectorised lot matching) or "python" (the original per-row loop, kept as the reference)
+FIFO_ENGINE = os.getenv("FIFO_ENGINE", "numpy")
+FIFO_WORKERS = int(os.getenv("FIFO_WORKERS", "0"))  # processes; 0 = one per CPU, 1 = in-process
+FIFO_PARALLEL_MIN_ORDERS = int(os.getenv("FIFO_PARALLEL_MIN_ORDERS", "20000"))  # below this a pool costs more than it saves
+
+OUTPUT_TABS = ("FIFO_Summary", "Buy_Trade_Status", "Sell_Trade_Status", "BUY_SELL_MATCHES")
+
+# --- PER-TICKER ENGINES ---
+_NS_PER_DAY = 86_400 * 10**9
+
+def _buy_status_row(b, today):
+    # Buy_Trade_Status row for one BUY lot of the reference engine
+    status = "OPEN" if b['units'] > 0 else "CLOSE"
+    open_days = (today - b['date']).days if b['units'] > 0 else 0
+    trade_amount = b['original_units'] * b['price']
+    realized_amount = b['realized_amount']
+
+    day_amount_gap = 0.0
+    if 'sell_breakdown' in b:
+        for sell in b['sell_breakdown']:
+            gap_days = (sell['date'] - b['date']).days + 1
+            day_amount_gap += sell['units'] * b['price'] * gap_days
+
+    if b['units'] > 0:
+        gap_days = (today - b['date']).days + 1
+        day_amount_gap += b['units'] * b['price'] * gap_days
+
+    return {
+        'Order ID': b.get('order_id', ''),
+        'TICKER': b['ticker'],
+        'CATEGORY': b['category'],
+        'TYPE': 'BUY',
+        'UNITS': b['original_units'],
+        'PRICE': b['price'],
+        'DATE': b['date'],
+        'METHOD': b.get('method', ''),
+        'STATUS': status,
+        'UNSOLD UNITS': b['units'],
+        'OPEN DAYS': open_days,
+        'TRADE AMOUNT': round(trade_amount, 2),
+        'REALIZED AMOUNT': round(realized_amount, 2),
+        'CURRENT PRICE': '',   # placeholder; formulas applied on upload
+        'UNREALIZED AMOUNT': '',
+        'FINAL AMOUNT': '',
+        'PROFIT AMOUNT': '',
+        'PROFIT STATUS': '',
+        'PROFIT %AGE': '',
+        'DAY AMOUNT GAP': round(day_amount_gap, 2)
+    }
+
+def _new_ticker_state(ticker, fallback_category):
+    """
+    Resumable FIFO state of one ticker:
+    - lots: every BUY entry in order (Buy_Trade_Status source); open: the ones still holding units
+    - sell_rows / match_rows: Sell_Trade_Status rows and matched BUY_SELL_MATCHES rows emitted so far
+    - category: fallback CATEGORY (the ticker's latest order), used for FIFO_Summary
+    - last_key: sort key (after TICKER) of the last order applied; later orders must not sort before it
+    """
+    return {'ticker': ticker, 'category': fallback_category, 'lots': [], 'open': [], 'sell_rows': [], 'match_rows': [],
+            'last_key': None}
+
+def _apply_orders(state, group):
+    """Reference FIFO walk: applies the (sorted) orders in `group` to `state`, row by row."""
+    ticker = state['ticker']
+    fallback_category = state['category']
+    buys = state['open']
+    buy_status_records = state['lots']
+    sell_trade_records = state['sell_rows']
+    buy_sell_match_rows = state['match_rows']
+
+    for _, row in group.iterrows():
+        # --- Normalize row fields ---
+        units = int(pd.to_numeric(row['UNITS'], errors='coerce')) if 'UNITS' in row else 0
+        # PRICE may come as '1,234.56'
+        price = float(str(row['PRICE']).replace(",", "")) if 'PRICE' in row else 0.0
+        date = row['DATE']
+        order_id = row.get('Order ID', '')
+        method = row.get('METHOD', '')
+        category_row = row.get('CATEGORY', fallback_category)
+        trade_type = str(row.get('TYPE', '')).upper()
+
+        if trade_type == 'BUY':
+            buy_entry = {
+                'units': units,
+                'price': price,
+                'date': date,
+                'original_units': units,
+                'order_id': order_id,
+                'ticker': ticker,
+                'category': category_row,   # preserve BUY category per row
+                'method': method,           # preserve BUY method per row
+                'realized_amount': 0.0,
+                # NEW fields for stacked output
+                'head_emitted': False,
+                'buy_group_id': f"{ticker}|{order_id}"
+            }
+            buys.append(buy_entry)
+            buy_status_records.append(buy_entry)
+
+        elif trade_type == 'SELL':
+            remaining = units
+            touched_buys = []
+            trade_amount = 0.0
+            day_amt_gap = 0.0
+
+            sell_method = method                 # preserve SELL method
+            sell_category = category_row         # preserve SELL category
+
+            while remaining > 0 and buys:
+                buy = buys[0]
+                available = buy['units']
+                used = min(available, remaining)
+
+                # Track per-buy sell breakdown for day-amount-gap later
+                if 'sell_breakdown' not in buy:
+                    buy['sell_breakdown'] = []
+                buy['sell_breakdown'].append({
+                    'date': date,
+                    'units': used
+                })
+
+                # Compute cost and day-amount-gap contribution for SELL-level metrics
+                age_days = (date - buy['date']).days + 1
+                cost = used * buy['price']
+                trade_amount += cost
+                day_amt_gap += cost * age_days
+                touched_buys.append(buy)
+
+                # Update realized and inventory
+                buy['realized_amount'] += used * price
+                buy['units'] -= used
+                remaining -= used
+
+                # --- NEW: emit a row for this BUY↔SELL match (handles partials) ---
+                is_head = not buy['head_emitted']
+                buy['head_emitted'] = True
+
+                buy_sell_match_rows.append({
+                    'TICKER': ticker,
+                    'BUY_GROUP_ID': buy['buy_group_id'],
+                    'BUY_ROW_IS_HEAD': is_head,
+                    'BUY_ID': buy['order_id'],
+                    'BUY_DATE': buy['date'],               # upload_to_sheet formats dates
+                    'BUY_CATEGORY': buy['category'],
+                    'BUY_METHOD': buy['method'],
+                    'BUY_UNITS': buy['original_units'],
+                    'BUY_PRICE': buy['price'],
+                    'SELL_ID': order_id,
+                    'SELL_DATE': date,
+                    'SELL_UNITS': units,                    # full units for this SELL order
+                    'SELL_PRICE': price,
+                    'SELL_CATEGORY': sell_category,         # NEW
+                    'SELL_METHOD': sell_method,             # NEW
+                    'MATCHED_UNITS': used,                  # portion matched to THIS BUY
+                    'PNL_PER_MATCH': round((price - buy['price']) * used, 2),
+                    'BUY_UNITS_LEFT_AFTER': buy['units']
+                })
+                # --- END NEW ---
+
+                if buy['units'] == 0:
+                    buys.pop(0)
+
+            # Record SELL-level aggregate (kept exactly like your code)
+            sell_record = {
+                'Order ID': order_id,
+                'TICKER': ticker,
+                'CATEGORY': category_row,
+                'TYPE': 'SELL',
+                'UNITS': units,
+                'PRICE': price,
+                'DATE': date,
+                'METHOD': method,
+                'TRADE AMOUNT': round(trade_amount, 2),
+                'TRADE COUNT': len(touched_buys),
+                'DAY AMOUNT GAP': round(day_amt_gap, 2)
+            }
+            sell_trade_records.append(sell_record)
+
+def _state_outputs(state, today):
+    """(buy_status_rows, sell_trade_rows, buy_sell_match_rows, portfolio row or None) of one ticker's state."""
+    ticker = state['ticker']
+    buys = state['open']
+    buy_sell_match_rows = list(state['match_rows'])
+
+    # --- Emit head-only rows for BUYs untouched by any SELL ---
+    for b in buys:
+        if not b.get('head_emitted', False):
+            buy_sell_match_rows.append(_head_only_match_row(
+                ticker, b['buy_group_id'], b['order_id'], b['date'], b['category'], b['method'],
+                b['original_units'], b['price'], b['units'],
+            ))
+
+    # --- Open position snapshot for this ticker (unchanged) ---
+    open_units = sum(b['units'] for b in buys)
+    open_amount = sum(b['units'] * b['price'] for b in buys)
+    open_trade_count = len([b for b in buys if b['units'] > 0])
+    open_day_amt_gap = sum(((today - b['date']).days + 1) * b['units'] * b['price'] for b in buys)
+
+    position = None
+    if open_units > 0:
+        position = {
+            'TICKER': ticker,
+            'CATEGORY': state['category'],  # historical behavior retained
+            'OPEN UNITS': open_units,
+            'OPEN AMOUNT': round(open_amount, 2),
+            'OPEN TRADE COUNT': open_trade_count,
+            'OPEN DAY AMOUNT GAP': round(open_day_amt_gap, 2)
+        }
+    buy_status_rows = [_buy_status_row(b, today) for b in state['lots']]
+    return buy_status_rows, list(state['sell_rows']), buy_sell_match_rows, position
+
+def _fifo_ticker_python(ticker, group, fallback_category, today, with_state=False):
+    """
+    Reference FIFO for one ticker: walks the orders row by row and drains a list of BUY lots.
+    Returns (buy_status_rows, sell_trade_rows, buy_sell_match_rows, portfolio row or None, state);
+    the state comes for free here, so with_state is ignored.
+    """
+    state = _new_ticker_state(ticker, fallback_category)
+    _apply_orders(state, group)
+    return _state_outputs(state, today) + (state,)
+
+def _head_only_match_row(ticker, group_id, buy_id, buy_date, category, method, buy_units, buy_price, units_left):
+    # BUY_SELL_MATCHES row for a BUY no SELL has touched
+    return {
+        'TICKER': ticker,
+        'BUY_GROUP_ID': group_id,
+        'BUY_ROW_IS_HEAD': True,
+        'BUY_ID': buy_id,
+        'BUY_DATE': buy_date,
+        'BUY_CATEGORY': category,
+        'BUY_METHOD': method,
+        'BUY_UNITS': buy_units,
+        'BUY_PRICE': buy_price,
+        'SELL_ID': '',
+        'SELL_DATE': '',
+        'SELL_UNITS': '',
+        'SELL_PRICE': '',
+        'SELL_CATEGORY': '',          # NEW
+        'SELL_METHOD': '',            # NEW
+        'MATCHED_UNITS': '',
+        'PNL_PER_MATCH': '',
+        'BUY_UNITS_LEFT_AFTER': units_left
+    }
+
+def _days_between(later_ns, earlier_ns):
+    """Timedelta.days (floored) of later - earlier on int64 ns arrays, as float; NaT on either side -> nan."""
+    nat = np.iinfo(np.int64).min
+    days = ((later_ns - earlier_ns) // _NS_PER_DAY).astype(float)
+    days[(later_ns == nat) | (earlier_ns == nat)] = np.nan
+    return days
+
+def _whole_days(d):
+    # float day count from _days_between -> int like Timedelta.days (nan stays nan for NaT)
+    return int(d) if d == d else float(d)
+
+def _fifo_ticker_numpy(ticker, group, fallback_category, today, with_state=False):
+    """
+    Vectorised FIFO for one ticker; same output as _fifo_ticker_python.
+    BUY lots are laid end to end on a cumulative-quantity line: lot i covers [L[i], R[i]).
+    Sell j consumes the next (min(units, available)) units of that line, i.e. [C[j-1], C[j]),
+    and its lots are found with searchsorted; every per-match/per-lot/per-sell figure
+    is then an array expression (bincount keeps the reference's summation order).
+    with_state=True also returns the resumable state (else None), for the checkpoint.
+    """
+    n = len(group)
+    cols = group.columns
+    units = pd.to_numeric(group['UNITS'], errors='coerce').astype('int64').to_numpy() if 'UNITS' in cols else np.zeros(n, dtype='int64')
+    prices = group['PRICE'].astype(str).str.replace(",", "").astype(float).to_numpy() if 'PRICE' in cols else np.zeros(n)
+    types = group['TYPE'].astype(str).str.upper().to_numpy() if 'TYPE' in cols else np.full(n, '')
+
+    bi = np.flatnonzero(types == 'BUY')
+    si = np.flatnonzero(types == 'SELL')
+    if (units[bi] <= 0).any() or (units[si] < 0).any():
+        # empty/negative lots take branches of the row walk the interval model doesn't reproduce
+        return _fifo_ticker_python(ticker, group, fallback_category, today)
+
+    dates = group['DATE'].tolist()
+    dates_ns = group['DATE'].to_numpy(dtype='datetime64[ns]').astype('int64')
+    order_ids = group['Order ID'].tolist() if 'Order ID' in cols else [''] * n
+    methods = group['METHOD'].tolist() if 'METHOD' in cols else [''] * n
+    categories = group['CATEGORY'].tolist() if 'CATEGORY' in cols else [fallback_category] * n
+    today_ns = np.int64(today.value)
+
+    bu, bp, bd = units[bi], prices[bi], dates_ns[bi]
+    su, sp, sd = units[si], prices[si], dates_ns[si]
+    R = np.cumsum(bu)
+    L = R - bu
+
+    # units available to sell j = all BUY units placed before it; C[j] = units consumed after sell j
+    bought_before = np.concatenate(([0], R))[np.searchsorted(bi, si)]
+    S = np.cumsum(su)
+    C = S + np.minimum.accumulate(np.minimum(0, bought_before - S))
+    C_prev = np.concatenate(([0], C))[:-1]
+
+    lo = np.searchsorted(R, C_prev, side='right')
+    hi = np.searchsorted(L, C, side='left')
+    counts = np.where(C > C_prev, np.maximum(hi - lo, 0), 0)
+
+    # one entry per (sell, lot) match, in the order the row walk emits them
+    m_sell = np.repeat(np.arange(len(si)), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    m_lot = np.repeat(lo, counts) + (np.arange(len(m_sell)) - starts)
+
+    used = np.minimum(R[m_lot], C[m_sell]) - np.maximum(L[m_lot], C_prev[m_sell])
+    left_after = R[m_lot] - np.minimum(R[m_lot], C[m_sell])
+    cost = used * bp[m_lot]
+    gap_cost = cost * (_days_between(sd[m_sell], bd[m_lot]) + 1)
+    is_head = np.ones(len(m_lot), dtype=bool)
+    is_head[1:] = m_lot[1:] != m_lot[:-1]
+
+    n_buys, n_sells = len(bi), len(si)
+    sell_trade_amount = np.bincount(m_sell, weights=cost, minlength=n_sells)
+    sell_day_gap = np.bincount(m_sell, weights=gap_cost, minlength=n_sells)
+    realized = np.bincount(m_lot, weights=used * sp[m_sell], minlength=n_buys)
+    buy_day_gap = np.bincount(m_lot, weights=gap_cost, minlength=n_buys)
+    left = bu - np.bincount(m_lot, weights=used, minlength=n_buys).astype('int64')
+
+    open_mask = left > 0
+    days_open = _days_between(np.full(n_buys, today_ns), bd)
+    open_gap = left * bp * (days_open + 1)
+    buy_day_gap = np.where(open_mask, buy_day_gap + open_gap, buy_day_gap)
+
+    # --- SELL rows ---
+    sell_trade_records = [
+        {
+            'Order ID': order_ids[k],
+            'TICKER': ticker,
+            'CATEGORY': categories[k],
+            'TYPE': 'SELL',
+            'UNITS': int(su[j]),
+            'PRICE': float(sp[j]),
+            'DATE': dates[k],
+            'METHOD': methods[k],
+            'TRADE AMOUNT': round(float(sell_trade_amount[j]), 2),
+            'TRADE COUNT': int(counts[j]),
+            'DAY AMOUNT GAP': round(float(sell_day_gap[j]), 2)
+        }
+        for j, k in enumerate(si.tolist())
+    ]
+
+    # --- BUY_SELL_MATCHES rows (matched first, then BUYs no SELL touched) ---
+    group_ids = [f"{ticker}|{order_ids[k]}" for k in bi.tolist()]
+    pnl = (sp[m_sell] - bp[m_lot]) * used
+    buy_sell_match_rows = []
+    for j, i, head, u, la, pv in zip(m_sell.tolist(), m_lot.tolist(), is_head.tolist(),
+                                     used.tolist(), left_after.tolist(), pnl.tolist()):
+        kb, ks = bi[i], si[j]
+        buy_sell_match_rows.append({
+            'TICKER': ticker,
+            'BUY_GROUP_ID': group_ids[i],
+            'BUY_ROW_IS_HEAD': head,
+            'BUY_ID': order_ids[kb],
+            'BUY_DATE': dates[kb],
+            'BUY_CATEGORY': categories[kb],
+            'BUY_METHOD': methods[kb],
+            'BUY_UNITS': int(bu[i]),
+            'BUY_PRICE': float(bp[i]),
+            'SELL_ID': order_ids[ks],
+            'SELL_DATE': dates[ks],
+            'SELL_UNITS': int(su[j]),
+            'SELL_PRICE': float(sp[j]),
+            'SELL_CATEGORY': categories[ks],
+            'SELL_METHOD': methods[ks],
+            'MATCHED_UNITS': u,
+            'PNL_PER_MATCH': round(pv, 2),
+            'BUY_UNITS_LEFT_AFTER': la
+        })
+    touched = np.zeros(n_buys, dtype=bool)
+    touched[m_lot] = True
+    n_matched = len(buy_sell_match_rows)
+    for i in np.flatnonzero(~touched).tolist():
+        kb = bi[i]
+        buy_sell_match_rows.append(_head_only_match_row(
+            ticker, group_ids[i], order_ids[kb], dates[kb], categories[kb], methods[kb],
+            int(bu[i]), float(bp[i]), int(left[i]),
+        ))
+
+    # --- Buy_Trade_Status rows ---
+    buy_status_rows = []
+    for i, k in enumerate(bi.tolist()):
+        is_open = bool(open_mask[i])
+        buy_status_rows.append({
+            'Order ID': order_ids[k],
+            'TICKER': ticker,
+            'CATEGORY': categories[k],
+            'TYPE': 'BUY',
+            'UNITS': int(bu[i]),
+            'PRICE': float(bp[i]),
+            'DATE': dates[k],
+            'METHOD': methods[k],
+            'STATUS': "OPEN" if is_open else "CLOSE",
+            'UNSOLD UNITS': int(left[i]),
+            'OPEN DAYS': _whole_days(days_open[i]) if is_open else 0,
+            'TRADE AMOUNT': round(float(bu[i] * bp[i]), 2),
+            'REALIZED AMOUNT': round(float(realized[i]), 2),
+            'CURRENT PRICE': '',   # placeholder; formulas applied on upload
+            'UNREALIZED AMOUNT': '',
+            'FINAL AMOUNT': '',
+            'PROFIT AMOUNT': '',
+            'PROFIT STATUS': '',
+            'PROFIT %AGE': '',
+            'DAY AMOUNT GAP': round(float(buy_day_gap[i]), 2)
+        })
+
+    # --- Open position snapshot (cumsum sums in order, like the reference) ---
+    position = None
+    open_units = int(left[open_mask].sum())
+    if open_units > 0:
+        position = {
+            'TICKER': ticker,
+            'CATEGORY': fallback_category,  # historical behavior retained
+            'OPEN UNITS': open_units,
+            'OPEN AMOUNT': round(float(np.cumsum(left[open_mask] * bp[open_mask])[-1]), 2),
+            'OPEN TRADE COUNT': int(open_mask.sum()),
+            'OPEN DAY AMOUNT GAP': round(float(np.cumsum((days_open + 1)[open_mask] * left[open_mask] * bp[open_mask])[-1]), 2)
+        }
+    state = None
+    if with_state:
+        state = _new_ticker_state(ticker, fallback_category)
+        state['sell_rows'] = sell_trade_records
+        state['match_rows'] = buy_sell_match_rows[:n_matched]
+        for i, k in enumerate(bi.tolist()):
+            state['lots'].append({
+                'units': int(left[i]),
+                'price': float(bp[i]),
+                'date': dates[k],
+                'original_units': int(bu[i]),
+                'order_id': order_ids[k],
+                'ticker': ticker,
+                'category': categories[k],
+                'method': methods[k],
+                'realized_amount': float(realized[i]),
+                'head_emitted': bool(touched[i]),
+                'buy_group_id': group_ids[i]
+            })
+        for i, j, u in zip(m_lot.tolist(), m_sell.tolist(), used.tolist()):
+            state['lots'][i].setdefault('sell_breakdown', []).append({'date': dates[si[j]], 'units': u})
+        state['open'] = [state['lots'][i] for i in np.flatnonzero(open_mask).tolist()]
+    return buy_status_rows, sell_trade_records, buy_sell_match_rows, position, state
+
+_FIFO_ENGINES = {"numpy": _fifo_ticker_numpy, "python": _fifo_ticker_python}
+
+# --- ORDERS FRAME ---
+def _orders_frame(orders):
+    df = orders.copy() if isinstance(orders, pd.DataFrame) else pd.DataFrame(orders)
+    if 'DATE' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['DATE']):
+        # Parse dates (handles `19-Mar-2025` etc.)
+        df['DATE'] = pd.to_datetime(df['DATE'], dayfirst=True, errors='coerce')
+    return df
+
+def _sort_columns(df):
+    # Sort for FIFO; add 'Order ID' for stable tie-breaks if present
+    return [c for c in ['TICKER', 'DATE', 'TYPE', 'Order ID'] if c in df.columns]
+
+def _order_key(row, key_cols):
+    # sort_values order within a ticker: NaN/NaT last
+    return tuple((1, 0) if pd.isna(row[c]) else (0, row[c]) for c in key_cols)
+
+def _sorts_after(key, last_key):
+    try:
+        return last_key is None or key >= last_key
+    except TypeError:
+        return False
+
+def _today(today):
+    return pd.to_datetime("today").normalize() if today is None else pd.Timestamp(today)
+
+# --- PROCESS POOL ---
+def _fifo_chunk(engine, items, today, with_state):
+    # worker entry point: items are (index, ticker, group, fallback_category)
+    fifo_ticker = _FIFO_ENGINES[engine]
+    return [(i, fifo_ticker(ticker, group, category, today, with_state=with_state)) for i, ticker, group, category in items]
+
+def _balanced_chunks(items, n):
+    """Split items into n chunks of similar order counts (largest group first, into the lightest chunk)."""
+    chunks = [[] for _ in range(n)]
+    heap = [(0, k) for k in range(n)]
+    for item in sorted(items, key=lambda it: -len(it[2])):
+        load, k = heapq.heappop(heap)
+        chunks[k].append(item)
+        heapq.heappush(heap, (load + len(item[2]), k))
+    return [c for c in chunks if c]
+
+def _run_groups(engine, items, today, with_state, workers):
+    workers = FIFO_WORKERS if workers is None else workers
+    workers = min(workers or os.cpu_count() or 1, len(items))
+    if workers <= 1 or sum(len(it[2]) for it in items) < FIFO_PARALLEL_MIN_ORDERS:
+        return [result for _, result in _fifo_chunk(engine, items, today, with_state)]
+
+    results = [None] * len(items)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_fifo_chunk, engine, chunk, today, with_state) for chunk in _balanced_chunks(items, workers)]
+        for future in futures:
+            for i, result in future.result():
+                results[i] = result
+    return results
+
+def _merge_outputs(per_ticker):
+    outputs = {tab: [] for tab in OUTPUT_TABS}
+    for buy_rows, sell_rows, match_rows, position in per_ticker:
+        outputs["Buy_Trade_Status"].extend(buy_rows)
+        outputs["Sell_Trade_Status"].extend(sell_rows)
+        outputs["BUY_SELL_MATCHES"].extend(match_rows)
+        if position is not None:
+            outputs["FIFO_Summary"].append(position)
+    return outputs
+
+# --- PUBLIC API ---
+def compute_fifo(orders, today=None, engine=None, workers=None, with_state=False):
+    """
+    FIFO lot matching over a full order history.
+    - orders: DataFrame or list of dicts (worksheet.get_all_records() shape) with TICKER, TYPE, UNITS,
+      PRICE, DATE and optionally Order ID, CATEGORY, METHOD; text DATEs are parsed day-first
+    - today: day the open positions are valued at (default: today)
+    - engine: "numpy" / "python" (default FIFO_ENGINE); workers: process count (default FIFO_WORKERS)
+    - with_state: also return "states" (ticker -> resumable state) for apply_new_orders()
+    Returns {tab: [row dicts]} for OUTPUT_TABS (BUY_SELL_MATCHES in emission order).
+    """
+    engine = engine or FIFO_ENGINE
+    if engine not in _FIFO_ENGINES:
+        raise ValueError(f"Unknown FIFO engine {engine!r}; expected one of {sorted(_FIFO_ENGINES)}")
+    today = _today(today)
+
+    df = _orders_frame(orders)
+    outputs = {tab: [] for tab in OUTPUT_TABS}
+    states = {}
+    if not df.empty:
+        sort_cols = _sort_columns(df)
+        df = df.sort_values(by=sort_cols, kind='mergesort')
+
+        # Optional map (kept from your code, though we now prefer row['CATEGORY'] per order)
+        if 'CATEGORY' in df.columns:
+            ticker_to_category = df.set_index('TICKER')['CATEGORY'].to_dict()
+        else:
+            ticker_to_category = {}
+
+        items = [
+            (i, ticker, group, ticker_to_category.get(ticker, ""))
+            for i, (ticker, group) in enumerate(df.groupby("TICKER"))
+        ]
+        results = _run_groups(engine, items, today, with_state, workers)
+        outputs = _merge_outputs(result[:4] for result in results)
+        if with_state:
+            for (_, ticker, group, _), result in zip(items, results):
+                state = result[4]
+                state['last_key'] = _order_key(group.iloc[-1], sort_cols[1:])
+                states[ticker] = state
+    if with_state:
+        outputs["states"] = states
+    return outputs
+
+def apply_new_orders(states, orders):
+    """
+    Apply orders appended since `states` were saved, in place. Returns False, leaving the states
+    untouched, if an order sorts before one already applied to its ticker (needs compute_fifo()).
+    """
+    df = _orders_frame(orders)
+    if df.empty:
+        return True
+    sort_cols = _sort_columns(df)
+    df = df.sort_values(by=sort_cols, kind='mergesort')
+    key_cols = sort_cols[1:]
+    groups = list(df.groupby("TICKER"))
+    for ticker, group in groups:
+        state = states.get(ticker)
+        if state is not None and not _sorts_after(_order_key(group.iloc[0], key_cols), state['last_key']):
+            print(f"♻️ New {ticker} order sorts before already processed ones")
+            return False
+    for ticker, group in groups:
+        state = states.setdefault(ticker, _new_ticker_state(ticker, ""))
+        if 'CATEGORY' in group.columns:
+            state['category'] = group['CATEGORY'].iloc[-1]
+        _apply_orders(state, group)
+        state['last_key'] = _order_key(group.iloc[-1], key_cols)
+    return True
+
+def value_buy_status(buy_status_rows, prices):
+    """
+    Buy_Trade_Status as a DataFrame with CURRENT PRICE, UNREALIZED AMOUNT, FINAL AMOUNT, PROFIT AMOUNT,
+    PROFIT STATUS and PROFIT %AGE filled from `prices` ({ticker: last price}), with the arithmetic of the
+    sheet formulas (J*N, M+O, P-L, Q>=0, Q/L), column-wise.
+    Returns (DataFrame, unpriced): unpriced flags rows with unsold units and no price, left blank for the formulas.
+    """
+    df = pd.DataFrame(buy_status_rows)
+    if df.empty:
+        return df, np.zeros(0, dtype=bool)
+
+    price = df['TICKER'].map(prices).astype(float)
+    unsold = pd.to_numeric(df['UNSOLD UNITS'], errors='coerce').fillna(0)
+    needs_price = unsold != 0  # J*N is 0 for closed lots whatever the price
+    unpriced = (needs_price & price.isna()).to_numpy()
+
+    trade = df['TRADE AMOUNT'].astype(float)
+    # full precision, like the formula columns (the sheet's number format does the rounding)
+    unrealized = (unsold * price).where(needs_price, 0.0)
+    final = df['REALIZED AMOUNT'].astype(float) + unrealized
+    profit = final - trade
+    values = {
+        'CURRENT PRICE': price,
+        'UNREALIZED AMOUNT': unrealized,
+        'FINAL AMOUNT': final,
+        'PROFIT AMOUNT': profit,
+        'PROFIT STATUS': pd.Series(np.where(profit >= 0, "PROFIT", "LOSS"), index=df.index),
+        'PROFIT %AGE': profit / trade.where(trade != 0),
+    }
+    for col, series in values.items():
+        # NaN (no price / zero trade amount) is uploaded as a blank cell
+        df[col] = series.astype(object).where(~unpriced, '')
+    return df, unpriced
+
+def outputs_from_states(states, today=None):
+    """{tab: [row dicts]} for OUTPUT_TABS from resumable ticker states, valued at `today`."""
+    today = _today(today)
+    return _merge_outputs(_state_outputs(states[ticker], today) for ticker in sorted(states))
+
+# --- STATE CHECKPOINTS ---
+# States are saved as plain JSON (no pickle): Timestamps become {"$date": ISO string or null for NaT},
+# numpy scalars plain numbers, and each ticker's open lots are stored as indices into its lots,
+# which they share with the Buy_Trade_Status rows.
+def _json_default(value):
+    if value is pd.NaT:
+        return {'$date': None}
+    if isinstance(value, pd.Timestamp):
+        return {'$date': value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+@functools.lru_cache(maxsize=None)
+def _timestamp(iso):
+    # a history has few distinct dates; Timestamps are immutable, so parsed ones are shared
+    return pd.Timestamp(iso)
+
+def _json_object(obj):
+    if len(obj) == 1 and '$date' in obj:
+        return pd.NaT if obj['$date'] is None else _timestamp(obj['$date'])
+    return obj
+
+def dump_states(states):
+    """JSON text of resumable ticker states (compute_fifo(with_state=True)), for a checkpoint file."""
+    data = {}
+    for ticker, state in states.items():
+        open_ids = {id(lot) for lot in state['open']}
+        encoded = {k: v for k, v in state.items() if k != 'open'}
+        encoded['open'] = [i for i, lot in enumerate(state['lots']) if id(lot) in open_ids]
+        data[ticker] = encoded
+    return json.dumps(data, default=_json_default, separators=(",", ":"))
+
+def load_states(text):
+    """Ticker states from dump_states() text, ready for apply_new_orders()."""
+    states = json.loads(text, object_hook=_json_object)
+    for state in states.values():
+        state['open'] = [state['lots'][i] for i in state['open']]
+        if state['last_key'] is not None:
+            state['last_key'] = tuple(tuple(part) for part in state['last_key'])
+    return states
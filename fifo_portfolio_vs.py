@@ -1,247 +1,168 @@
+import os
+import json
 import pandas as pd
 from datetime import datetime
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from gspread.utils import numericise_all, rowcol_to_a1
+from google_sheets_utils_vs import get_gsheet_client, governed, open_spreadsheet, write_table_diff, a1_tab_range
+from fifo_engine_vs import (
+    compute_fifo, apply_new_orders, outputs_from_states, value_buy_status, dump_states, load_states
+)
 
 # --- CONFIG ---
 SPREADSHEET_NAME = "VS Portfolio"
 WORKSHEET_NAME = "ALL_ORDERS"
 CREDENTIALS_FILE = "creds_vs.json"
-
-# --- STEP 1: DOWNLOAD DATA FROM GOOGLE SHEETS ---
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = ServiceAccountCredentials.from_json_keyfile_name(CREDENTIALS_FILE, scope)
-client = gspread.authorize(creds)
-
-sheet = client.open(SPREADSHEET_NAME)
-worksheet = sheet.worksheet(WORKSHEET_NAME)
-data = worksheet.get_all_records()
-
-df = pd.DataFrame(data)
-
-# Parse dates (handles `19-Mar-2025` etc.)
-df['DATE'] = pd.to_datetime(df['DATE'], dayfirst=True, errors='coerce')
-
-# --- STEP 2: FIFO PROCESSING ---
-# Sort for FIFO; add 'Order ID' for stable tie-breaks if present
-sort_cols = [c for c in ['TICKER', 'DATE', 'TYPE', 'Order ID'] if c in df.columns]
-df = df.sort_values(by=sort_cols, kind='mergesort')
-
-today = pd.to_datetime("today").normalize()
-
-portfolio = []
-buy_status_records = []
-sell_trade_records = []
-buy_sell_match_rows = []  # NEW: stacked BUY↔SELL matches
-
-# Optional map (kept from your code, though we now prefer row['CATEGORY'] per order)
-if 'CATEGORY' in df.columns:
-    ticker_to_category = df.set_index('TICKER')['CATEGORY'].to_dict()
-else:
-    ticker_to_category = {}
-
-for ticker, group in df.groupby("TICKER"):
-    buys = []
-    # fallback category if needed
-    fallback_category = ticker_to_category.get(ticker, "")
-
-    for _, row in group.iterrows():
-        # --- Normalize row fields ---
-        units = int(pd.to_numeric(row['UNITS'], errors='coerce')) if 'UNITS' in row else 0
-        # PRICE may come as '1,234.56'
-        price = float(str(row['PRICE']).replace(",", "")) if 'PRICE' in row else 0.0
-        date = row['DATE']
-        order_id = row.get('Order ID', '')
-        method = row.get('METHOD', '')
-        category_row = row.get('CATEGORY', fallback_category)
-        trade_type = str(row.get('TYPE', '')).upper()
-
-        if trade_type == 'BUY':
-            buy_entry = {
-                'units': units,
-                'price': price,
-                'date': date,
-                'original_units': units,
-                'order_id': order_id,
-                'ticker': ticker,
-                'category': category_row,   # preserve BUY category per row
-                'method': method,           # preserve BUY method per row
-                'realized_amount': 0.0,
-                # NEW fields for stacked output
-                'head_emitted': False,
-                'buy_group_id': f"{ticker}|{order_id}"
-            }
-            buys.append(buy_entry)
-            buy_status_records.append(buy_entry)
-
-        elif trade_type == 'SELL':
-            remaining = units
-            touched_buys = []
-            trade_amount = 0.0
-            day_amt_gap = 0.0
-
-            sell_method = method                 # preserve SELL method
-            sell_category = category_row         # preserve SELL category
-
-            while remaining > 0 and buys:
-                buy = buys[0]
-                available = buy['units']
-                used = min(available, remaining)
-
-                # Track per-buy sell breakdown for day-amount-gap later
-                if 'sell_breakdown' not in buy:
-                    buy['sell_breakdown'] = []
-                buy['sell_breakdown'].append({
-                    'date': date,
-                    'units': used
-                })
-
-                # Compute cost and day-amount-gap contribution for SELL-level metrics
-                age_days = (date - buy['date']).days + 1
-                cost = used * buy['price']
-                trade_amount += cost
-                day_amt_gap += cost * age_days
-                touched_buys.append(buy)
-
-                # Update realized and inventory
-                buy['realized_amount'] += used * price
-                buy['units'] -= used
-                remaining -= used
-
-                # --- NEW: emit a row for this BUY↔SELL match (handles partials) ---
-                is_head = not buy['head_emitted']
-                buy['head_emitted'] = True
-
-                buy_sell_match_rows.append({
-                    'TICKER': ticker,
-                    'BUY_GROUP_ID': buy['buy_group_id'],
-                    'BUY_ROW_IS_HEAD': is_head,
-                    'BUY_ID': buy['order_id'],
-                    'BUY_DATE': buy['date'],               # upload_to_sheet formats dates
-                    'BUY_CATEGORY': buy['category'],
-                    'BUY_METHOD': buy['method'],
-                    'BUY_UNITS': buy['original_units'],
-                    'BUY_PRICE': buy['price'],
-                    'SELL_ID': order_id,
-                    'SELL_DATE': date,
-                    'SELL_UNITS': units,                    # full units for this SELL order
-                    'SELL_PRICE': price,
-                    'SELL_CATEGORY': sell_category,         # NEW
-                    'SELL_METHOD': sell_method,             # NEW
-                    'MATCHED_UNITS': used,                  # portion matched to THIS BUY
-                    'PNL_PER_MATCH': round((price - buy['price']) * used, 2),
-                    'BUY_UNITS_LEFT_AFTER': buy['units']
-                })
-                # --- END NEW ---
-
-                if buy['units'] == 0:
-                    buys.pop(0)
-
-            # Record SELL-level aggregate (kept exactly like your code)
-            sell_record = {
-                'Order ID': order_id,
-                'TICKER': ticker,
-                'CATEGORY': category_row,
-                'TYPE': 'SELL',
-                'UNITS': units,
-                'PRICE': price,
-                'DATE': date,
-                'METHOD': method,
-                'TRADE AMOUNT': round(trade_amount, 2),
-                'TRADE COUNT': len(touched_buys),
-                'DAY AMOUNT GAP': round(day_amt_gap, 2)
-            }
-            sell_trade_records.append(sell_record)
-
-    # --- Emit head-only rows for BUYs untouched by any SELL ---
-    for b in buys:
-        if not b.get('head_emitted', False):
-            buy_sell_match_rows.append({
-                'TICKER': ticker,
-                'BUY_GROUP_ID': b['buy_group_id'],
-                'BUY_ROW_IS_HEAD': True,
-                'BUY_ID': b['order_id'],
-                'BUY_DATE': b['date'],
-                'BUY_CATEGORY': b['category'],
-                'BUY_METHOD': b['method'],
-                'BUY_UNITS': b['original_units'],
-                'BUY_PRICE': b['price'],
-                'SELL_ID': '',
-                'SELL_DATE': '',
-                'SELL_UNITS': '',
-                'SELL_PRICE': '',
-                'SELL_CATEGORY': '',          # NEW
-                'SELL_METHOD': '',            # NEW
-                'MATCHED_UNITS': '',
-                'PNL_PER_MATCH': '',
-                'BUY_UNITS_LEFT_AFTER': b['units']
-            })
-
-    # --- Open position snapshot for this ticker (unchanged) ---
-    open_units = sum(b['units'] for b in buys)
-    open_amount = sum(b['units'] * b['price'] for b in buys)
-    open_trade_count = len([b for b in buys if b['units'] > 0])
-    open_day_amt_gap = sum(((today - b['date']).days + 1) * b['units'] * b['price'] for b in buys)
-
-    if open_units > 0:
-        portfolio.append({
-            'TICKER': ticker,
-            'CATEGORY': fallback_category,  # historical behavior retained
-            'OPEN UNITS': open_units,
-            'OPEN AMOUNT': round(open_amount, 2),
-            'OPEN TRADE COUNT': open_trade_count,
-            'OPEN DAY AMOUNT GAP': round(open_day_amt_gap, 2)
-        })
-
-# --- STEP 3: BUY TRADE STATUS OUTPUT (unchanged) ---
-buy_status_output = []
-for b in buy_status_records:
-    status = "OPEN" if b['units'] > 0 else "CLOSE"
-    open_days = (today - b['date']).days if b['units'] > 0 else 0
-    trade_amount = b['original_units'] * b['price']
-    realized_amount = b['realized_amount']
-
-    day_amount_gap = 0.0
-    if 'sell_breakdown' in b:
-        for sell in b['sell_breakdown']:
-            gap_days = (sell['date'] - b['date']).days + 1
-            day_amount_gap += sell['units'] * b['price'] * gap_days
-
-    if b['units'] > 0:
-        gap_days = (today - b['date']).days + 1
-        day_amount_gap += b['units'] * b['price'] * gap_days
-
-    row = {
-        'Order ID': b.get('order_id', ''),
-        'TICKER': b['ticker'],
-        'CATEGORY': b['category'],
-        'TYPE': 'BUY',
-        'UNITS': b['original_units'],
-        'PRICE': b['price'],
-        'DATE': b['date'],
-        'METHOD': b.get('method', ''),
-        'STATUS': status,
-        'UNSOLD UNITS': b['units'],
-        'OPEN DAYS': open_days,
-        'TRADE AMOUNT': round(trade_amount, 2),
-        'REALIZED AMOUNT': round(realized_amount, 2),
-        'CURRENT PRICE': '',   # placeholder; formulas applied on upload
-        'UNREALIZED AMOUNT': '',
-        'FINAL AMOUNT': '',
-        'PROFIT AMOUNT': '',
-        'PROFIT STATUS': '',
-        'PROFIT %AGE': '',
-        'DAY AMOUNT GAP': round(day_amount_gap, 2)
-    }
-    buy_status_output.append(row)
-
-# --- STEP 4: UPLOAD TO GOOGLE SHEETS ---
-def upload_to_sheet(title, df_data, apply_formulas=False):
+# JSON lot state as of the last processed ALL_ORDERS row, e.g. ~/.cache/vs/fifo_checkpoint.json;
+# unset/"" = no checkpoint, every run is a full rebuild
+FIFO_CHECKPOINT = os.path.expanduser(os.getenv("FIFO_CHECKPOINT", ""))
+FIFO_FULL_REBUILD = os.getenv("FIFO_FULL_REBUILD", "0") == "1"      # ignore the checkpoint (it is rewritten)
+FIFO_VERIFY_HISTORY = os.getenv("FIFO_VERIFY_HISTORY", "1") == "1"  # 0 = only re-check the last checkpointed row
+# Buy_Trade_Status valuation: "sheet" (GOOGLEFINANCE + formula columns) or "kite" (batched kite.ltp, plain values)
+FIFO_PRICE_SOURCE = os.getenv("FIFO_PRICE_SOURCE", "sheet")
+KITE_LTP_BATCH = int(os.getenv("KITE_LTP_BATCH", "500"))  # instruments per kite.ltp() call
+
+# --- CHECKPOINT ---
+# ALL_ORDERS only grows at the bottom (NEW_ORDERS rows are appended), so a run can start from the
+# per-ticker state of the previous one and apply just the appended rows. The checkpoint keeps the
+# raw rows it has applied and they are all re-read to detect edits/deletions; any doubt
+# (header change, edited or removed row, an appended order that sorts before processed ones)
+# means a full rebuild.
+_CHECKPOINT_VERSION = 2
+
+def _pad_rows(rows, width):
+    return [list(r[:width]) + [""] * (width - len(r)) for r in rows]
+
+def _records(header, rows):
+    # same values as worksheet.get_all_records() for these rows
+    return [dict(zip(header, numericise_all(row))) for row in rows]
+
+def _load_checkpoint(path):
+    try:
+        with open(path) as fh:
+            checkpoint = json.loads(fh.readline())
+            if not isinstance(checkpoint, dict) or checkpoint.get('version') != _CHECKPOINT_VERSION:
+                return None
+            checkpoint['tickers'] = load_states(fh.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable FIFO checkpoint {path}: {e}")
+        return None
+    return checkpoint
+
+def _save_checkpoint(path, header, rows, states):
+    # write-then-rename so an interrupted run never leaves a partial checkpoint
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        # line 1: version, header and applied rows; the rest: dump_states() of the lot state
+        fh.write(json.dumps({'version': _CHECKPOINT_VERSION, 'header': header, 'rows': rows}) + "\n")
+        fh.write(dump_states(states))
+    os.replace(tmp, path)
+
+def _read_all_orders(worksheet):
+    values = worksheet.get_all_values()
+    header = list(values[0]) if values else []
+    while header and header[-1] == "":
+        header.pop()
+    return header, _pad_rows(values[1:], len(header))
+
+def _read_new_orders(spreadsheet, checkpoint):
+    """
+    Rows appended to ALL_ORDERS since the checkpoint, or None if the checkpoint no longer matches
+    the sheet. One batched read: the header plus every row from row 2, each checkpointed row
+    compared with what was applied (with FIFO_VERIFY_HISTORY=0, from the last checkpointed row on).
+    """
+    header, done = checkpoint['header'], checkpoint['rows']
+    seen = done if FIFO_VERIFY_HISTORY else done[-1:]
+    first_row = len(done) - len(seen) + 2
+    last_col = rowcol_to_a1(1, len(header)).rstrip("0123456789")
+    resp = spreadsheet.values_batch_get([
+        a1_tab_range(WORKSHEET_NAME, "1:1"),
+        a1_tab_range(WORKSHEET_NAME, f"A{first_row}:{last_col}"),
+    ])
+    header_block, rows_block = ([vr.get("values", []) for vr in resp.get("valueRanges", [])] + [[], []])[:2]
+    if (header_block[0] if header_block else []) != header:
+        print("♻️ ALL_ORDERS header changed since the FIFO checkpoint")
+        return None
+    rows = _pad_rows(rows_block, len(header))
+    if rows[:len(seen)] != seen:
+        print("♻️ ALL_ORDERS rows before the FIFO checkpoint were edited or removed")
+        return None
+    return rows[len(seen):]
+
+# --- CURRENT PRICES (FIFO_PRICE_SOURCE=kite) ---
+_KITE_EXCHANGES = {"": "NSE", "BOM": "BSE"}  # GOOGLEFINANCE prefix -> Kite exchange
+
+def _bse_symbols(kite):
+    # BSE scrip code (GOOGLEFINANCE "BOM:500325") -> Kite tradingsymbol, from the BSE instruments dump
+    return {str(i['exchange_token']): i['tradingsymbol'] for i in kite.instruments("BSE")}
+
+def _kite_instrument(ticker, bse_symbols=None):
+    """
+    GOOGLEFINANCE symbol -> Kite "EXCHANGE:TRADINGSYMBOL", or None if it can't be resolved.
+    - "NSE:INFY" as is, bare "INFY" -> NSE
+    - "BOM:500325" -> BSE tradingsymbol of that scrip code (bse_symbols); "BOM:SYMBOL" -> "BSE:SYMBOL"
+    """
+    exchange, _, symbol = str(ticker).strip().rpartition(":")
+    exchange = _KITE_EXCHANGES.get(exchange.upper(), exchange.upper())
+    if exchange == "BSE" and symbol.isdigit():
+        symbol = (bse_symbols or {}).get(symbol)
+        if not symbol:
+            return None
+    return f"{exchange}:{symbol}"
+
+def fetch_last_prices(kite, tickers):
+    """
+    {ticker: last price} for `tickers`, in batched kite.ltp() calls (KITE_LTP_BATCH instruments each).
+    BSE scrip codes are resolved through one kite.instruments("BSE") call (only if there are any).
+    Tickers Kite has no quote for are left out (and listed); their rows keep the GOOGLEFINANCE formulas.
+    """
+    bse_symbols = None
+    if any(_kite_instrument(ticker) is None for ticker in tickers):
+        try:
+            bse_symbols = _bse_symbols(kite)
+        except Exception as e:
+            print(f"⚠️ kite.instruments('BSE') failed, BSE scrip codes stay unresolved: {e}")
+
+    by_instrument = {}
+    unresolved = []
+    for ticker in tickers:
+        instrument = _kite_instrument(ticker, bse_symbols)
+        if instrument is None:
+            unresolved.append(ticker)
+        else:
+            by_instrument.setdefault(instrument, []).append(ticker)
+    if unresolved:
+        print(f"⚠️ No Kite instrument for {len(unresolved)} tickers: {', '.join(sorted(unresolved))}")
+    instruments = sorted(by_instrument)
+
+    prices = {}
+    for i in range(0, len(instruments), KITE_LTP_BATCH):
+        batch = instruments[i:i + KITE_LTP_BATCH]
+        try:
+            quotes = kite.ltp(batch)
+        except Exception as e:
+            print(f"⚠️ kite.ltp failed for {len(batch)} instruments: {e}")
+            continue
+        for instrument, quote in (quotes or {}).items():
+            for ticker in by_instrument.get(instrument, []):
+                prices[ticker] = quote['last_price']
+    unquoted = sorted(t for ts in by_instrument.values() for t in ts if t not in prices)
+    if unquoted:
+        print(f"⚠️ No Kite last price for {len(unquoted)} tickers: {', '.join(unquoted)}")
+    print(f"✅ Kite last prices for {len(prices)}/{len(set(tickers))} open tickers "
+          f"in {-(-len(instruments) // KITE_LTP_BATCH)} calls")
+    return prices
+
+# --- UPLOAD ---
+def upload_to_sheet(sheet, title, df_data, apply_formulas=False, formula_rows=None):
+    # formula_rows: per-row flags limiting apply_formulas to those rows (default: every row)
     try:
         ws = sheet.worksheet(title)
     except gspread.exceptions.WorksheetNotFound:
         ws = sheet.add_worksheet(title=title, rows="1000", cols="50")
-    ws.clear()
 
     # Safe conversion: datetime → YYYY-MM-DD string
     def safe_value(val):
@@ -255,14 +176,12 @@ def upload_to_sheet(title, df_data, apply_formulas=False):
     df_data = df_data if isinstance(df_data, pd.DataFrame) else pd.DataFrame(df_data)
 
     if df_data.empty:
-        ws.update([["(no data)"]])
+        write_table_diff(ws, [["(no data)"]])
         return
 
     upload_values = [[safe_value(cell) for cell in row] for row in df_data.itertuples(index=False, name=None)]
-    ws.update([df_data.columns.values.tolist()] + upload_values, value_input_option='USER_ENTERED')
 
     if apply_formulas:
-        row_count = len(df_data) + 1
         formula_map = {
             'CURRENT PRICE': '=INDEX(SORT(GOOGLEFINANCE(B{r},"close",TODAY()-5,TODAY()),1,FALSE),2,2)',
             'UNREALIZED AMOUNT': '=J{r}*N{r}',
@@ -272,30 +191,76 @@ def upload_to_sheet(title, df_data, apply_formulas=False):
             'PROFIT %AGE': '=Q{r}/L{r}'
         }
 
+        # Formulas go into the table itself, so they are diffed (as text) with everything else
         header = df_data.columns.tolist()
         for col_name in formula_map:
             if col_name in header:
-                col_index = header.index(col_name) + 1
-                formulas = [[formula_map[col_name].format(r=r)] for r in range(2, row_count + 1)]
-                start_cell = gspread.utils.rowcol_to_a1(2, col_index)
-                end_cell = gspread.utils.rowcol_to_a1(row_count, col_index)
-                ws.update(range_name=f"{start_cell}:{end_cell}", values=formulas, value_input_option='USER_ENTERED')
-
-# --- Prepare BUY_SELL_MATCHES DataFrame (sorted for readability) ---
-matches_df = pd.DataFrame(buy_sell_match_rows)
-if not matches_df.empty:
-    # Stable sort: TICKER, BUY_DATE asc, BUY_ID asc; show head rows first
-    matches_df['_BUY_DATE_SORT'] = pd.to_datetime(matches_df['BUY_DATE'], errors='coerce')
-    matches_df = matches_df.sort_values(
-        by=['TICKER', '_BUY_DATE_SORT', 'BUY_ID', 'BUY_ROW_IS_HEAD'],
-        ascending=[True, True, True, False],
-        kind='mergesort'
-    ).drop(columns=['_BUY_DATE_SORT'])
-
-# --- FINAL UPLOAD ---
-upload_to_sheet("FIFO_Summary", pd.DataFrame(portfolio))
-upload_to_sheet("Buy_Trade_Status", pd.DataFrame(buy_status_output), apply_formulas=True)
-upload_to_sheet("Sell_Trade_Status", pd.DataFrame(sell_trade_records))
-upload_to_sheet("BUY_SELL_MATCHES", matches_df)
-
-print("✅ FIFO_Summary, Buy_Trade_Status, Sell_Trade_Status, and BUY_SELL_MATCHES updated.")
+                col_index = header.index(col_name)
+                for r, row in enumerate(upload_values, start=2):
+                    if formula_rows is None or formula_rows[r - 2]:
+                        row[col_index] = formula_map[col_name].format(r=r)
+
+    # Only changed cells / appended rows / trimmed tail rows are sent, in one batch update
+    write_table_diff(ws, [df_data.columns.values.tolist()] + upload_values, value_input_option='USER_ENTERED')
+
+def _matches_frame(buy_sell_match_rows):
+    # BUY_SELL_MATCHES sorted for readability
+    matches_df = pd.DataFrame(buy_sell_match_rows)
+    if not matches_df.empty:
+        # Stable sort: TICKER, BUY_DATE asc, BUY_ID asc; show head rows first
+        matches_df['_BUY_DATE_SORT'] = pd.to_datetime(matches_df['BUY_DATE'], errors='coerce')
+        matches_df = matches_df.sort_values(
+            by=['TICKER', '_BUY_DATE_SORT', 'BUY_ID', 'BUY_ROW_IS_HEAD'],
+            ascending=[True, True, True, False],
+            kind='mergesort'
+        ).drop(columns=['_BUY_DATE_SORT'])
+    return matches_df
+
+def main():
+    # --- STEP 1: DOWNLOAD DATA FROM GOOGLE SHEETS ---
+    client = governed(get_gsheet_client(CREDENTIALS_FILE))  # pooled client + shared Sheets quota limiter
+
+    sheet = open_spreadsheet(client, SPREADSHEET_NAME)
+    worksheet = sheet.worksheet(WORKSHEET_NAME)
+
+    checkpoint = None
+    if FIFO_CHECKPOINT and not FIFO_FULL_REBUILD:
+        checkpoint = _load_checkpoint(FIFO_CHECKPOINT)
+    new_rows = _read_new_orders(sheet, checkpoint) if checkpoint else None
+    if new_rows is None:
+        header, rows = _read_all_orders(worksheet)
+    else:
+        header, rows = checkpoint['header'], checkpoint['rows'] + new_rows
+
+    # --- STEP 2: FIFO PROCESSING ---
+    today = pd.to_datetime("today").normalize()
+
+    states = checkpoint['tickers'] if new_rows is not None else None
+    if states is not None and apply_new_orders(states, _records(header, new_rows)):
+        outputs = outputs_from_states(states, today)
+        print(f"✅ FIFO resumed from checkpoint: {len(new_rows)} new orders applied ({len(rows)} total)")
+    else:
+        outputs = compute_fifo(_records(header, rows), today=today, with_state=bool(FIFO_CHECKPOINT))
+        states = outputs.pop("states", None)
+        print(f"✅ FIFO rebuilt from {len(rows)} orders")
+
+    if FIFO_CHECKPOINT:
+        _save_checkpoint(FIFO_CHECKPOINT, header, rows, states)
+
+    # --- STEP 3: UPLOAD TO GOOGLE SHEETS ---
+    upload_to_sheet(sheet, "FIFO_Summary", pd.DataFrame(outputs["FIFO_Summary"]))
+    if FIFO_PRICE_SOURCE == "kite":
+        from kite_session_vs import get_kite
+        open_tickers = [row['TICKER'] for row in outputs["FIFO_Summary"]]
+        prices = fetch_last_prices(get_kite(), open_tickers) if open_tickers else {}
+        buy_status_df, unpriced = value_buy_status(outputs["Buy_Trade_Status"], prices)
+        upload_to_sheet(sheet, "Buy_Trade_Status", buy_status_df, apply_formulas=unpriced.any(), formula_rows=unpriced)
+    else:
+        upload_to_sheet(sheet, "Buy_Trade_Status", pd.DataFrame(outputs["Buy_Trade_Status"]), apply_formulas=True)
+    upload_to_sheet(sheet, "Sell_Trade_Status", pd.DataFrame(outputs["Sell_Trade_Status"]))
+    upload_to_sheet(sheet, "BUY_SELL_MATCHES", _matches_frame(outputs["BUY_SELL_MATCHES"]))
+
+    print("✅ FIFO_Summary, Buy_Trade_Status, Sell_Trade_Status, and BUY_SELL_MATCHES updated.")
+
+if __name__ == "__main__":
+    main()
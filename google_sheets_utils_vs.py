@@ -1,28 +1,121 @@
 # google_sheets_utils.py
 
 import os
+import json
+import asyncio
+import functools
+import logging
 import time
 import random
+import re
+import tempfile
+import threading
 import collections
 import gspread
+import requests
 from oauth2client.service_account import ServiceAccountCredentials
 from gspread.exceptions import APIError
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
-# ---- Simple token-bucket to keep us under RPM caps (reads/writes) ----
+try:
+    import fcntl  # POSIX; elsewhere the limiter falls back to a per-process window
+except ImportError:
+    fcntl = None
+
+# ---- Shared quota limiter (reads/writes, per service account, across processes) ----
+# combined_run_vs.sh starts ~25 short-lived processes back to back; a per-process
+# window starts empty in each of them, so the window lives in a small state file
+# guarded by an flock. Sheets quotas are per minute per user, separately for reads
+# and writes, so each (service account, kind) pair gets its own sliding window.
 _MAX_RPM = int(os.getenv("GSHEETS_MAX_RPM", "55"))  # conservative default
-_CALL_TIMES = collections.deque()  # timestamps of recent calls (any GET/UPDATE)
+_MAX_READ_RPM = int(os.getenv("GSHEETS_MAX_READ_RPM", str(_MAX_RPM)))
+_MAX_WRITE_RPM = int(os.getenv("GSHEETS_MAX_WRITE_RPM", str(_MAX_RPM)))
+_QUOTA_STATE_FILE = os.getenv(
+    "GSHEETS_QUOTA_STATE", os.path.join(tempfile.gettempdir(), "gsheets_quota_vs.json")
+)
+_WINDOW_S = 60.0
+_CALL_TIMES = collections.defaultdict(collections.deque)  # fallback when flock is unavailable
+_LOCAL_LOCK = threading.Lock()
+
+# gspread method names that consume the *write* quota; everything else is a read
+_WRITE_PREFIXES = (
+    "update", "batch_update", "batch_clear", "clear", "append", "insert", "delete", "del_",
+    "add_", "values_update", "values_append", "values_clear", "values_batch_update",
+    "values_batch_clear", "format", "resize", "sort",
+    "merge", "unmerge", "duplicate", "share", "import_csv",
+)
+
+def _call_kind(name):
+    return "write" if name.startswith(_WRITE_PREFIXES) else "read"
 
-def _throttle():
+def _account_for(obj):
+    """Service-account email behind a gspread Client/Spreadsheet/Worksheet (or a bound method of one)."""
+    obj = getattr(obj, "__self__", obj)
+    # gspread < 6 keeps the credentials on the Client (.auth); gspread 6 moved them to
+    # its HTTPClient (Client.http_client.auth; Spreadsheet/Worksheet.client is that HTTPClient)
+    for path in (
+        ("auth",), ("client", "auth"), ("spreadsheet", "client", "auth"),
+        ("http_client", "auth"), ("client", "http_client", "auth"), ("spreadsheet", "client", "http_client", "auth"),
+    ):
+        cur = obj
+        for attr in path:
+            cur = getattr(cur, attr, None)
+        email = getattr(cur, "service_account_email", None)
+        if email:
+            return email
+    return os.getenv("GSHEETS_QUOTA_ACCOUNT", "default")
+
+def _reserve_slot(key, limit):
+    """
+    Record a call in the shared window for `key` if there is room.
+    Returns 0 on success, else the seconds to wait before trying again.
+    """
     now = time.time()
-    # drop timestamps older than 60s
-    while _CALL_TIMES and now - _CALL_TIMES[0] > 60.0:
-        _CALL_TIMES.popleft()
-    if len(_CALL_TIMES) >= _MAX_RPM:
-        sleep_for = 60.0 - (now - _CALL_TIMES[0]) + 0.01
-        if sleep_for > 0:
-            time.sleep(sleep_for)
-    _CALL_TIMES.append(time.time())
+    with _LOCAL_LOCK:
+        if fcntl is None:
+            times = _CALL_TIMES[key]
+            while times and now - times[0] > _WINDOW_S:
+                times.popleft()
+            if len(times) >= limit:
+                return _WINDOW_S - (now - times[0]) + 0.01
+            times.append(now)
+            return 0
+
+        with open(_QUOTA_STATE_FILE, "a+") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                fh.seek(0)
+                try:
+                    state = json.loads(fh.read() or "{}")
+                except ValueError:
+                    state = {}  # corrupt/partial file: start a fresh window
+                for k in list(state):
+                    state[k] = [t for t in state[k] if now - t <= _WINDOW_S]
+                    if not state[k]:
+                        del state[k]
+                times = state.setdefault(key, [])
+                if len(times) >= limit:
+                    return _WINDOW_S - (now - times[0]) + 0.01
+                times.append(now)
+                fh.seek(0)
+                fh.truncate()
+                fh.write(json.dumps(state))
+                return 0
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+def _throttle(kind="read", account=None):
+    account = account or os.getenv("GSHEETS_QUOTA_ACCOUNT", "default")
+    limit = _MAX_WRITE_RPM if kind == "write" else _MAX_READ_RPM
+    key = f"{account}:{kind}"
+    while True:
+        try:
+            wait = _reserve_slot(key, limit)
+        except OSError:
+            return  # state file unusable (read-only tmp, ...): don't block the call
+        if wait <= 0:
+            return
+        time.sleep(wait)
 
 # ---- Robust wrapper for transient errors (429/5xx), with jitter ----
 def _is_retriable(e: Exception) -> bool:
@@ -37,9 +130,13 @@ def _is_retriable(e: Exception) -> bool:
 def _call_with_retries(fn, *args, **kwargs):
     attempts = int(os.getenv("GSHEETS_MAX_RETRIES", "6"))
     base = float(os.getenv("GSHEETS_BACKOFF_BASE", "0.6"))
+    kind = _call_kind(getattr(fn, "__name__", ""))
+    if getattr(fn, "_throttled", False):
+        return fn(*args, **kwargs)  # a governed() proxy method: it already throttles and retries
+    account = _account_for(fn)
     for i in range(attempts):
         try:
-            _throttle()
+            _throttle(kind, account)
             return fn(*args, **kwargs)
         except Exception as e:
             if i == attempts - 1 or not _is_retriable(e):
@@ -48,28 +145,424 @@ def _call_with_retries(fn, *args, **kwargs):
             sleep_s = (base * (2 ** i)) + random.uniform(0, 0.2)
             time.sleep(sleep_s)
 
-# ---- Auth unchanged ----
-def get_gsheet_client():
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = ServiceAccountCredentials.from_json_keyfile_name("creds_vs.json", scope)
-    return gspread.authorize(creds)
+class QuotaGoverned:
+    """
+    Proxy for a gspread Client / Spreadsheet / Worksheet: every method call goes
+    through the shared quota limiter and 429/5xx retries (_call_with_retries).
+    Spreadsheets/Worksheets returned by those calls are governed too, so
+    governed(gc).open(name).worksheet(tab).get_values(...) is throttled end to end.
+    Attributes (title, id, row_count, ...) pass straight through.
+    """
+    _throttles = True
 
-# ---- Header cache (per worksheet id) ----
-# gspread Worksheet exposes .id for the grid's sheetId in recent versions.
-@lru_cache(maxsize=256)
-def _cached_header_for_sheet(sheet_id: int, fetcher):
-    # fetcher is a zero-arg lambda that will call sheet.row_values(1)
-    return _call_with_retries(fetcher)
+    def __init__(self, target):
+        object.__setattr__(self, "_target", target)
 
-def _get_header_row(sheet):
-    # use cache if possible; fall back to direct call if id missing
+    def _invoke(self, fn, *args, **kwargs):
+        return _call_with_retries(fn, *args, **kwargs)
+
+    def _wrap(self, obj):
+        return governed(obj)
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        # served from memory (e.g. cached worksheet lookup): no quota slot
+        local = name in getattr(self._target, "_local_methods", ())
+
+        def call(*args, **kwargs):
+            fn = getattr(self._target, name)
+            try:
+                return self._wrap(fn(*args, **kwargs) if local else self._invoke(fn, *args, **kwargs))
+            except APIError as e:
+                # built from stale cached metadata (workbook moved, tab re-created): reopen and retry once
+                fresh = _reopen_stale(self._target, e)
+                if fresh is None:
+                    raise
+                object.__setattr__(self, "_target", fresh)
+                fn = getattr(fresh, name)
+                return self._wrap(fn(*args, **kwargs) if local else self._invoke(fn, *args, **kwargs))
+        call.__name__ = name
+        # throttled here (or served from memory): _call_with_retries() calls it as is
+        call._throttled = self._throttles or local
+        return call
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._target!r})"
+
+class _StaleChecked(QuotaGoverned):
+    """
+    QuotaGoverned without the quota limiter: what open_spreadsheet() returns for a raw
+    client, so handles built from cached metadata still recover from a stale cache.
+    """
+    _throttles = False
+
+    def _invoke(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    def _wrap(self, obj):
+        return _StaleChecked(obj) if isinstance(obj, (gspread.Spreadsheet, gspread.Worksheet)) else obj
+
+def governed(obj):
+    """Wrap gspread Client/Spreadsheet/Worksheet objects in QuotaGoverned (other values, and already governed ones, pass through)."""
+    if type(obj) is QuotaGoverned:
+        return obj
+    if isinstance(obj, _StaleChecked):
+        return QuotaGoverned(obj._target)
+    if isinstance(obj, (gspread.Client, gspread.Spreadsheet, gspread.Worksheet)) or getattr(obj, "_fake_sheets", False):
+        return QuotaGoverned(obj)
+    return obj
+
+def _unwrap(obj):
+    # the raw gspread object behind a governed() proxy (helpers throttle it themselves)
+    return getattr(obj, "_target", obj)
+
+# ---- Auth: one pooled client per credentials file, per process ----
+_SCOPES = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+_POOL_SIZE = int(os.getenv("GSHEETS_POOL_SIZE", "10"))  # >= worker threads sharing the client
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+# "memory" or a JSON store path: every client is a fake_sheets_vs.FakeClient (offline runs/benchmarks)
+_FAKE_BACKEND = os.getenv("GSHEETS_FAKE", "")
+
+def _http_session(client):
+    # gspread 6: client.http_client.session; gspread 5: client.session
+    http_client = getattr(client, "http_client", None)
+    return getattr(http_client, "session", None) or getattr(client, "session", None)
+
+def get_gsheet_client(creds_path="creds_vs.json"):
+    """
+    Memoised gspread client: credentials are loaded, a token minted and a
+    keep-alive HTTPS pool opened once per process (per credentials file);
+    every later call returns the same client.
+    GSHEETS_FAKE set: an offline fake_sheets_vs client instead (credentials unused).
+    """
+    if _FAKE_BACKEND:
+        from fake_sheets_vs import fake_client
+        return fake_client(_FAKE_BACKEND)
+    key = os.path.abspath(creds_path)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, _SCOPES)
+            client = gspread.authorize(creds)
+            session = _http_session(client)
+            if session is not None:
+                adapter = requests.adapters.HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE)
+                session.mount("https://", adapter)
+            _CLIENTS[key] = client
+        return client
+
+# ---- Spreadsheet metadata cache (title -> key, worksheet properties), on disk ----
+# gc.open(title) is a Drive search plus a metadata fetch, and .worksheet(tab) is
+# another metadata fetch. Titles, keys, sheet ids and grid sizes rarely change, so
+# they are cached across runs; a warm open_spreadsheet() costs no API calls.
+_META_CACHE_FILE = os.getenv(
+    "GSHEETS_META_CACHE", os.path.join(tempfile.gettempdir(), "gsheets_meta_vs.json")
+)
+_META_TTL_S = float(os.getenv("GSHEETS_META_TTL_S", str(24 * 3600)))
+_META_LOCK = threading.Lock()
+
+def _load_meta_cache():
+    try:
+        with open(_META_CACHE_FILE) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def _save_meta_cache(cache):
+    # write-then-rename so concurrent readers never see a partial file
+    tmp = f"{_META_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as fh:
+            json.dump(cache, fh)
+        os.replace(tmp, _META_CACHE_FILE)
+    except OSError:
+        pass  # cache is best-effort
+
+def _cached_meta(title):
+    with _META_LOCK:
+        entry = _load_meta_cache().get(title)
+    if entry and time.time() - entry.get("fetched_at", 0) <= _META_TTL_S:
+        return entry
+    return None
+
+def _store_meta(title, key, sheets):
+    with _META_LOCK:
+        cache = _load_meta_cache()
+        cache[title] = {"key": key, "sheets": sheets, "fetched_at": time.time()}
+        _save_meta_cache(cache)
+
+def invalidate_spreadsheet_cache(title=None):
+    """Drop one workbook's cached metadata (or all of it when title is None)."""
+    with _META_LOCK:
+        cache = _load_meta_cache() if title is not None else {}
+        cache.pop(title, None)
+        _save_meta_cache(cache)
+
+class _CachedSpreadsheet(gspread.Spreadsheet):
+    """
+    Spreadsheet handle built from cached metadata: no fetch on construction, and
+    worksheet(tab) is served from the cached worksheet properties. A tab missing
+    from the cache falls back to a real (throttled) lookup and invalidates the entry.
+    """
+    _local_methods = ("worksheet",)
+
+    def __init__(self, client, title, key, sheets):
+        # gspread 6 keeps the HTTP client on the Spreadsheet; gspread 5 the Client itself
+        self.client = getattr(client, "http_client", client)
+        self._properties = {"id": key, "title": title}
+        self._open_client = client
+        self._cached_title = title
+        self._cached_sheets = sheets
+
+    def worksheet(self, title):
+        props = self._cached_sheets.get(title)
+        if props is None:
+            invalidate_spreadsheet_cache(self._cached_title)
+            return _call_with_retries(super().worksheet, title)
+        try:
+            return gspread.Worksheet(self, dict(props), self.id, self.client)  # gspread 6
+        except TypeError:
+            return gspread.Worksheet(self, dict(props))  # gspread 5
+
+def _is_stale_lookup(e):
+    # the cached key no longer opens (404), or a cached sheetId no longer exists
+    try:
+        code = int(getattr(e, "response", None) and e.response.status_code or 0)
+    except Exception:
+        code = 0
+    message = str(e).lower()
+    return code == 404 or (code == 400 and ("no grid with id" in message or "sheetid" in message))
+
+def _reopen_stale(target, error):
+    """
+    Fresh Spreadsheet/Worksheet for `target` after a stale-cache APIError: the cache entry
+    is dropped and the workbook opened again by title. None if `target` wasn't built from
+    the cache or the error isn't a stale lookup.
+    """
+    book = target if isinstance(target, _CachedSpreadsheet) else getattr(target, "spreadsheet", None)
+    if not isinstance(book, _CachedSpreadsheet) or not _is_stale_lookup(error):
+        return None
+    logging.info(f"♻️ Cached metadata for '{book._cached_title}' is stale ({error}); reopening")
+    invalidate_spreadsheet_cache(book._cached_title)
+    fresh = _unwrap(open_spreadsheet(governed(book._open_client), book._cached_title))
+    return fresh if target is book else fresh.worksheet(target.title)
+
+def open_spreadsheet(client, title):
+    """
+    Drop-in for client.open(title), backed by the on-disk metadata cache.
+    Cold: client.open() plus one metadata fetch (cached for GSHEETS_META_TTL_S), tabs free.
+    Warm: no API calls. If the workbook moved or a tab was renamed, call
+    invalidate_spreadsheet_cache(title); a tab missing from the cache does it automatically,
+    and a 404 / unknown sheetId on a cached handle drops the entry and retries once on a
+    fresh open. Works with governed(client) too (the result is governed).
+    """
+    raw_client = _unwrap(client)
+    wrap = governed if raw_client is not client else _StaleChecked
+    if getattr(raw_client, "_fake_sheets", False):
+        return client.open(title)  # fake backend: nothing worth caching on disk
+
+    entry = _cached_meta(title)
+    if entry is not None:
+        return wrap(_CachedSpreadsheet(raw_client, title, entry["key"], entry["sheets"]))
+
+    spreadsheet = client.open(title)
+    try:
+        metadata = _call_with_retries(_unwrap(spreadsheet).fetch_sheet_metadata)
+    except Exception as e:
+        logging.debug(f"Could not cache metadata for '{title}': {e}")
+        return spreadsheet
+    sheets = {s["properties"]["title"]: s["properties"] for s in metadata.get("sheets", [])}
+    _store_meta(title, spreadsheet.id, sheets)
+    # tabs are served from the metadata just fetched (no per-tab fetch on this run either)
+    return wrap(_CachedSpreadsheet(raw_client, title, spreadsheet.id, sheets))
+
+# ---- Schema cache (per worksheet) ----
+# Keyed on (spreadsheet id, worksheet id) so a Worksheet object re-opened later in
+# the run still hits. Anything that writes row 1 must call invalidate_sheet_schema()
+# once the write is sent, or prime_sheet_schema() with the header it wrote.
+# last_row is the last data row as far as this process knows: set by a column probe
+# (prime_sheet_schema) or an open-ended read, raised by writes sent through this module,
+# and used to bound windowed reads. None = unknown (reads are not bounded).
+class SheetSchema:
+    """Header row, column-name -> 1-based index map and last known data row of one worksheet."""
+    __slots__ = ("header", "col_index", "last_row")
+
+    def __init__(self, header, last_row=None):
+        self.header = list(header)
+        self.col_index = {}
+        for i, name in enumerate(self.header, start=1):
+            self.col_index.setdefault(name, i)  # first occurrence wins, like list.index
+        self.last_row = last_row
+
+_SCHEMAS = {}
+_SCHEMAS_LOCK = threading.Lock()
+
+def _schema_key(sheet):
     sid = getattr(sheet, "id", None)
     if sid is None:
-        return _call_with_retries(sheet.row_values, 1)
-    return _cached_header_for_sheet(sid, lambda: sheet.row_values(1))
+        return None
+    spreadsheet = getattr(sheet, "spreadsheet", None)
+    return (getattr(spreadsheet, "id", None), sid)
+
+def get_sheet_schema(sheet):
+    """Cached SheetSchema for `sheet`; row 1 is fetched only on the first call."""
+    key = _schema_key(sheet)
+    if key is not None:
+        with _SCHEMAS_LOCK:
+            schema = _SCHEMAS.get(key)
+        if schema is not None:
+            return schema
+    schema = SheetSchema(_call_with_retries(sheet.row_values, 1))
+    if key is not None and schema.header:  # never cache an empty header
+        with _SCHEMAS_LOCK:
+            _SCHEMAS[key] = schema
+    return schema
+
+def prime_sheet_schema(sheet, header, last_row=None):
+    """
+    Seed the cache with a header row the caller already read (e.g. from a batched probe),
+    and the last data row if it was probed too (otherwise the cached one is kept).
+    """
+    key = _schema_key(sheet)
+    if key is not None and header:
+        with _SCHEMAS_LOCK:
+            if last_row is None and key in _SCHEMAS:
+                last_row = _SCHEMAS[key].last_row
+            _SCHEMAS[key] = SheetSchema(header, last_row)
+
+def invalidate_sheet_schema(sheet):
+    """Forget the cached schema after row 1 of `sheet` was written."""
+    key = _schema_key(sheet)
+    with _SCHEMAS_LOCK:
+        _SCHEMAS.pop(key, None)
+
+def _note_last_row(sheet, last_row, exact=False):
+    # exact: the data is known to end at last_row (probe / open-ended read); otherwise a
+    # write reached last_row, which only raises an already known value
+    key = _schema_key(sheet)
+    with _SCHEMAS_LOCK:
+        schema = _SCHEMAS.get(key)
+        if schema is None:
+            return
+        if exact:
+            schema.last_row = max(last_row, 1)
+        elif schema.last_row is not None:
+            schema.last_row = max(schema.last_row, last_row)
+
+def _get_header_row(sheet):
+    return get_sheet_schema(sheet).header
+
+# ---- Column-projected / columnar reads ----
+def _column_runs(col_numbers):
+    """Group sorted 1-based column numbers into contiguous (first, last) runs: 1,2,3,7 -> (1,3),(7,7)."""
+    runs = []
+    for c in sorted(set(col_numbers)):
+        if runs and c == runs[-1][1] + 1:
+            runs[-1][1] = c
+        else:
+            runs.append([c, c])
+    return runs
+
+def _to_number(v):
+    """Typed parse for numeric columns: int/float as-is, numeric text parsed, blanks/junk -> None."""
+    if isinstance(v, bool):
+        return None
+    if isinstance(v, (int, float)):
+        return v
+    text = str(v).strip().replace(",", "")
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def _read_columns(sheet, columns, start_row, end_row):
+    """
+    Column-projected read: only the requested header names are fetched, one A1
+    range per contiguous run of columns, all in a single values_batch_get.
+    Names missing from the header are skipped. Returns {name: [values...]}.
+    """
+    schema = get_sheet_schema(sheet)
+    wanted = [c for c in dict.fromkeys(columns) if c in schema.col_index]
+    if not wanted:
+        return {}
+    runs = _column_runs(schema.col_index[c] for c in wanted)
+    end = end_row if end_row is not None else ""
+    ranges = [
+        a1_tab_range(sheet.title, f"{_col_num_to_letter(a)}{start_row}:{_col_num_to_letter(b)}{end}")
+        for a, b in runs
+    ]
+    resp = _call_with_retries(
+        sheet.spreadsheet.values_batch_get, ranges,
+        params={"valueRenderOption": "UNFORMATTED_VALUE"},
+    )
+    blocks = [vr.get("values", []) for vr in resp.get("valueRanges", [])]
+    blocks += [[]] * (len(runs) - len(blocks))
+    # Each range is trimmed independently, so pad every block to the longest one
+    n_rows = max((len(b) for b in blocks), default=0)
+
+    by_col = {}
+    for (a, b), block in zip(runs, blocks):
+        for offset in range(b - a + 1):
+            by_col[a + offset] = [r[offset] if offset < len(r) else "" for r in block] + [""] * (n_rows - len(block))
+    return {name: by_col[schema.col_index[name]] for name in wanted}
+
+def _read_rows(sheet, start_row, end_row, as_dict, columns, columnar, numeric):
+    schema = get_sheet_schema(sheet)
+    header = schema.header
+    if not header:
+        raise ValueError("Header row (row 1) is empty.")
+    if end_row is not None and schema.last_row is not None:
+        end_row = min(end_row, schema.last_row)  # nothing to read past the last known data row
+    past_end = end_row is not None and end_row < start_row
+
+    if columns is not None:
+        if past_end:
+            cols = {name: [] for name in columns if name in schema.col_index}
+        else:
+            cols = _read_columns(sheet, columns, start_row, end_row)
+        names = list(cols)
+    else:
+        max_col_letter = _col_num_to_letter(len(header))
+        end = end_row if end_row is not None else ""
+        rows = [] if past_end else _call_with_retries(
+            sheet.get, f"A{start_row}:{max_col_letter}{end}", value_render_option="UNFORMATTED_VALUE"
+        )
+        if end_row is None:
+            _note_last_row(sheet, start_row + len(rows) - 1, exact=True)  # full-width read to the end
+        # Pad shorter rows to header length
+        rows = [row + [""] * (len(header) - len(row)) for row in rows]
+        names = header
+        if columnar:
+            cols = {}
+            for i, name in enumerate(header):
+                cols.setdefault(name, [row[i] for row in rows])  # first occurrence wins, like dict(zip())
+    if columnar:
+        for name in numeric or ():
+            if name in cols:
+                cols[name] = [_to_number(v) for v in cols[name]]
+        if columnar == "frame":
+            import pandas as pd
+            return pd.DataFrame(cols)
+        return cols
+
+    if columns is not None:
+        rows = [list(r) for r in zip(*(cols[n] for n in names))]
+    if as_dict:
+        return [dict(zip(names, row)) for row in rows]
+    return rows
 
 # ---- Public API (unchanged signatures) ----
 def read_sheet(sheet_id, sheet_name):
@@ -83,31 +576,124 @@ def read_sheet(sheet_id, sheet_name):
     records = _call_with_retries(sheet.get_all_records)
     return records, sheet
 
-def read_rows_from_sheet(sheet, start_row, num_rows, as_dict=False):
+def read_rows_from_sheet(sheet, start_row, num_rows, as_dict=False, columns=None, columnar=False, numeric=None):
     """
     Reads `num_rows` rows starting at `start_row` (1-based index) from the sheet.
     If as_dict=True, returns list of dicts keyed by header row (row 1).
     Otherwise, returns list of lists (values).
+    - columns: header names to fetch; only those columns are requested (one range per
+      contiguous run, one batched call). Rows/dicts then hold just those columns, in that order.
+    - columnar: True -> {column: [values...]}; "frame" -> pandas DataFrame. No per-row objects.
+    - numeric: column names parsed to numbers in columnar mode (blank/unparseable -> None).
     """
-    header = _get_header_row(sheet)
-    if not header:
-        raise ValueError("Header row (row 1) is empty.")
+    return _read_rows(sheet, start_row, start_row + num_rows - 1, as_dict, columns, columnar, numeric)
 
-    end_row = start_row + num_rows - 1
-    max_col_letter = _col_num_to_letter(len(header))
-    range_str = f"A{start_row}:{max_col_letter}{end_row}"
+def read_all_rows_from_sheet(sheet, start_row=2, as_dict=False, columns=None, columnar=False, numeric=None):
+    """
+    Reads every row from `start_row` (1-based) to the end of the sheet in a single
+    values call (open-ended range, so no per-batch windows and no row_count guess).
+    Same return shape and options as read_rows_from_sheet.
+    """
+    return _read_rows(sheet, start_row, None, as_dict, columns, columnar, numeric)
 
-    rows = _call_with_retries(
-        sheet.get, range_str, value_render_option="UNFORMATTED_VALUE"
-    )
+def iter_row_batches(sheet, start_row=2, batch_size=1000, max_row=None, as_dict=False, columns=None, prefetch=True):
+    """
+    Stream the sheet in read_rows_from_sheet batches, yielding (first_row, rows).
+    - prefetch=True: batch N+1 is fetched on a background thread while the caller
+      works on batch N, so Sheets reads overlap whatever the caller does (e.g. Kite calls).
+    - max_row known (e.g. probed from column A): every window up to max_row is read;
+      the API trims trailing rows that are blank in the requested columns, so a short
+      or empty window does not mean the data ended. Empty windows are not yielded.
+    - max_row=None: bounded by the schema cache's last known data row if there is one;
+      otherwise a batch shorter than requested is the end of data.
+    """
+    if max_row is None:
+        max_row = get_sheet_schema(sheet).last_row
+    def fetch(first):
+        n = batch_size if max_row is None else min(batch_size, max_row - first + 1)
+        rows = read_rows_from_sheet(sheet, first, n, as_dict=as_dict, columns=columns) if n > 0 else []
+        return first, n, rows
 
-    # Pad shorter rows to header length
-    padded_rows = [row + [""] * (len(header) - len(row)) for row in rows]
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheet-prefetch") if prefetch else None
+    pending = None
+    try:
+        first, requested, rows = fetch(start_row)
+        while True:
+            if max_row is None:
+                next_row = first + len(rows)
+                more = bool(rows) and len(rows) == requested
+            else:
+                next_row = first + requested
+                more = next_row <= max_row
+            if more and pool is not None:
+                pending = pool.submit(fetch, next_row)
+            if rows:
+                yield first, rows
+            if not more:
+                return
+            if pending is not None:
+                first, requested, rows = pending.result()
+                pending = None
+            else:
+                first, requested, rows = fetch(next_row)
+    finally:
+        if pending is not None:
+            pending.cancel()
+        if pool is not None:
+            pool.shutdown(wait=False)
 
-    if as_dict:
-        return [dict(zip(header, row)) for row in padded_rows]
-    else:
-        return padded_rows
+class SheetReadPlan:
+    """
+    Gather every A1 range a step needs, fetch them all with ONE values_batch_get
+    on the spreadsheet, then serve them from memory.
+    Default render is FORMATTED_VALUE, i.e. the same values acell/row_values/col_values return.
+
+        plan = SheetReadPlan(spreadsheet)
+        plan.add("'GTT_INS'!K1"); plan.add("'GTT_INS'!1:1")
+        plan.execute()
+        plan.cell("'GTT_INS'!K1"), plan.row("'GTT_INS'!1:1")
+    """
+    def __init__(self, spreadsheet, value_render_option="FORMATTED_VALUE"):
+        self.spreadsheet = spreadsheet
+        self.value_render_option = value_render_option
+        self.ranges = []
+        self._values = {}
+
+    def add(self, a1_range):
+        if a1_range not in self.ranges:
+            self.ranges.append(a1_range)
+        return a1_range
+
+    def execute(self):
+        if not self.ranges:
+            return self
+        resp = _call_with_retries(
+            self.spreadsheet.values_batch_get,
+            self.ranges,
+            params={"valueRenderOption": self.value_render_option},
+        )
+        for rng, value_range in zip(self.ranges, resp.get("valueRanges", [])):
+            self._values[rng] = value_range.get("values", [])
+        return self
+
+    def get(self, a1_range):
+        """All rows of the range (list of lists; trailing empties trimmed, as the API returns them)."""
+        return self._values[a1_range]
+
+    def row(self, a1_range):
+        values = self.get(a1_range)
+        return values[0] if values else []
+
+    def column(self, a1_range):
+        return [r[0] if r else "" for r in self.get(a1_range)]
+
+    def cell(self, a1_range):
+        values = self.get(a1_range)
+        return values[0][0] if values and values[0] else ""
+
+def a1_tab_range(tab_name, a1):
+    """Quote a tab name for use in a batch range: ("GTT INS", "K1") -> "'GTT INS'!K1"."""
+    return "'{}'!{}".format(tab_name.replace("'", "''"), a1)
 
 def write_rows(sheet, rows, start_row_index):
     """
@@ -126,6 +712,103 @@ def write_rows(sheet, rows, start_row_index):
 
     body = {"range": rng, "majorDimension": "ROWS", "values": rows}
     _call_with_retries(sheet.update, rng, rows)
+    if start_row_index == 1:
+        invalidate_sheet_schema(sheet)
+    else:
+        _note_last_row(sheet, end_row_index)
+
+def normalize_cell(v):
+    """Compare sheet cells and Python values loosely: numbers by value, everything else as trimmed text."""
+    if v is None or v == "":
+        return ""
+    if isinstance(v, bool):
+        return str(v).upper()  # Sheets renders booleans as TRUE/FALSE
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return str(v).strip()
+
+def _changed_blocks(old, new, width):
+    """
+    Yield (row_offset, col_offset, rows) blocks covering every cell where `new`
+    differs from `old`: one span per changed row (first..last changed column),
+    with consecutive rows sharing the same span merged into one block.
+    """
+    block = None  # [row_start, col_start, col_end, rows]
+    for r in range(len(new)):
+        new_row = list(new[r]) + [""] * (width - len(new[r]))
+        old_row = list(old[r]) if r < len(old) else []
+        old_row += [""] * (width - len(old_row))
+        changed = [c for c in range(width) if normalize_cell(new_row[c]) != normalize_cell(old_row[c])]
+        if not changed:
+            if block:
+                yield block[0], block[1], block[3]
+                block = None
+            continue
+        c0, c1 = changed[0], changed[-1]
+        if block and block[1] == c0 and block[2] == c1 and block[0] + len(block[3]) == r:
+            block[3].append(new_row[c0:c1 + 1])
+        else:
+            if block:
+                yield block[0], block[1], block[3]
+            block = [r, c0, c1, [new_row[c0:c1 + 1]]]
+    if block:
+        yield block[0], block[1], block[3]
+
+def write_table_diff(sheet, values, start_row=1, start_col=1, previous=None, trim=True,
+                     value_input_option="RAW"):
+    """
+    Make the block at (start_row, start_col) equal `values` while sending only what changed:
+    changed cell spans, appended rows and (trim=True) blanked tail rows, all in ONE batch_update.
+    Replaces clear() + full rewrite, so downstream formulas only recalc for rows that churned.
+    - previous: the block's current contents if the caller already has them; otherwise
+      they are read once (FORMULA render, so formulas compare as their text).
+    - Anchored at A1 the whole tab is compared (cells right of the new width are cleared too).
+    Returns {"ranges", "cells", "rows"} of what was written.
+    """
+    target = _unwrap(sheet)  # governed() proxy: throttle once, here
+    values = [["" if v is None else v for v in row] for row in values]
+    width = max((len(r) for r in values), default=0)
+
+    if previous is None:
+        if start_row == 1 and start_col == 1:
+            previous = _call_with_retries(
+                target.get, value_render_option="FORMULA", date_time_render_option="FORMATTED_STRING"
+            )
+        else:
+            rng = f"{_col_num_to_letter(start_col)}{start_row}:{_col_num_to_letter(start_col + max(width, 1) - 1)}"
+            previous = _call_with_retries(
+                target.get, rng, value_render_option="FORMULA", date_time_render_option="FORMATTED_STRING"
+            )
+    previous = previous or []
+    if start_row == 1 and start_col == 1:
+        width = max([width] + [len(r) for r in previous])
+
+    target_rows = list(values)
+    if trim and len(previous) > len(values):
+        target_rows += [[""] * width for _ in range(len(previous) - len(values))]
+
+    updates = []
+    cells = 0
+    header_written = False
+    for r_off, c_off, rows in _changed_blocks(previous, target_rows, width):
+        r0, c0 = start_row + r_off, start_col + c_off
+        header_written = header_written or r0 == 1
+        rng = f"{_col_num_to_letter(c0)}{r0}:{_col_num_to_letter(c0 + len(rows[0]) - 1)}{r0 + len(rows) - 1}"
+        updates.append({"range": rng, "values": rows})
+        cells += len(rows) * len(rows[0])
+
+    stats = {"ranges": len(updates), "cells": cells, "rows": len(values)}
+    if not updates:
+        return stats
+    _call_with_retries(target.batch_update, updates, value_input_option=value_input_option)
+    if header_written:
+        invalidate_sheet_schema(target)
+    elif trim and start_row == 1 and start_col == 1:
+        _note_last_row(target, len(values), exact=True)  # the whole tab now holds exactly `values`
+    else:
+        _note_last_row(target, start_row + len(values) - 1)
+    return stats
 
 def clear_column(sheet, col_name):
     """
@@ -149,3 +832,197 @@ def _col_num_to_letter(col_num):
         col_num, remainder = divmod(col_num - 1, 26)
         letters = chr(65 + remainder) + letters
     return letters
+
+def _col_letter_to_num(letters):
+    """Inverse of _col_num_to_letter: A -> 1, AA -> 27."""
+    num = 0
+    for ch in letters.upper():
+        num = num * 26 + ord(ch) - 64
+    return num
+
+# ---- Run-scoped write coalescer ----
+_A1_RE = re.compile(r"^([A-Za-z]*)(\d*)(?::([A-Za-z]*)(\d*))?$")
+_OPEN = float("inf")
+
+def _a1_bounds(a1, values=None):
+    """
+    (row1, col1, row2, col2) covered by an A1 range on one tab; open ends are inf.
+    With `values`, the extent is the block written from the range's top-left cell.
+    None if the range can't be parsed (treated as overlapping everything).
+    """
+    m = _A1_RE.match(a1.replace("$", ""))
+    if not m or not (m.group(1) or m.group(2)):
+        return None
+    c1, r1, c2, r2 = m.groups()
+    if m.group(3) is None and m.group(4) is None:  # single cell / whole row / whole column
+        c2, r2 = c1, r1
+    row1, col1 = int(r1) if r1 else 1, _col_letter_to_num(c1) if c1 else 1
+    if values is not None:
+        width = max((len(r) for r in values), default=1)
+        return row1, col1, row1 + max(len(values), 1) - 1, col1 + max(width, 1) - 1
+    return row1, col1, int(r2) if r2 else _OPEN, _col_letter_to_num(c2) if c2 else _OPEN
+
+def _ops_overlap(a, b):
+    if a["sheet_id"] != b["sheet_id"]:
+        return False
+    if a["bounds"] is None or b["bounds"] is None:
+        return True
+    ar1, ac1, ar2, ac2 = a["bounds"]
+    br1, bc1, br2, bc2 = b["bounds"]
+    return ar1 <= br2 and br1 <= ar2 and ac1 <= bc2 and bc1 <= ac2
+
+class SheetWriteBuffer:
+    """
+    Collect value writes and clears for a whole run; commit() sends them as few
+    spreadsheets.values.batchUpdate / values.batchClear requests as ordering allows.
+    - Ops are grouped per spreadsheet. A new op joins the latest request of the same
+      kind (and valueInputOption) unless an overlapping op was queued after it, so the
+      sheet ends up exactly as if every write had been sent directly, in order.
+    - Commit at explicit points (anything that must read back what was written) or
+      use it as a context manager: pending ops are committed on exit, even on error.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._books = {}  # spreadsheet id -> {"spreadsheet": ..., "requests": [...]}
+        self.ops_sent = 0
+        self.requests_sent = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.commit()
+        except Exception as e:
+            if exc_type is None:
+                raise
+            logging.error(f"❌ Could not commit buffered Sheets writes: {e}")
+        return False
+
+    def _queue(self, worksheet, kind, a1, values=None, value_input_option=None):
+        ws = _unwrap(worksheet)
+        spreadsheet = _unwrap(ws.spreadsheet)
+        op = {
+            "worksheet": ws,
+            "sheet_id": ws.id,
+            "bounds": _a1_bounds(a1, values),
+            "range": a1_tab_range(ws.title, a1),
+            "values": values,
+        }
+        with self._lock:
+            book = self._books.setdefault(spreadsheet.id, {"spreadsheet": spreadsheet, "requests": []})
+            requests_ = book["requests"]
+            target = None
+            for req in reversed(requests_):
+                if req["kind"] == kind and req["option"] == value_input_option:
+                    # two writes to the same cells keep separate requests (last one must win)
+                    if kind == "clear" or not any(_ops_overlap(op, o) for o in req["ops"]):
+                        target = req
+                    break
+                if any(_ops_overlap(op, o) for o in req["ops"]):
+                    break  # can't be moved ahead of an overlapping op
+            if target is None:
+                target = {"kind": kind, "option": value_input_option, "ops": []}
+                requests_.append(target)
+            target["ops"].append(op)
+
+    def update(self, worksheet, a1, values, value_input_option="RAW"):
+        """Queue a value write of `values` (list of rows) at `a1` on `worksheet`."""
+        self._queue(worksheet, "update", a1, values=values, value_input_option=value_input_option)
+
+    def batch_update(self, worksheet, data, value_input_option="RAW"):
+        """Same shape as Worksheet.batch_update: [{"range": a1, "values": rows}, ...]."""
+        for item in data:
+            self.update(worksheet, item["range"], item["values"], value_input_option=value_input_option)
+
+    def update_cell(self, worksheet, row, col, value, value_input_option="RAW"):
+        self.update(worksheet, f"{_col_num_to_letter(col)}{row}", [[value]], value_input_option=value_input_option)
+
+    def batch_clear(self, worksheet, ranges):
+        """Queue clears of A1 ranges on `worksheet` (values only; formatting is kept)."""
+        for a1 in ranges:
+            self._queue(worksheet, "clear", a1)
+
+    def pending(self):
+        with self._lock:
+            return sum(len(r["ops"]) for b in self._books.values() for r in b["requests"])
+
+    def commit(self):
+        """Send everything queued so far; returns the number of API requests made."""
+        with self._lock:
+            books, self._books = self._books, {}
+        sent, ops, first_error = 0, 0, None
+        for book in books.values():
+            spreadsheet = book["spreadsheet"]
+            try:
+                for req in book["requests"]:
+                    if req["kind"] == "clear":
+                        body = {"ranges": [o["range"] for o in req["ops"]]}
+                        _call_with_retries(spreadsheet.values_batch_clear, body=body)
+                    else:
+                        body = {
+                            "valueInputOption": req["option"],
+                            "data": [{"range": o["range"], "values": o["values"]} for o in req["ops"]],
+                        }
+                        _call_with_retries(spreadsheet.values_batch_update, body)
+                        for o in req["ops"]:
+                            if o["bounds"] is not None and o["values"]:
+                                _note_last_row(o["worksheet"], o["bounds"][2])
+                    sent += 1
+                    ops += len(req["ops"])
+            except Exception as e:
+                logging.error(f"❌ Buffered Sheets writes to '{getattr(spreadsheet, 'title', spreadsheet.id)}' failed: {e}")
+                first_error = first_error or e
+        self.requests_sent += sent
+        self.ops_sent += ops
+        if ops:
+            logging.info(f"✅ Committed {ops} buffered Sheets writes in {sent} requests")
+        if first_error is not None:
+            raise first_error
+        return sent
+
+# ---- Asyncio layer: fan out requests across many workbooks ----
+# gspread is synchronous, so each request runs on a small thread pool; awaiting
+# several of them with asyncio.gather() overlaps their round trips. Every request
+# still goes through _call_with_retries, i.e. the shared quota limiter.
+_ASYNC_WORKERS = int(os.getenv("GSHEETS_ASYNC_WORKERS", "8"))
+_ASYNC_POOL = None
+_ASYNC_POOL_LOCK = threading.Lock()
+
+def _async_pool():
+    global _ASYNC_POOL
+    with _ASYNC_POOL_LOCK:
+        if _ASYNC_POOL is None:
+            _ASYNC_POOL = ThreadPoolExecutor(max_workers=_ASYNC_WORKERS, thread_name_prefix="gsheets")
+        return _ASYNC_POOL
+
+async def _run_async(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_async_pool(), functools.partial(fn, *args, **kwargs))
+
+async def async_call(fn, *args, **kwargs):
+    """Await any gspread call (throttled + retried) without blocking the event loop."""
+    return await _run_async(_call_with_retries, fn, *args, **kwargs)
+
+async def async_open_spreadsheet(client, title):
+    """open_spreadsheet() (metadata cache included) off the event loop; the lookup is throttled."""
+    return await _run_async(open_spreadsheet, governed(_unwrap(client)), title)
+
+async def async_fetch_metadata(spreadsheet):
+    return await async_call(_unwrap(spreadsheet).fetch_sheet_metadata)
+
+async def async_values_batch_get(spreadsheet, ranges, value_render_option="FORMATTED_VALUE"):
+    """One values_batch_get; returns the values of each range (list of lists), in order."""
+    resp = await async_call(
+        _unwrap(spreadsheet).values_batch_get, list(ranges),
+        params={"valueRenderOption": value_render_option},
+    )
+    value_ranges = resp.get("valueRanges", [])
+    return [value_ranges[i].get("values", []) if i < len(value_ranges) else [] for i in range(len(ranges))]
+
+async def async_batch_update(worksheet, data, value_input_option="RAW"):
+    """data: [{"range": "A1", "values": [[...]]}, ...] written in one call."""
+    return await async_call(_unwrap(worksheet).batch_update, data, value_input_option=value_input_option)
+
+async def async_batch_clear(worksheet, ranges):
+    return await async_call(_unwrap(worksheet).batch_clear, list(ranges))
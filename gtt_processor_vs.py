@@ -1,7 +1,8 @@
 from kiteconnect import KiteConnect, exceptions as kite_exceptions
 from kite_session_vs import get_kite
-from fetch_google_gtt_instructions_vs import fetch_gtt_instructions_batch, get_instructions_sheet
-from fetch_google_existing_gtts_vs import fetch_existing_gtts_batch, get_tracking_sheet
+from fetch_google_gtt_instructions_vs import fetch_gtt_instructions_batch, iter_gtt_instruction_batches, get_instructions_sheet
+from fetch_google_existing_gtts_vs import fetch_all_existing_gtts, get_tracking_sheet
+from fetch_all_gtts_vs import open_gtt_book, single_gtt_row
 # --- Batch size: single source of truth from config_vs.py ---
 try:
     import config_vs
@@ -19,9 +20,14 @@ except Exception as e:
     raise SystemExit(f"config_vs.BATCH_SIZE is invalid: {e}")
 # --- End batch size setup ---
 
-from google_sheets_utils_vs import get_gsheet_client
+from google_sheets_utils_vs import (
+    get_gsheet_client, SheetReadPlan, SheetWriteBuffer, a1_tab_range, prime_sheet_schema,
+)
 
 import logging
+import os
+import threading
+import functools
 import traceback
 import time
 import datetime
@@ -29,6 +35,9 @@ import hashlib
 import random
 import socket
 import datetime
+import sys
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
@@ -99,6 +108,7 @@ def process_place(
         return
 
     update_status(status_manager, row_num, "✅ placed")
+    return gtt_id
 
 def process_update(
     status_manager, row_num, matches, quantity, trigger_price, symbol, exchange, side,
@@ -158,6 +168,7 @@ def process_update(
                 orders=[order_update],
             )
             update_status(status_manager, row_num, "✅ updated")
+            return gtt_id
         except kite_exceptions.KiteException as e:
             update_status(status_manager, row_num, f"❌ Kite error: {e}")
             failed_rows.append({"row_number": row_num, "reason": f"Kite error: {e}"})
@@ -196,6 +207,7 @@ def process_delete(
         try:
             safe_api_call(kite.delete_gtt, gtt_id)
             update_status(status_manager, row_num, "✅ deleted")
+            return gtt_id
         except kite_exceptions.KiteException as e:
             update_status(status_manager, row_num, f"❌ Kite error: {e}")
             failed_rows.append({"row_number": row_num, "reason": f"Kite error: {e}"})
@@ -295,6 +307,7 @@ def _floats_equal(a, b, tol=0.01):
         bf = 0.0
     return abs(af - bf) <= tol
 
+@lru_cache(maxsize=4096)
 def normalize_type_for_matching(raw_type: str):
     if raw_type is None:
         return ""
@@ -352,6 +365,164 @@ def find_matching_data_rows(instr_row, data_rows, update_match=False):
     else:
         return [row for row in data_rows if rows_match_4_elements(instr_row, row)]
 
+def _match_ticker_key(raw_ticker):
+    return str(raw_ticker or "").strip().upper()
+
+def _canonical_ticker_key(raw_ticker):
+    # "INFY" and "NSE:INFY" are the same instrument (parse_ticker defaults to NSE)
+    exchange, symbol = parse_ticker(_match_ticker_key(raw_ticker))
+    return f"{exchange}:{symbol}"
+
+def _price_bucket(price):
+    """
+    Bucket a price into 0.01-wide slots. Two prices within the 0.01 tolerance
+    can land at most 2 buckets apart (float rounding), so lookups probe ±2.
+    """
+    return int(round(price * 100))
+
+class GttMatchIndex:
+    """
+    Hash index over GTT_DATA rows, built once and reused for every instruction.
+    - UPDATE lookups key on (TICKER, normalized TYPE).
+    - PLACE/DELETE lookups key on (TICKER, normalized TYPE, UNITS, price bucket),
+      then re-check the 0.01 price tolerance on the few candidates.
+    Returns the same match lists (same rows, same order) as find_matching_data_rows.
+    canonical_tickers=True keys tickers as EXCHANGE:SYMBOL (used for rows built from
+    kite.get_gtts(), where the instruction may or may not carry the NSE: prefix).
+    """
+    def __init__(self, data_rows, canonical_tickers=False):
+        self.data_rows = data_rows
+        self.canonical_tickers = canonical_tickers
+        self._ticker_key = _canonical_ticker_key if canonical_tickers else _match_ticker_key
+        self._by_ticker_type = {}
+        self._by_full_key = {}
+        self._by_gtt_id = {}  # GTT_ID -> current row, so mutations apply to the latest version of a GTT
+        self._next_pos = 0
+        self._lock = threading.Lock()
+        self.mutation_count = 0
+        self.duplicate_update_keys = {}
+        self.duplicate_full_keys = {}
+
+        for row in data_rows:
+            self._add(row)
+
+        for key, entries in self._by_ticker_type.items():
+            if len(entries) > 1:
+                self.duplicate_update_keys[key] = len(entries)
+        for key, entries in self._by_full_key.items():
+            if len(entries) > 1:
+                self.duplicate_full_keys[key] = len(entries)
+
+        logger.info(
+            f"Built GTT match index: {len(data_rows)} rows, {len(self._by_ticker_type)} ticker/type keys, "
+            f"{len(self._by_full_key)} ticker/type/units/price keys"
+        )
+        if self.duplicate_update_keys:
+            logger.warning(
+                f"GTT match index: {len(self.duplicate_update_keys)} ticker/type keys have multiple rows "
+                f"(UPDATEs on these will conflict)"
+            )
+            for key, count in self.duplicate_update_keys.items():
+                logger.debug(f"Duplicate ticker/type key {key}: {count} rows")
+        if self.duplicate_full_keys:
+            logger.warning(
+                f"GTT match index: {len(self.duplicate_full_keys)} ticker/type/units/price keys have multiple rows "
+                f"(DELETEs on these will conflict)"
+            )
+            for key, count in self.duplicate_full_keys.items():
+                logger.debug(f"Duplicate ticker/type/units/price key {key}: {count} rows")
+
+    def _keys_for(self, row):
+        tt_key = (self._ticker_key(row.get("TICKER", "")), normalize_type_for_matching(row.get("TYPE", "")))
+        price = _parse_number_safe(row.get("GTT PRICE", 0))
+        if price is None:
+            price = 0.0
+        units = _int_from_number_like(row.get("UNITS", 0))
+        return tt_key, tt_key + (units, _price_bucket(price)), price
+
+    def _add(self, row, pos=None):
+        if pos is None:
+            pos = self._next_pos
+            self._next_pos += 1
+        tt_key, full_key, price = self._keys_for(row)
+        self._by_ticker_type.setdefault(tt_key, []).append((pos, row))
+        self._by_full_key.setdefault(full_key, []).append((pos, price, row))
+        gtt_id = normalize_gtt_id(row.get("GTT_ID"))
+        if gtt_id:
+            self._by_gtt_id[gtt_id] = row
+
+    def _current(self, row):
+        # Mutation callbacks hold the row matched before any Kite call ran; an earlier
+        # UPDATE of the same GTT in the batch may have replaced it since
+        gtt_id = normalize_gtt_id(row.get("GTT_ID"))
+        return self._by_gtt_id.get(gtt_id, row) if gtt_id else row
+
+    def _remove(self, row):
+        """Drop `row` (by identity) from both maps; returns its position or None."""
+        tt_key, full_key, _ = self._keys_for(row)
+        pos = None
+        entries = self._by_ticker_type.get(tt_key, [])
+        for i, (p, r) in enumerate(entries):
+            if r is row:
+                pos = p
+                del entries[i]
+                break
+        entries = self._by_full_key.get(full_key, [])
+        for i, (_, _, r) in enumerate(entries):
+            if r is row:
+                del entries[i]
+                break
+        gtt_id = normalize_gtt_id(row.get("GTT_ID"))
+        if gtt_id and self._by_gtt_id.get(gtt_id) is row:
+            del self._by_gtt_id[gtt_id]
+        return pos
+
+    # ---- keep the snapshot warm: apply successful Kite mutations in place ----
+    def record_place(self, new_row):
+        with self._lock:
+            self._add(new_row)
+            self.mutation_count += 1
+
+    def record_update(self, old_row, units, price):
+        with self._lock:
+            old_row = self._current(old_row)
+            new_row = dict(old_row)
+            new_row["UNITS"] = units
+            new_row["GTT PRICE"] = price
+            pos = self._remove(old_row)
+            self._add(new_row, pos)
+            self.mutation_count += 1
+        return new_row
+
+    def record_delete(self, old_row):
+        with self._lock:
+            self._remove(self._current(old_row))
+            self.mutation_count += 1
+
+    def find(self, instr_row, update_match=False):
+        tt_key, full_key, price = self._keys_for(instr_row)
+        return self._lookup(tt_key, full_key[2], price, update_match)
+
+    def find_record(self, rec, update_match=False):
+        """Same as find(), for a pre-parsed InstructionRecord (no re-normalisation)."""
+        ticker_key = f"{rec.exchange}:{rec.symbol}".upper() if self.canonical_tickers else rec.ticker_key
+        return self._lookup((ticker_key, rec.type_key), rec.quantity, rec.price, update_match)
+
+    def _lookup(self, tt_key, units, price, update_match):
+        if update_match:
+            entries = sorted(self._by_ticker_type.get(tt_key, []), key=lambda e: e[0])
+            return [row for _, row in entries]
+
+        bucket = _price_bucket(price)
+        candidates = []
+        for b in range(bucket - 2, bucket + 3):
+            for pos, data_price, row in self._by_full_key.get(tt_key + (units, b), []):
+                if abs(price - data_price) <= 0.01:
+                    candidates.append((pos, row))
+        candidates.sort(key=lambda c: c[0])
+        return [row for _, row in candidates]
+
+@lru_cache(maxsize=256)
 def determine_action(raw_action):
     raw_action = raw_action.strip().upper()
     if "INSERT" in raw_action or "PLACE" in raw_action:
@@ -401,23 +572,161 @@ def safe_api_call(func, *args, max_retries=5, base_delay=1, **kwargs):
     # Shouldn't reach here, but return None defensively
     return None
 
+# Set by --dry-run: every Sheets write (STATUS clear/flush, header add) is logged instead of sent
+DRY_RUN = False
+
+# Where instructions are matched against: "sheet" (GTT_DATA tracking sheet) or "kite" (live get_gtts())
+MATCH_SOURCE = os.getenv("GTT_MATCH_SOURCE", "sheet")
+# GTT_DATA columns the match index uses; only these are read from the tracking sheet
+GTT_DATA_MATCH_COLUMNS = ("TICKER", "TYPE", "UNITS", "GTT PRICE", "GTT_ID")
+
+# ---- Kite mutation rate governor + concurrent executor ----
+KITE_MAX_RPS = float(os.getenv("KITE_MAX_RPS", "8"))  # Kite caps order/GTT calls at 10/s; stay under
+GTT_MAX_WORKERS = int(os.getenv("GTT_MAX_WORKERS", "4"))
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available,
+    so every caller sharing one bucket stays under `rate_per_sec` combined.
+    """
+    def __init__(self, rate_per_sec, capacity=1):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+_KITE_BUCKET = TokenBucket(KITE_MAX_RPS)
+
+class RateLimitedKite:
+    """
+    Thin proxy over a KiteConnect instance: mutation calls take a token from the
+    shared bucket first (retries inside safe_api_call go through it too).
+    Everything else is passed straight through.
+    """
+    GOVERNED_CALLS = ("place_gtt", "modify_gtt", "delete_gtt", "place_order")
+
+    def __init__(self, kite, bucket=None):
+        self._kite = kite
+        self._bucket = bucket or _KITE_BUCKET
+
+    def __getattr__(self, name):
+        attr = getattr(self._kite, name)
+        if name not in self.GOVERNED_CALLS or not callable(attr):
+            return attr
+
+        def governed(*args, **kwargs):
+            self._bucket.acquire()
+            return attr(*args, **kwargs)
+        return governed
+
+def rate_limited_kite(kite):
+    if isinstance(kite, RateLimitedKite):
+        return kite
+    return RateLimitedKite(kite)
+
+class RowOutcome:
+    """
+    Status / failed / conflict entries for one instruction row. Workers write here
+    (it quacks like a status manager for update_status), and the batch merges all
+    outcomes back in row order, so sheet statuses and row accounting stay deterministic.
+    """
+    def __init__(self, row_number):
+        self.row_number = row_number
+        self.status_updates = {}
+        self.failed_rows = []
+        self.conflict_rows = []
+
+    def queue_status_update(self, row_number, status_text):
+        self.status_updates[row_number] = status_text
+
+    def record_exception(self, e, tb=None):
+        logger.error(f"Exception processing row {self.row_number}: {tb or traceback.format_exc()}")
+        self.queue_status_update(self.row_number, f"❌ exception: {e}")
+        self.failed_rows.append({"row_number": self.row_number, "reason": str(e)})
+
+    def merge_into(self, status_manager, failed_rows, conflict_rows):
+        for row_number, status_text in self.status_updates.items():
+            update_status(status_manager, row_number, status_text)
+        failed_rows.extend(self.failed_rows)
+        conflict_rows.extend(self.conflict_rows)
+
+class GttMutationExecutor:
+    """
+    Runs queued place/modify/delete (and MARKET order) jobs on a bounded thread pool.
+    `jobs` maps an instrument key -> [(RowOutcome, callable, on_success), ...]; each
+    key's jobs run sequentially in row order, different keys run in parallel.
+    on_success (optional) receives the job's truthy return value (the GTT id).
+    """
+    def __init__(self, max_workers=None):
+        self.max_workers = max(1, max_workers or GTT_MAX_WORKERS)
+
+    @staticmethod
+    def _run_group(group):
+        for outcome, job, on_success in group:
+            try:
+                result = job()
+                if result and on_success is not None:
+                    on_success(result)
+            except Exception as e:
+                outcome.record_exception(e)
+
+    def run(self, jobs):
+        if not jobs:
+            return
+        groups = list(jobs.values())
+        total = sum(len(g) for g in groups)
+        started = time.time()
+        if self.max_workers == 1 or len(groups) == 1:
+            for group in groups:
+                self._run_group(group)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as pool:
+                for future in [pool.submit(self._run_group, g) for g in groups]:
+                    future.result()
+        logger.info(f"Executed {total} Kite jobs across {len(groups)} instruments in {time.time() - started:.2f}s")
+
 class SheetStatusManager:
-    def __init__(self, sheet):
+    def __init__(self, sheet, headers=None, writes=None):
+        # writes: a run-scoped SheetWriteBuffer; status/header writes are queued on it instead of sent
         self.sheet = sheet
+        self.writes = writes
         self.headers = None
         self.status_col = None
         self.status_updates = {}
-        self._load_headers()
+        self._load_headers(headers)
     
-    def _load_headers(self):
+    def _load_headers(self, headers=None):
         try:
-            self.headers = safe_api_call(self.sheet.row_values, 1)
+            # Reuse an already-read header row (e.g. from probe_tabs) instead of another row_values call
+            self.headers = list(headers) if headers is not None else safe_api_call(self.sheet.row_values, 1)
             try:
                 self.status_col = self.headers.index("STATUS") + 1
             except ValueError:
                 self.status_col = len(self.headers) + 1
-                safe_api_call(self.sheet.update_cell, 1, self.status_col, "STATUS")
+                if DRY_RUN:
+                    logger.info(f"[dry-run] would add STATUS header at column {self.status_col}")
+                elif self.writes is not None:
+                    self.writes.update_cell(self.sheet, 1, self.status_col, "STATUS")
+                else:
+                    safe_api_call(self.sheet.update_cell, 1, self.status_col, "STATUS")
                 self.headers.append("STATUS")
+                if not DRY_RUN:
+                    # cache the header as it is once the (possibly still queued) write lands,
+                    # so a read before the commit can't cache the old one
+                    prime_sheet_schema(self.sheet, self.headers)
         except Exception as e:
             logger.error(f"Failed to load headers: {e}")
             self.headers = []
@@ -429,6 +738,13 @@ class SheetStatusManager:
     def flush_status_updates(self):
         if not self.status_updates:
             return
+
+        if DRY_RUN:
+            for row_num, status in sorted(self.status_updates.items()):
+                logger.debug(f"[dry-run] row {row_num}: {status}")
+            logger.info(f"[dry-run] would write {len(self.status_updates)} status cells")
+            self.status_updates.clear()
+            return
         
         try:
             updates = []
@@ -441,7 +757,10 @@ class SheetStatusManager:
                 except Exception as e:
                     logger.error(f"Failed to prepare status update for row {row_num}: {e}")
             
-            if updates:
+            if updates and self.writes is not None:
+                self.writes.batch_update(self.sheet, updates)
+                logger.debug(f"Queued {len(updates)} status cells")
+            elif updates:
                 safe_api_call(self.sheet.batch_update, updates)
                 logger.debug(f"Batch updated {len(updates)} status cells")
         except Exception as e:
@@ -458,93 +777,264 @@ def parse_ticker(ticker):
         return parts[0].strip(), parts[1].strip()
     return "NSE", ticker.strip()
 
-def process_gtt_batch(kite, start_row, instruction_sheet, data_sheet):
-    raw_instructions, instructions = fetch_gtt_instructions_batch(instruction_sheet, start_row)
+class InstructionRecord:
+    """
+    One pre-parsed instruction row. __slots__ keeps it compact; every field the
+    matching and executor code needs is parsed exactly once here.
+    `error` (+ `error_tb`) is set instead of the fields when the row failed to parse.
+    """
+    __slots__ = (
+        "row_number", "raw_ticker", "raw_type", "raw_action", "method",
+        "exchange", "symbol", "action", "side", "quantity", "price", "last_price",
+        "ticker_key", "type_key", "missing_fields", "error", "error_tb",
+    )
+
+    def __init__(self, row_number):
+        self.row_number = row_number
+        self.missing_fields = False
+        self.error = None
+        self.error_tb = None
+
+    def match_row(self):
+        # dict shape GTT_DATA rows use, for appending this instruction to the match index
+        return {"TICKER": self.raw_ticker, "TYPE": self.raw_type, "UNITS": self.quantity, "GTT PRICE": self.price}
+
+def parse_instruction_batch(instructions):
+    """
+    Parse a whole batch of (row_number, instruction dict) pairs (from
+    fetch_gtt_instructions_batch) into InstructionRecords in one pass. Tickers are
+    interned and TYPE/ACTION normalisation is memoised, so repeated values across a
+    large tab cost nothing.
+    """
+    records = []
+    for row_number, instr in instructions:
+        rec = InstructionRecord(row_number)
+        records.append(rec)
+        try:
+            rec.raw_ticker = sys.intern(instr.get("TICKER", "").strip())
+            rec.raw_type = instr.get("TYPE", "").strip()
+            rec.raw_action = instr.get("ACTION", "").strip()
+            rec.quantity = int(instr.get("UNITS", 0) or 0)
+            rec.method = instr.get("METHOD", "").strip()
+
+            if not rec.raw_ticker or not rec.raw_type or not rec.raw_action:
+                rec.missing_fields = True
+                continue
+
+            exchange, symbol = parse_ticker(rec.raw_ticker)
+            rec.exchange = sys.intern(exchange)
+            rec.symbol = sys.intern(symbol)
+            rec.action = determine_action(rec.raw_action)
+            rec.type_key = normalize_type_for_matching(rec.raw_type)
+            rec.side = "BUY" if rec.type_key == "BUY" else "SELL"
+            rec.ticker_key = sys.intern(rec.raw_ticker.upper())
+            rec.price = float(instr.get("GTT PRICE", 0) or 0)
+            rec.last_price = float(instr.get("LIVE PRICE", 0) or 0)
+        except Exception as e:
+            rec.error = e
+            rec.error_tb = traceback.format_exc()
+    return records
+
+def _book_row(exchange, symbol, side, quantity, limit_price, trigger_price):
+    # ZERODHA_GTT_DATA row for a GTT we just placed/modified, from the prices sent to Kite
+    return single_gtt_row(exchange, symbol, side, quantity, limit_price, trigger_price)
+
+def _record_placed_row(match_index, gtt_book, new_row, book_row, gtt_id):
+    new_row["GTT_ID"] = gtt_id
+    match_index.record_place(new_row)
+    if gtt_book is not None:
+        gtt_book.upsert(gtt_id, book_row)
+
+def _record_updated_row(match_index, gtt_book, old_row, units, price, book_row, gtt_id):
+    match_index.record_update(old_row, units, price)
+    if gtt_book is not None:
+        gtt_book.upsert(gtt_id, book_row)
+
+def _record_deleted_row(match_index, gtt_book, old_row, gtt_id):
+    match_index.record_delete(old_row)
+    if gtt_book is not None:
+        gtt_book.mark_deleted(gtt_id)
+
+def load_gtt_data_snapshot(data_sheet):
+    """
+    Read the whole GTT_DATA tracking sheet once and index it for matching.
+    The returned GttMatchIndex is shared by every batch and every action in a run.
+    """
+    raw_data_rows, data_rows = fetch_all_existing_gtts(data_sheet, columns=GTT_DATA_MATCH_COLUMNS)
+    return GttMatchIndex(data_rows)
+
+def gtt_match_rows(gtts):
+    """
+    Turn a kite.get_gtts() response into match rows (the GTT_DATA dict shape):
+    active single-leg triggers only, keyed on EXCHANGE:SYMBOL, transaction type,
+    order quantity and trigger value. Two-leg (OCO) triggers are left to oco_handler_vs.
+    """
+    rows = []
+    skipped = 0
+    for g in gtts or []:
+        if str(g.get("status", "")).lower() != "active":
+            continue
+        condition = g.get("condition") or {}
+        orders = g.get("orders") or []
+        trigger_values = condition.get("trigger_values") or []
+        if g.get("type") != "single" or not orders or not trigger_values:
+            skipped += 1
+            continue
+        order = orders[0]
+        rows.append({
+            "TICKER": f"{condition.get('exchange', '')}:{condition.get('tradingsymbol', '')}",
+            "TYPE": order.get("transaction_type", ""),
+            "UNITS": order.get("quantity", 0),
+            "GTT PRICE": trigger_values[0],
+            "GTT_ID": g.get("id"),
+        })
+    if skipped:
+        logger.info(f"Skipped {skipped} active non-single (two-leg) GTTs when building the match index")
+    return rows
+
+def load_kite_gtt_snapshot(kite, gtts=None):
+    """
+    Build the match index straight from Kite's live GTT book (one get_gtts() call,
+    or an already-fetched response) instead of the GTT_DATA sheet.
+    """
+    if gtts is None:
+        gtts = safe_api_call(kite.get_gtts)
+    logger.info(f"Building GTT match index from Kite's live GTT book ({len(gtts or [])} GTTs)")
+    return GttMatchIndex(gtt_match_rows(gtts), canonical_tickers=True)
+
+def load_match_index(match_source, kite=None, data_sheet=None, gtts=None):
+    if match_source == "kite":
+        return load_kite_gtt_snapshot(kite, gtts=gtts)
+    return load_gtt_data_snapshot(data_sheet)
+
+def process_gtt_batch(kite, start_row, instruction_sheet, data_sheet, match_index=None, gtt_book=None,
+                      status_manager=None, max_row=None, batch=None):
+    # batch: (raw_instructions, instructions) already read by the caller (iter_gtt_instruction_batches);
+    # instructions are (row_number, row) pairs, so blank rows don't shift later row numbers
+    if batch is None:
+        batch = fetch_gtt_instructions_batch(instruction_sheet, start_row, max_row=max_row)
+    raw_instructions, instructions = batch
     raw_read = len(raw_instructions)
     if raw_read == 0:
         logger.info("No GTT instructions (raw) found to process.")
         return 0, 0, [], []
 
-    raw_data_rows, data_rows = fetch_existing_gtts_batch(data_sheet, start_row)
+    if match_index is None:
+        match_index = load_gtt_data_snapshot(data_sheet)
     failed_rows = []
     conflict_rows = []
-    data_header = data_sheet.row_values(1)
-    
-    status_manager = SheetStatusManager(instruction_sheet)
 
-    for idx, instr in enumerate(instructions):
-        row_num = start_row + idx
+    if status_manager is None:
+        status_manager = SheetStatusManager(instruction_sheet)
+    kite = rate_limited_kite(kite)
+
+    # Phase 1 (serial): parse + match every row and queue its Kite work.
+    # Phase 2 (parallel): run the queued work; results are merged back in row order.
+    outcomes = []
+    jobs = {}
+
+    for rec in parse_instruction_batch(instructions):
+        row_num = rec.row_number
+        outcome = RowOutcome(row_num)
+        outcomes.append(outcome)
+        if rec.error is not None:
+            outcome.record_exception(rec.error, rec.error_tb)
+            continue
         try:
-            raw_ticker = instr.get("TICKER", "").strip()
-            raw_type = instr.get("TYPE", "").strip()
-            raw_action = instr.get("ACTION", "").strip()
-            quantity = int(instr.get("UNITS", 0) or 0)
-            method = instr.get("METHOD", "").strip()
-
-            if not raw_ticker or not raw_type or not raw_action:
-                update_status(status_manager, row_num, "❌ MISSING FIELD")
-                failed_rows.append({"row_number": row_num, "reason": "Missing TICKER / TYPE / ACTION"})
+            if rec.missing_fields:
+                update_status(outcome, row_num, "❌ MISSING FIELD")
+                outcome.failed_rows.append({"row_number": row_num, "reason": "Missing TICKER / TYPE / ACTION"})
                 continue
 
-            exchange, symbol = parse_ticker(raw_ticker)
-            action = determine_action(raw_action)
-            side = parse_type_to_side(raw_type)
-            price_float = float(instr.get("GTT PRICE", 0) or 0)
-            
-            trigger_price = price_float
-            limit_price = price_float
-                
-            last_price_float = float(instr.get("LIVE PRICE", 0) or 0)
-
-            instr_match_obj = {
-                "TICKER": raw_ticker,
-                "TYPE": raw_type,
-                "UNITS": quantity,
-                "GTT PRICE": price_float,
-            }
-
-            if action == "UPDATE":
-                matches = find_matching_data_rows(instr_match_obj, data_rows, update_match=True)
-            else:
-                matches = find_matching_data_rows(instr_match_obj, data_rows, update_match=False)
+            action = rec.action
+            exchange, symbol, side = rec.exchange, rec.symbol, rec.side
+            quantity, method = rec.quantity, rec.method
+            trigger_price = rec.price
+            limit_price = rec.price
+            last_price_float = rec.last_price
+
+            matches = match_index.find_record(rec, update_match=(action == "UPDATE"))
 
+            on_success = None
             if action == "PLACE":
-                process_place(
-                    status_manager, row_num, matches, exchange, symbol, side,
+                # process_place sends the order price rounded and the trigger as is
+                book_row = _book_row(exchange, symbol, side, quantity, round(limit_price, 2), trigger_price)
+                on_success = functools.partial(_record_placed_row, match_index, gtt_book, rec.match_row(), book_row)
+                job = functools.partial(
+                    process_place,
+                    outcome, row_num, matches, exchange, symbol, side,
                     quantity, limit_price, trigger_price, method, kite,
-                    last_price_float, update_status, failed_rows
+                    last_price_float, update_status, outcome.failed_rows
                 )
             elif action == "UPDATE":
-                process_update(
-                    status_manager, row_num, matches, quantity, trigger_price,
+                if len(matches) == 1:
+                    book_row = _book_row(exchange, symbol, side, quantity, limit_price, trigger_price)
+                    on_success = functools.partial(
+                        _record_updated_row, match_index, gtt_book, matches[0], quantity, rec.price, book_row
+                    )
+                job = functools.partial(
+                    process_update,
+                    outcome, row_num, matches, quantity, trigger_price,
                     symbol, exchange, side, limit_price, method, kite,
-                    last_price_float, update_status, failed_rows, conflict_rows, logger
+                    last_price_float, update_status, outcome.failed_rows, outcome.conflict_rows, logger
                 )
             elif action == "DELETE":
-                process_delete(
-                    status_manager, row_num, matches, kite,
-                    update_status, failed_rows, conflict_rows, logger, symbol, exchange
+                if len(matches) == 1:
+                    on_success = functools.partial(_record_deleted_row, match_index, gtt_book, matches[0])
+                job = functools.partial(
+                    process_delete,
+                    outcome, row_num, matches, kite,
+                    update_status, outcome.failed_rows, outcome.conflict_rows, logger, symbol, exchange
                 )
             else:
-                update_status(status_manager, row_num, "❌ unknown action")
-                failed_rows.append({"row_number": row_num, "reason": f"Unknown ACTION: {raw_action}"})
+                update_status(outcome, row_num, "❌ unknown action")
+                outcome.failed_rows.append({"row_number": row_num, "reason": f"Unknown ACTION: {rec.raw_action}"})
+                continue
 
-            time.sleep(0.1)
+            # Rows for the same instrument stay sequential (in row order) within one worker
+            jobs.setdefault((exchange, symbol), []).append((outcome, job, on_success))
 
         except Exception as e:
-            logger.error(f"Exception processing row {row_num}: {traceback.format_exc()}")
-            try:
-                update_status(status_manager, row_num, f"❌ exception: {e}")
-            except Exception as inner_e:
-                logger.error(f"Double-failure while updating status at row {row_num}: {inner_e}")
-            failed_rows.append({"row_number": row_num, "reason": str(e)})
+            outcome.record_exception(e)
+
+    GttMutationExecutor().run(jobs)
+
+    for outcome in outcomes:
+        outcome.merge_into(status_manager, failed_rows, conflict_rows)
 
     status_manager.flush_status_updates()
 
     processed_count = len(instructions)
     return raw_read, processed_count, failed_rows, conflict_rows
 
-def process_market_sheet(kite, worksheet, status_manager, logger):
+def place_market_order(status_manager, row_num, kite, symbol, exchange, side, units, variety, logger):
+    try:
+        order_id = safe_api_call(
+            kite.place_order,
+            tradingsymbol=symbol,
+            exchange=exchange,
+            transaction_type=side,
+            quantity=units,
+            order_type="MARKET",
+            product="CNC",
+            variety=variety,
+            validity="DAY",
+        )
+        update_status(status_manager, row_num, "✅ market placed")
+        logger.info(f"Row {row_num}: MARKET {side} {symbol} x{units} placed")
+        return order_id
+    except Exception as e:
+        update_status(status_manager, row_num, f"❌ error: {e}")
+        logger.error(f"Row {row_num}: error placing MARKET order: {e}")
+
+def process_market_sheet(kite, worksheet, status_manager, logger, variety=None):
+    """
+    Place a MARKET order for every pending MKT_INS row.
+    Rows are validated serially, then placed concurrently on the GTT executor
+    (same KITE_MAX_RPS bucket, rows for one instrument stay in row order).
+    Statuses are merged into status_manager in row order; the caller flushes once.
+    variety: decided once per run by the caller (resolve_order_variety() if None).
+    """
     rows = worksheet.get_all_values()
     if not rows or len(rows) < 2:
         logger.info("No rows to process in MKT_INS")
@@ -556,7 +1046,15 @@ def process_market_sheet(kite, worksheet, status_manager, logger):
     ix_action = headers.index("ACTION")
     ix_status = headers.index("STATUS")
 
+    if variety is None:
+        variety = resolve_order_variety()
+    kite = rate_limited_kite(kite)
+    outcomes = []
+    jobs = {}
+
     for row_num, row in enumerate(rows[1:], start=2):
+        outcome = RowOutcome(row_num)
+        outcomes.append(outcome)
         try:
             raw_ticker = row[ix_ticker].strip()
             exchange, symbol = parse_ticker(raw_ticker)
@@ -564,14 +1062,14 @@ def process_market_sheet(kite, worksheet, status_manager, logger):
             units = _int_from_number_like(row[ix_units])
             
             if units <= 0:
-                update_status(status_manager, row_num, "⏭ skipped: invalid or empty UNITS")
+                update_status(outcome, row_num, "⏭ skipped: invalid or empty UNITS")
                 continue
 
             side = normalize_type_for_matching(row[ix_action])
 
             if side not in ("BUY", "SELL"):
                 update_status(
-                    status_manager,
+                    outcome,
                     row_num,
                     f"❌ invalid ACTION for MARKET: {row[ix_action]}"
                 )
@@ -581,28 +1079,22 @@ def process_market_sheet(kite, worksheet, status_manager, logger):
             if row[ix_status]:
                 continue
 
-            product = "CNC"
-            variety = resolve_order_variety()
-
-            resp = safe_api_call(
-                kite.place_order,
-                tradingsymbol=symbol,
-                exchange=exchange,
-                transaction_type=side,
-                quantity=units,
-                order_type="MARKET",
-                product=product,
-                variety=variety,
-                validity="DAY",
+            job = functools.partial(
+                place_market_order,
+                outcome, row_num, kite, symbol, exchange, side, units, variety, logger
             )
-
-            update_status(status_manager, row_num, "✅ market placed")
-            logger.info(f"Row {row_num}: MARKET {side} {symbol} x{units} placed")
+            jobs.setdefault((exchange, symbol), []).append((outcome, job, None))
 
         except Exception as e:
-            update_status(status_manager, row_num, f"❌ error: {e}")
+            update_status(outcome, row_num, f"❌ error: {e}")
             logger.error(f"Row {row_num}: error placing MARKET order: {e}")
 
+    logger.info(f"Placing {sum(len(g) for g in jobs.values())} MARKET orders (variety={variety})")
+    GttMutationExecutor().run(jobs)
+
+    for outcome in outcomes:
+        outcome.merge_into(status_manager, [], [])
+
 def __is_retriable_exception(exc):
     """
     Heuristic to decide whether `exc` is a transient/retriable error.
@@ -649,33 +1141,43 @@ def __is_retriable_exception(exc):
 
     return False
 
-def main(instruction_sheet=None, data_sheet=None, kite=None):
+def main(instruction_sheet=None, data_sheet=None, kite=None, match_index=None, check_gate=True, gtt_book=None,
+         tab_probe=None, match_source=None, writes=None):
     """
     Main runner (vs). If instruction_sheet / data_sheet / kite are provided, use them.
     Otherwise resolve using config_vs-driven helpers.
+    - match_index: a warm GttMatchIndex to reuse (multi-tab mode); loaded from data_sheet if None.
+    - check_gate=False skips the K1 read (caller already probed it).
+    - gtt_book: a fetch_all_gtts_vs.GttBook that successful mutations are applied to.
+    - tab_probe: this tab's probe_tabs() entry (gate, headers, last_data_row); read here if None.
+    - match_source: "sheet" (GTT_DATA) or "kite" (live get_gtts()); defaults to MATCH_SOURCE.
+    - writes: a SheetWriteBuffer the STATUS clear/header/status writes are queued on (committed by the caller).
+    Returns a summary dict: processed / failed / conflicts / mutations.
     """
     logger.info("Starting GTT processing batch script (vs)...")
+    summary = {"processed": 0, "failed": 0, "conflicts": 0, "mutations": 0}
 
-    gsheet_client = get_gsheet_client()
-
+    match_source = match_source or MATCH_SOURCE
     if instruction_sheet is None:
         instruction_sheet = get_instructions_sheet()
-    if data_sheet is None:
+    if data_sheet is None and match_index is None and match_source == "sheet":
         data_sheet = get_tracking_sheet()
     if kite is None:
         kite = get_kite()
 
-    try:
-        k1_val = instruction_sheet.acell("K1").value
-        k1_num = float(k1_val) if k1_val not in (None, "") else 0
-        if k1_num <= 0:
-            logger.info(f"K1 <= 0 ({k1_val}) → Skipping entire GTT processing.")
-            return
-    except Exception as e:
-        logger.error(f"Failed to read K1 → Skipping process. Error: {e}")
-        return
-
-    headers = instruction_sheet.row_values(1)
+    # K1 gate, header row and column A all come from one batched read
+    if tab_probe is None:
+        tab_probe = probe_tabs(instruction_sheet.spreadsheet, [instruction_sheet.title])[instruction_sheet.title]
+    if tab_probe["headers"] is None:
+        logger.error("Failed to read K1/header of instruction sheet → Skipping process.")
+        return summary
+    if check_gate and tab_probe["gate"] <= 0:
+        logger.info(f"K1 <= 0 ({tab_probe['gate']}) → Skipping entire GTT processing.")
+        return summary
+
+    headers = list(tab_probe["headers"])
+    # the probed header and last data row double as the schema for every batched instruction read
+    prime_sheet_schema(instruction_sheet, headers, last_row=tab_probe["last_data_row"])
     try:
         status_col_idx = headers.index("STATUS") + 1  # 1-based indexing for Google Sheets
 
@@ -687,37 +1189,54 @@ def main(instruction_sheet=None, data_sheet=None, kite=None):
             # Fallback to row_count if col_values fails for some reason
             last_data_row = instruction_sheet.row_count
 
-        if last_data_row >= 2:
+        if last_data_row >= 2 and DRY_RUN:
+            logger.info(f"[dry-run] would clear STATUS column {colnum_to_a1(status_col_idx)}2:{colnum_to_a1(status_col_idx)}{last_data_row}")
+        elif last_data_row >= 2:
             col_letter = colnum_to_a1(status_col_idx)
             clear_range = f'{col_letter}2:{col_letter}{last_data_row}'
             logger.info(f"Clearing STATUS column values in instruction sheet: {clear_range}")
             # batch_clear clears cell values but preserves formatting and formulas
-            try:
-                instruction_sheet.batch_clear([clear_range])
-            except Exception as e:
-                logger.warning(f"batch_clear failed ({e}), falling back to per-cell clears")
-                # As a safe fallback, clear each cell individually (preserves formatting)
-                for r in range(2, last_data_row + 1):
-                    try:
-                        instruction_sheet.update_cell(r, status_col_idx, "")
-                    except Exception as inner_e:
-                        logger.debug(f"Failed to clear cell {col_letter}{r}: {inner_e}")
+            if writes is not None:
+                writes.batch_clear(instruction_sheet, [clear_range])
+            else:
+                try:
+                    instruction_sheet.batch_clear([clear_range])
+                except Exception as e:
+                    logger.warning(f"batch_clear failed ({e}), falling back to per-cell clears")
+                    # As a safe fallback, clear each cell individually (preserves formatting)
+                    for r in range(2, last_data_row + 1):
+                        try:
+                            instruction_sheet.update_cell(r, status_col_idx, "")
+                        except Exception as inner_e:
+                            logger.debug(f"Failed to clear cell {col_letter}{r}: {inner_e}")
     except ValueError:
         logger.info('STATUS column not found in header row—skipping clear step.')
 
-    # --- NEW: recompute fresh last_data_row AFTER clearing STATUS ---
-    try:
-        # Short pause to let the Sheets API settle, then re-read column A for an up-to-date count
-        time.sleep(0.2)
-        col_a_vals = instruction_sheet.col_values(1)
-        last_data_row = max(len(col_a_vals), 1)
-    except Exception:
-        # Defensive fallback if col_values fails
-        last_data_row = instruction_sheet.row_count
-    logger.info("Recomputed last_data_row after STATUS clear: %s", last_data_row)
+    # last_data_row comes from the probed column A and bounds every instruction read.
+    # The STATUS clear only changes column A if STATUS *is* column A, so re-read only then.
+    last_data_row = tab_probe["last_data_row"]
+    if headers[:1] == ["STATUS"]:
+        if writes is not None:
+            writes.commit()  # the re-read below must see the cleared column
+        try:
+            time.sleep(0.2)
+            last_data_row = max(len(instruction_sheet.col_values(1)), 1)
+        except Exception:
+            # Defensive fallback if col_values fails
+            last_data_row = instruction_sheet.row_count
+        prime_sheet_schema(instruction_sheet, headers, last_row=last_data_row)
+    logger.info("last_data_row for instruction reads: %s", last_data_row)
+
+    # One status manager per tab (headers already known, no extra row_values per batch)
+    status_manager = SheetStatusManager(instruction_sheet, headers=headers, writes=writes)
 
     start_row = 2
 
+    # One full read of GTT_DATA (or one get_gtts()) for the whole run, not one per batch
+    if match_index is None:
+        match_index = load_match_index(match_source, kite=kite, data_sheet=data_sheet)
+    mutations_before = match_index.mutation_count
+
     total_rows_processed = 0
     all_failed_rows = []
     all_conflict_rows = []
@@ -726,8 +1245,14 @@ def main(instruction_sheet=None, data_sheet=None, kite=None):
     consecutive_empty_batches = 0
     EMPTY_BATCH_LIMIT = 3  # stop after this many empty filtered batches in a row
 
-    while True:
-        raw_read, processed, failed_rows, conflict_rows = process_gtt_batch(kite, start_row, instruction_sheet, data_sheet)
+    # The next batch is read in the background while this one's Kite calls run;
+    # the iterator ends at the last data row, and the shared quota limiter paces the reads.
+    batches = iter_gtt_instruction_batches(instruction_sheet, start_row, max_row=last_data_row)
+    for start_row, raw_instructions, instructions in batches:
+        raw_read, processed, failed_rows, conflict_rows = process_gtt_batch(
+            kite, start_row, instruction_sheet, data_sheet, match_index=match_index, gtt_book=gtt_book,
+            status_manager=status_manager, max_row=last_data_row, batch=(raw_instructions, instructions),
+        )
 
         # nothing raw returned -> sheet end
         if raw_read == 0:
@@ -756,9 +1281,7 @@ def main(instruction_sheet=None, data_sheet=None, kite=None):
         total_rows_processed += processed
         all_failed_rows.extend(failed_rows)
         all_conflict_rows.extend(conflict_rows)
-        start_row += raw_read
-
-        time.sleep(1)
+    batches.close()  # stops a prefetch still in flight after an early break
 
     logger.info(f"Total rows processed: {total_rows_processed}")
     if all_failed_rows:
@@ -771,11 +1294,202 @@ def main(instruction_sheet=None, data_sheet=None, kite=None):
         for cr in all_conflict_rows:
             logger.warning(f"Conflict row: {cr}")
 
-def run_fetch_all_gtts_vs_script():
+    summary.update(
+        processed=total_rows_processed,
+        failed=len(all_failed_rows),
+        conflicts=len(all_conflict_rows),
+        mutations=match_index.mutation_count - mutations_before,
+    )
+    return summary
+
+def _parse_gate_value(k1_val):
+    return float(k1_val) if k1_val not in (None, "") else 0
+
+def probe_tabs(spreadsheet, tab_names):
+    """
+    Read everything the tabs need before processing in ONE values_batch_get call:
+    the K1 gate, the header row and column A (→ last_data_row) of every tab.
+    Returns {tab_name: {"gate": float, "headers": list|None, "last_data_row": int|None}};
+    unreadable/unparsable gates come back as 0 (skip).
+    """
+    unique_tabs = list(dict.fromkeys(tab_names))
+    probes = {tab: {"gate": 0, "headers": None, "last_data_row": None} for tab in unique_tabs}
+    plan = SheetReadPlan(spreadsheet)
+    for tab in unique_tabs:
+        plan.add(a1_tab_range(tab, "K1"))
+        plan.add(a1_tab_range(tab, "1:1"))
+        plan.add(a1_tab_range(tab, "A:A"))
+    try:
+        plan.execute()
+    except Exception as e:
+        logger.error(f"Failed to probe K1 gates for {unique_tabs} → Skipping them. Error: {e}")
+        return probes
+
+    for tab in unique_tabs:
+        probe = probes[tab]
+        probe["headers"] = plan.row(a1_tab_range(tab, "1:1"))
+        probe["last_data_row"] = max(len(plan.get(a1_tab_range(tab, "A:A"))), 1)
+        k1_val = plan.cell(a1_tab_range(tab, "K1"))
+        try:
+            probe["gate"] = _parse_gate_value(k1_val)
+        except Exception as e:
+            logger.error(f"Failed to parse K1 ('{k1_val}') on {tab} → Skipping tab. Error: {e}")
+    logger.info(f"K1 gates: { {tab: p['gate'] for tab, p in probes.items()} }")
+    return probes
+
+def run_tabs(sheet_id, tab_names, kite=None, client=None, sync_book=True, match_source=None):
+    """
+    Multi-tab mode: process instruction tabs in the given order inside one process.
+    One Kite session, one Sheets client and one warm GTT snapshot are shared by all
+    tabs; K1 gates, header rows and column A are probed in one batched read
+    (re-probed only after a tab actually changed the GTT book, since gates are
+    formulas over it).
+    ZERODHA_GTT_DATA is kept as a GttBook seeded from one get_gtts(): each mutating
+    tab flushes only its changed rows, and the run ends with a drift check (full
+    re-sync only if it fails). sync_book=False (fake Kite) leaves ZERODHA_GTT_DATA alone.
+    match_source="kite" matches against the live GTT book; the same get_gtts()
+    response then seeds both the match index and the GttBook.
+    Returns the instruction sheet of the last tab (for post-checks).
+    """
+    client = client or get_gsheet_client()
+    kite = kite or get_kite()
+    match_source = match_source or MATCH_SOURCE
+    spreadsheet = client.open_by_key(sheet_id)
+    gtts = None
+    data_sheet = None
+    if match_source == "kite":
+        gtts = safe_api_call(kite.get_gtts)
+    else:
+        data_sheet = get_tracking_sheet(client=client)
+    match_index = load_match_index(match_source, kite=kite, data_sheet=data_sheet, gtts=gtts)
+    gtt_book = open_gtt_book(kite=kite, client=client, gtts=gtts) if sync_book else None
+
+    probes = probe_tabs(spreadsheet, tab_names)
+    instruction_sheet = None
+    # Every tab's STATUS clear / status writes are committed together once the tabs are done
+    with SheetWriteBuffer() as writes:
+        for pos, tab in enumerate(tab_names):
+            if probes[tab]["gate"] <= 0:
+                logger.info(f"[{tab}] K1 <= 0 ({probes[tab]['gate']}) → Skipping tab.")
+                continue
+
+            logger.info(f"[{tab}] Processing instruction tab ({pos + 1}/{len(tab_names)})")
+            instruction_sheet = spreadsheet.worksheet(tab)
+            summary = main(
+                instruction_sheet=instruction_sheet, data_sheet=data_sheet, kite=kite,
+                match_index=match_index, check_gate=False, gtt_book=gtt_book, tab_probe=probes[tab],
+                match_source=match_source, writes=writes,
+            )
+            logger.info(f"[{tab}] Summary: {summary}")
+
+            remaining = tab_names[pos + 1:]
+            if summary["mutations"] and remaining:
+                if gtt_book is not None:
+                    gtt_book.flush()
+                probes.update(probe_tabs(spreadsheet, remaining))
+
+    if gtt_book is None:
+        return instruction_sheet
+    try:
+        gtt_book.verify()
+    except Exception as e:
+        logger.error(f"GTT book drift check failed to run ({e}) → falling back to full refresh")
+        run_fetch_all_gtts_vs_script(kite)
+    return instruction_sheet
+
+def build_fake_kite(dry_run=False, latency_ms=None, jitter_ms=0, error_rate=0.0, seed=None):
+    """
+    Fake Kite for --dry-run / --simulate.
+    - dry-run: seeded read-only from the live GTT book (one get_gtts()), no latency by default.
+    - simulate: empty in-memory book, 80ms latency by default, optional error injection.
+    """
+    from fake_kite_vs import FakeKite
+
+    gtts = None
+    if dry_run:
+        try:
+            gtts = get_kite().get_gtts()
+        except Exception as e:
+            logger.warning(f"[dry-run] could not seed fake book from live GTTs ({e}); starting empty")
+    if latency_ms is None:
+        latency_ms = 0 if dry_run else 80
+    kite = FakeKite(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, seed=seed, gtts=gtts)
+    logger.info(
+        f"Using fake Kite ({'dry-run' if dry_run else 'simulate'}): latency={latency_ms}ms±{jitter_ms}ms, "
+        f"error_rate={error_rate}, seeded GTTs={len(gtts or [])}"
+    )
+    return kite
+
+# ------------------ POST-CHECKS: specific cells & logging ------------------
+# Each of these cells must read "0" once processing is complete
+POST_CHECK_CELLS = [
+    ("DUP_ZERODHA_GTT_DATA", "O1"),
+    ("DUP_ZERODHA_GTT_DATA", "Q1"),
+    ("MATCH_OLD_GTT_INS", "L1"),
+    ("MATCH_OLD_GTT_INS", "N1"),
+]
+
+def _log_post_check(friendly_name, val):
+    # Normalize and compare to string "0"
+    val_norm = (str(val).strip() if val is not None else "")
+    if val_norm == "0":
+        logger.info(f"✅ Post-check passed: {friendly_name} = 0 → Process completed successfully")
+    else:
+        logger.error(f"❌ Post-check failed: {friendly_name} = {val_norm or '<EMPTY/None>'} → Process not completed")
+
+def _check_cell_and_log(spreadsheet, tab_name, cell_addr, friendly_name=None):
+    """
+    Read spreadsheet.worksheet(tab_name).acell(cell_addr).value and log:
+     - INFO with ✅ message if value == "0"
+     - ERROR with ❌ message otherwise
+    Any exception becomes an ERROR log.
+    """
+    if friendly_name is None:
+        friendly_name = f"{tab_name}!{cell_addr}"
+
+    try:
+        try:
+            ws = spreadsheet.worksheet(tab_name)
+        except Exception as e:
+            logger.error(f"❌ Could not open worksheet '{tab_name}' to check {friendly_name}: {e}")
+            return
+
+        try:
+            val = ws.acell(cell_addr).value
+        except Exception as e:
+            logger.error(f"❌ Could not read cell {friendly_name}: {e}")
+            return
+
+        _log_post_check(friendly_name, val)
+
+    except Exception as e:
+        logger.error(f"❌ Unexpected error while checking {friendly_name}: {e}")
+
+def run_post_checks(spreadsheet, checks):
+    """
+    Read every post-check cell in one values_batch_get and log each result.
+    If the batched read fails (e.g. a tab is missing), fall back to per-cell checks
+    so the failing cell is still named in the log.
+    """
+    plan = SheetReadPlan(spreadsheet)
+    for tab_name, cell_addr in checks:
+        plan.add(a1_tab_range(tab_name, cell_addr))
+    try:
+        plan.execute()
+    except Exception as e:
+        logger.warning(f"Batched post-check read failed ({e}); checking cells one by one")
+        for tab_name, cell_addr in checks:
+            _check_cell_and_log(spreadsheet, tab_name, cell_addr)
+        return
+
+    for tab_name, cell_addr in checks:
+        _log_post_check(f"{tab_name}!{cell_addr}", plan.cell(a1_tab_range(tab_name, cell_addr)))
+
+def run_fetch_all_gtts_vs_script(kite=None):
     try:
         logger.info("Running fetch_all_gtts_vs.py...")
         import fetch_all_gtts_vs
-        fetch_all_gtts_vs.fetch_all_gtts()
+        fetch_all_gtts_vs.fetch_all_gtts(kite=kite)
         logger.info("fetch_all_gtts_vs.py completed successfully")
     except Exception as e:
         logger.error(f"Failed to run fetch_all_gtts_vs.py: {e}")
@@ -787,93 +1501,101 @@ if __name__ == "__main__":
         description="Process GTT instructions (vs). Only accepts --sheet-id and --sheet-name which override config_vs values."
     )
     parser.add_argument("--sheet-id", dest="sheet_id", help="Instruction sheet ID (overrides config_vs.INSTRUCTION_SHEET_ID)", type=str)
-    parser.add_argument("--sheet-name", dest="sheet_name", help="Instruction worksheet name (overrides config_vs.INSTRUCTION_SHEET_NAME)", type=str)
+    parser.add_argument(
+        "--sheet-name", dest="sheet_name", nargs="+", type=str,
+        help="Instruction worksheet name(s), processed in the given order in one process (overrides config_vs.INSTRUCTION_SHEET_NAME)",
+    )
     parser.add_argument("--market-order", action="store_true", help="Process Market Orders instead of GTT")
+    parser.add_argument(
+        "--match-source", choices=["sheet", "kite"], default=MATCH_SOURCE,
+        help="Match instructions against the GTT_DATA sheet or Kite's live GTT book (default: $GTT_MATCH_SOURCE or sheet)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Fake Kite seeded from the live GTT book; no Kite mutations and no Sheets writes")
+    parser.add_argument("--simulate", action="store_true", help="Fake Kite with simulated latency/errors; statuses are written (use a test tab)")
+    parser.add_argument("--sim-latency-ms", type=float, default=None, help="Fake Kite latency per call (default: 0 dry-run, 80 simulate)")
+    parser.add_argument("--sim-jitter-ms", type=float, default=0, help="Uniform +/- jitter on the fake latency")
+    parser.add_argument("--sim-error-rate", type=float, default=0.0, help="Probability (0..1) that a fake mutation call fails")
+    parser.add_argument("--sim-seed", type=int, default=None, help="RNG seed for reproducible latency/error injection")
 
     args = parser.parse_args()
 
-    # Resolve instruction sheet (CLI overrides config_vs)
-    instruction_sheet = get_instructions_sheet(sheet_id=getattr(args, "sheet_id", None), sheet_name=getattr(args, "sheet_name", None))
+    sheet_id = args.sheet_id or getattr(config_vs, "INSTRUCTION_SHEET_ID", None)
+    tab_names = args.sheet_name or [getattr(config_vs, "INSTRUCTION_SHEET_NAME", None)]
+    if not sheet_id or not all(tab_names):
+        parser.error("sheet-id and sheet-name must be provided either as args or via config_vs")
 
-    kite = get_kite()
-    
-    if args.market_order:
+    DRY_RUN = args.dry_run
+    fake_kite = args.dry_run or args.simulate
 
-        # --- CLEAR STATUS COLUMN FOR MARKET MODE ---
-        headers = instruction_sheet.row_values(1)
-        try:
-            status_col_idx = headers.index("STATUS") + 1
-            last_row = instruction_sheet.row_count
-            col_letter = colnum_to_a1(status_col_idx)
-            clear_range = f"{col_letter}2:{col_letter}{last_row}"
-            instruction_sheet.batch_clear([clear_range])
-            logger.info(f"Cleared STATUS column for MARKET mode: {clear_range}")
-        except ValueError:
-            logger.warning("STATUS column not found; skipping clear step")
+    gsheet_client = get_gsheet_client()
+    if fake_kite:
+        kite = build_fake_kite(
+            dry_run=args.dry_run, latency_ms=args.sim_latency_ms, jitter_ms=args.sim_jitter_ms,
+            error_rate=args.sim_error_rate, seed=args.sim_seed,
+        )
+    else:
+        kite = get_kite()
+    instruction_sheet = None
 
-        # Process MKT_INS sheet directly
-        status_manager = SheetStatusManager(instruction_sheet)
-        process_market_sheet(kite, instruction_sheet, status_manager, logger)
-        status_manager.flush_status_updates()
+    if args.market_order:
+        # One variety decision for the whole basket (not per row / per tab)
+        variety = resolve_order_variety()
+        # Status writes of every tab go out together after the loop (each STATUS clear is sent before its tab is read)
+        with SheetWriteBuffer() as writes:
+            for tab in tab_names:
+                # Resolve instruction sheet (CLI overrides config_vs)
+                instruction_sheet = get_instructions_sheet(sheet_id=sheet_id, sheet_name=tab, client=gsheet_client)
+
+                # --- CLEAR STATUS COLUMN FOR MARKET MODE ---
+                headers = instruction_sheet.row_values(1)
+                try:
+                    status_col_idx = headers.index("STATUS") + 1
+                    last_row = instruction_sheet.row_count
+                    col_letter = colnum_to_a1(status_col_idx)
+                    clear_range = f"{col_letter}2:{col_letter}{last_row}"
+                    if DRY_RUN:
+                        logger.info(f"[dry-run] would clear STATUS column for MARKET mode: {clear_range}")
+                    else:
+                        writes.batch_clear(instruction_sheet, [clear_range])
+                        # process_market_sheet skips rows with a STATUS, so it must read the cleared column
+                        writes.commit()
+                        logger.info(f"Cleared STATUS column for MARKET mode: {clear_range}")
+                except ValueError:
+                    logger.warning("STATUS column not found; skipping clear step")
+
+                # Process MKT_INS sheet directly
+                status_manager = SheetStatusManager(instruction_sheet, writes=writes)
+                process_market_sheet(kite, instruction_sheet, status_manager, logger, variety=variety)
+                status_manager.flush_status_updates()
+
+        # optional post-processing (kept as-is; it logs on failure)
+        if not fake_kite:
+            run_fetch_all_gtts_vs_script(kite)
     else:
-        # Default: GTT flow
-        data_sheet = get_tracking_sheet()
-        main(instruction_sheet=instruction_sheet, data_sheet=data_sheet, kite=kite)
+        # Default: GTT flow (one or many tabs; refreshes ZERODHA_GTT_DATA itself)
+        instruction_sheet = run_tabs(
+            sheet_id, tab_names, kite=kite, client=gsheet_client, sync_book=not fake_kite,
+            match_source=args.match_source,
+        )
 
-    # optional post-processing (kept as-is; it logs on failure)
-    run_fetch_all_gtts_vs_script()
+    if fake_kite:
+        kite.report()
 
     # ------------------ POST-CHECKS: specific cells & logging ------------------
-    def _check_cell_and_log(spreadsheet, tab_name, cell_addr, friendly_name=None):
-        """
-        Read spreadsheet.worksheet(tab_name).acell(cell_addr).value and log:
-         - INFO with ✅ message if value == "0"
-         - ERROR with ❌ message otherwise
-        Any exception becomes an ERROR log.
-        """
-        if friendly_name is None:
-            friendly_name = f"{tab_name}!{cell_addr}"
-
-        try:
-            try:
-                ws = spreadsheet.worksheet(tab_name)
-            except Exception as e:
-                logger.error(f"❌ Could not open worksheet '{tab_name}' to check {friendly_name}: {e}")
-                return
-
-            try:
-                val = ws.acell(cell_addr).value
-            except Exception as e:
-                logger.error(f"❌ Could not read cell {friendly_name}: {e}")
-                return
-
-            # Normalize and compare to string "0"
-            val_norm = (str(val).strip() if val is not None else "")
-            if val_norm == "0":
-                logger.info(f"✅ Post-check passed: {friendly_name} = 0 → Process completed successfully")
-            else:
-                logger.error(f"❌ Post-check failed: {friendly_name} = {val_norm or '<EMPTY/None>'} → Process not completed")
-
-        except Exception as e:
-            logger.error(f"❌ Unexpected error while checking {friendly_name}: {e}")
-
     # Use the spreadsheet object associated with instruction_sheet (so CLI override works)
     try:
         spreadsheet = instruction_sheet.spreadsheet  # gspread Worksheet -> Spreadsheet
     except Exception:
-        # As a fallback, try to resolve spreadsheet from data_sheet if available
+        # As a fallback (e.g. every tab was gated off), open the instruction spreadsheet directly
         try:
-            spreadsheet = data_sheet.spreadsheet
+            spreadsheet = gsheet_client.open_by_key(sheet_id)
         except Exception:
             spreadsheet = None
 
     if spreadsheet is None:
-        logger.error("❌ Could not resolve Spreadsheet object for post-checks (neither instruction_sheet nor data_sheet provided a parent). Skipping post-checks.")
+        logger.error("❌ Could not resolve Spreadsheet object for post-checks (no instruction sheet parent and open_by_key failed). Skipping post-checks.")
     else:
-        # The four checks you requested:
-        _check_cell_and_log(spreadsheet, "DUP_ZERODHA_GTT_DATA", "O1", "DUP_ZERODHA_GTT_DATA!O1")
-        _check_cell_and_log(spreadsheet, "DUP_ZERODHA_GTT_DATA", "Q1", "DUP_ZERODHA_GTT_DATA!Q1")
-        _check_cell_and_log(spreadsheet, "MATCH_OLD_GTT_INS", "L1", "MATCH_OLD_GTT_INS!L1")
-        _check_cell_and_log(spreadsheet, "MATCH_OLD_GTT_INS", "N1", "MATCH_OLD_GTT_INS!N1")
+        # The four checks you requested, read in one batched call:
+        run_post_checks(spreadsheet, POST_CHECK_CELLS)
 
     logger.info("Script finished.")
@@ -5,12 +5,9 @@ RANGE = "ALL_OLD_GTTs!R1"
 
 def is_trigger_true():
     try:
-        import gspread
-        from google.oauth2.service_account import Credentials
+        from google_sheets_utils_vs import get_gsheet_client
 
-        scopes = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
-        creds = Credentials.from_service_account_file("creds_vs.json", scopes=scopes)
-        gc = gspread.authorize(creds)
+        gc = get_gsheet_client("creds_vs.json")
         sheet = gc.open_by_key(SHEET_ID)
         result = sheet.values_get(RANGE, params={"valueRenderOption": "FORMATTED_VALUE"})
         value = result.get("values", [[""]])[0][0]
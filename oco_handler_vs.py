@@ -4,8 +4,7 @@ import argparse
 import time
 import logging
 from kite_session_v2 import get_kite  # Assumes you have this utility in your project
-import gspread
-from google.oauth2.service_account import Credentials
+import google_sheets_utils_vs
 
 # --- CONFIGURABLE ---
 CREDS_PATH = "/Users/sugamkuchhal/Documents/kite-gtt-demo-vs/creds_vs.json"  # Adjust if needed
@@ -17,12 +16,7 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(mes
 logger = logging.getLogger("oco_handler")
 
 def get_gsheet_client():
-    scopes = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = Credentials.from_service_account_file(CREDS_PATH, scopes=scopes)
-    return gspread.authorize(creds)
+    return google_sheets_utils_vs.get_gsheet_client(CREDS_PATH)
 
 def fetch_gtt_ids(ws):
     """
@@ -59,7 +53,7 @@ def main():
 
     logger.info(f"Opening Google Sheet: {args.sheet_name} [{args.tab_name}]")
     gc = get_gsheet_client()
-    sh = gc.open(args.sheet_name)
+    sh = google_sheets_utils_vs.open_spreadsheet(gc, args.sheet_name)
     ws = sh.worksheet(args.tab_name)
 
     kite = get_kite()
@@ -69,11 +63,10 @@ def main():
     logger.info(f"Found {total} GTT IDs to process (col F, up to first blank)")
 
     # --- Clear column G statuses before starting ---
-    MAX_ROWS = ws.row_count  # This gives you the absolute number of rows in the sheet, used or unused
-    if MAX_ROWS > 1:
-        clear_range = f'G2:G{MAX_ROWS}'
-        logger.info(f"Clearing status column G: {clear_range}")
-        ws.update(clear_range, [[""]] * (MAX_ROWS - 1))
+    # Open-ended range: clears to the last row without relying on the (cached) grid size
+    clear_range = 'G2:G'
+    logger.info(f"Clearing status column G: {clear_range}")
+    ws.batch_clear([clear_range])
 
     statuses = []
     rows = []
@@ -1,15 +1,12 @@
-import gspread
 import argparse
 import time
-from google.oauth2.service_account import Credentials
+from google_sheets_utils_vs import get_gsheet_client, open_spreadsheet, SheetWriteBuffer
 
 CREDS_PATH = "/Users/sugamkuchhal/Documents/kite-gtt-demo-vs/creds_vs.json"
 
 def load_sheet(sheet_name):
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds = Credentials.from_service_account_file(CREDS_PATH, scopes=scope)
-    client = gspread.authorize(creds)
-    return client.open(sheet_name)
+    client = get_gsheet_client(CREDS_PATH)
+    return open_spreadsheet(client, sheet_name)
 
 def copy_columns(sheet, src_col_start, src_col_end, dst_col_start, dst_col_end, nrows):
     src_range = f"{src_col_start}1:{src_col_end}{nrows}"
@@ -68,13 +65,22 @@ def mkt_kwk_ops_sort_email(
     special_target_sheet = special_target_sheet_book.worksheet(special_target_sheet_name)
 
     # --- TOUCH A CELL IN EACH WORKSHEET TO FORCE RECALC ---
+    # The rewrites are buffered: one batchUpdate per spreadsheet instead of one call per tab
+    writes = SheetWriteBuffer()
+    touched = []
     for ws, name in [(kwk_sheet, "KWK"), (action_sheet, "Action_List"), (special_target_sheet, "Special_Target")]:
         try:
             val = ws.acell("A1").value
-            ws.update_acell("A1", val)
-            print(f"TOUCH: Triggered formula recalc for {name} Sheet.")
+            writes.update(ws, "A1", [[val]], value_input_option="USER_ENTERED")
+            touched.append(name)
         except Exception as e:
             print(f"TOUCH: Could not touch A1 in {name} Sheet: {e}")
+    try:
+        writes.commit()
+        for name in touched:
+            print(f"TOUCH: Triggered formula recalc for {name} Sheet.")
+    except Exception as e:
+        print(f"TOUCH: Could not touch A1 in {', '.join(touched)}: {e}")
 
     print("WAIT: Sleeping 10 seconds for Sheets to refresh/recalculate.")
     time.sleep(10)
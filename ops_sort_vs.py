@@ -1,4 +1,4 @@
-import gspread
+from google_sheets_utils_vs import get_gsheet_client, governed, open_spreadsheet, SheetWriteBuffer
 from datetime import datetime
 import argparse
 
@@ -30,8 +30,9 @@ def get_rows_with_action(data_rows, keyword):
 def main():
     args = parse_args()
     log("")
-    gc = gspread.service_account(filename=CREDENTIALS_PATH)
-    wb = gc.open(args.sheet_name)
+    # governed(): every call goes through the shared Sheets quota limiter
+    gc = governed(get_gsheet_client(CREDENTIALS_PATH))
+    wb = open_spreadsheet(gc, args.sheet_name)
 
     green_ws = wb.worksheet(args.green_tab)
     red_ws = wb.worksheet(args.red_tab)
@@ -41,19 +42,21 @@ def main():
     red_rows   = red_ws.get_values("A2:O")
     yellow_rows = yellow_ws.get_values("A2:O")
 
+    # Writes are buffered and sent as one batchClear + one batchUpdate per commit
+    writes = SheetWriteBuffer()
+
     # --------- 1. CLEAR ACTION SHEET ---------
     log("CLEAR TASK: Clearing Action Sheet")
     if yellow_rows:
         # Clear all except header
-        yellow_ws.batch_clear([f"A2:O{yellow_ws.row_count}"])
+        writes.batch_clear(yellow_ws, ["A2:O"])  # open-ended: independent of the (cached) grid size
         log("CLEAR TASK: Rows cleared from Action Sheet")
     else:
         log("CLEAR TASK: Nothing to clear")
     
-    # --------- recompute next-append rows AFTER clear ---------
-    # Yellow should start right under the header (row 2)
-    yellow_colA_count = len(yellow_ws.col_values(1))
-    yellow_next = max(2, yellow_colA_count + 1)
+    # --------- next-append rows AFTER clear ---------
+    # A2:O of Yellow is empty once cleared (or was already), so it starts right under the header
+    yellow_next = 2
     
     # Red can be computed once here
     red_next = len(red_ws.col_values(1)) + 1
@@ -62,11 +65,17 @@ def main():
 
     # --- TOUCH to force recalc without reading anything ---
     stamp = datetime.now().isoformat(timespec="seconds")  # already imported at top
-    for ws, name in [(green_ws, "Green"), (red_ws, "Red"), (yellow_ws, "Yellow")]:
-        try:
-            ws.update_acell("F1", stamp)  # any write triggers recalc
+    # the Yellow clear must land before anything is appended to it; a failed clear still stops the run
+    writes.commit()
+    touched = [(green_ws, "Green"), (red_ws, "Red"), (yellow_ws, "Yellow")]
+    for ws, name in touched:
+        writes.update(ws, "F1", [[stamp]], value_input_option='USER_ENTERED')  # any write triggers recalc
+    try:
+        writes.commit()  # all three touches in one batchUpdate
+        for ws, name in touched:
             log(f"TOUCH: Triggered formula recalc for {name} Sheet.")
-        except Exception as e:
+    except Exception as e:
+        for ws, name in touched:
             log(f"TOUCH: Could not touch {name} Sheet: {e}")
 
     import time
@@ -94,7 +103,7 @@ def main():
     # Batch append to Yellow
     if yellow_update_rows:
         start_row = yellow_next
-        yellow_ws.update(range_name=f"A{start_row}:O{start_row+len(yellow_update_rows)-1}", values=yellow_update_rows, value_input_option='USER_ENTERED')
+        writes.update(yellow_ws, f"A{start_row}:O{start_row+len(yellow_update_rows)-1}", yellow_update_rows, value_input_option='USER_ENTERED')
         yellow_next += len(yellow_update_rows)
 
     # --- BATCHED: Batch update Red (all at once, not per-row) ---
@@ -102,7 +111,7 @@ def main():
         requests = []
         for idx, vals in zip(red_update_idxs, red_update_values):
             requests.append({'range': f"A{idx}:E{idx}", 'values': [vals]})
-        red_ws.batch_update(requests,value_input_option='USER_ENTERED')
+        writes.batch_update(red_ws, requests, value_input_option='USER_ENTERED')
 
     # --------- 3. BATCH INSERT TASK ---------
     log("INSERT TASK: Looking for 'Insert' rows in Green Sheet")
@@ -117,12 +126,12 @@ def main():
 
     if yellow_insert_rows:
         start_row = yellow_next
-        yellow_ws.update(range_name=f"A{start_row}:O{start_row+len(yellow_insert_rows)-1}", values=yellow_insert_rows, value_input_option='USER_ENTERED')
+        writes.update(yellow_ws, f"A{start_row}:O{start_row+len(yellow_insert_rows)-1}", yellow_insert_rows, value_input_option='USER_ENTERED')
         yellow_next += len(yellow_insert_rows)
 
     if red_insert_rows:
         start_row = red_next
-        red_ws.update(range_name=f"A{start_row}:E{start_row+len(red_insert_rows)-1}", values=red_insert_rows, value_input_option='USER_ENTERED')
+        writes.update(red_ws, f"A{start_row}:E{start_row+len(red_insert_rows)-1}", red_insert_rows, value_input_option='USER_ENTERED')
         red_next += len(red_insert_rows)
 
     # --------- 4. BATCH DELETE TASK ---------
@@ -139,7 +148,7 @@ def main():
     # Append all delete actions to Yellow at once
     if yellow_delete_rows:
         start_row = yellow_next
-        yellow_ws.update(range_name=f"A{start_row}:O{start_row+len(yellow_delete_rows)-1}", values=yellow_delete_rows, value_input_option='USER_ENTERED')
+        writes.update(yellow_ws, f"A{start_row}:O{start_row+len(yellow_delete_rows)-1}", yellow_delete_rows, value_input_option='USER_ENTERED')
         yellow_next += len(yellow_delete_rows)
 
     # --- BATCHED: Clear A–E of all relevant Red rows at once ---
@@ -147,11 +156,15 @@ def main():
         requests = []
         for idx in red_delete_idxs:
             requests.append({'range': f"A{idx}:E{idx}", 'values': [[""]*5]})
-        red_ws.batch_update(requests,value_input_option='USER_ENTERED')
+        writes.batch_update(red_ws, requests, value_input_option='USER_ENTERED')
+
+    # Every Yellow append and Red update/insert/clear above goes out here, before the sort
+    writes.commit()
 
     # Sort Red Sheet by A (ascending), if needed (API supports basic sorts)
     if red_delete_idxs:
-        red_ws.sort((1, 'asc'))  # sort by Col A
+        # open-ended range: the default one is built from the (cached, possibly stale) grid size
+        red_ws.sort((1, 'asc'), range="A2:O")  # sort by Col A
 
     log("✅ SCRIPT COMPLETED.")
     time.sleep(60)
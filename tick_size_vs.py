@@ -1,5 +1,5 @@
-import gspread
 from kiteconnect import KiteConnect
+from google_sheets_utils_vs import get_gsheet_client, write_table_diff
 
 # Load secrets
 with open("api_key_vs.txt") as f:
@@ -21,7 +21,7 @@ instrument_map = {
 }
 
 # Setup Google Sheets
-gc = gspread.service_account(filename="/Users/sugamkuchhal/Documents/kite-gtt-demo-vs/creds_vs.json")
+gc = get_gsheet_client("/Users/sugamkuchhal/Documents/kite-gtt-demo-vs/creds_vs.json")
 sheet = gc.open_by_url("https://docs.google.com/spreadsheets/d/143py3t5oTsz0gAfp8VpSJlpR5VS8Z4tfl067pMtW1EE/edit")
 worksheet = sheet.worksheet("TICKERS_TICK_SIZE")
 
@@ -76,14 +76,10 @@ for idx, (ticker, alt_ticker) in enumerate(zip(tickers_col_a, alt_tickers_col_d)
                 alt_fail_count += 1
                 alt_fail_list.append((ticker, alt_ticker))
 
-# Prepare ranges for batch update
-last_row = len(tickers_col_a) + 1
-range_c = f"C2:C{last_row}"
-range_e = f"E2:E{last_row}"
-
-# Batch update Columns C and E
-worksheet.update(range_name=range_c, values=updates_col_c)
-worksheet.update(range_name=range_e, values=updates_col_e)
+# Update Columns C and E from row 2, sending only the cells whose tick size changed
+# (trim=False: cells below the last ticker are left as they were)
+write_table_diff(worksheet, updates_col_c, start_row=2, start_col=3, trim=False)
+write_table_diff(worksheet, updates_col_e, start_row=2, start_col=5, trim=False)
 
 # ---- PRINT SUMMARY ----
 def print_table(title, rows):